@@ -0,0 +1,94 @@
+#Entradas de la hoja Summary y resumen determinístico en Pr
+#Es la parte del flujo que necesita el botón de resumen: solo depende de
+#numpy y de FluidModel (sin pandas ni matplotlib), para que importarla en un
+#intérprete nuevo sea rápido. pvt_batch reexporta estos nombres.
+
+import numpy as np
+
+from model.bubble_point import resolver_pb
+from model.fluid_model import AJUSTE_BASE, FluidModel
+
+# Entradas de la hoja Summary (celdas B5..B13; ajuste en B15..B19) y valores adicionales
+ENTRADAS = ("pb", "rsb", "api", "sg_gas", "pr", "tr", "seed", "n_points")
+ADICIONALES = {"sgo": 0.82, "psep": 100.0, "tsep": 120.0, "salinidad": 0.0}
+ALIAS = {"t": "tr", "t_f": "tr", "sg": "sg_gas", "yg": "sg_gas"}
+
+# Resumen determinístico en Pr, en el orden de las celdas C5..D9
+RESUMEN = (
+    ("Rs(Pr) [scf/stb]", "rs"),
+    ("Bo(Pr) [rb/stb]", "bo"),
+    ("Co(Pr) [1/psia]", "co"),
+    ("mu_o(Pr) [cp]", "mu_o"),
+    ("rho(Pr) [lb/ft3]", "rho"),
+)
+
+
+def _vacio(valor):
+    """True para celdas vacías: None, texto en blanco o NaN."""
+    if valor is None:
+        return True
+    if isinstance(valor, str):
+        return not valor.strip()
+    try:
+        return bool(np.isnan(valor))
+    except TypeError:
+        return False
+
+
+def normalizar_entradas(datos):
+    """
+    Convierte un diccionario de entradas (claves sin importar mayúsculas)
+    al formato que usa run_pvt. Lanza ValueError si falta alguna entrada.
+
+    Si pb falta o está vacía se calcula con la inversa de Standing a partir
+    de rsb, api, sg_gas y tr (model.bubble_point). Los parámetros de ajuste
+    de model.calibracion (rs_mult, rs_exp, bo_mult, mu_a, mu_b) son
+    opcionales y quedan en entradas["ajuste"].
+    """
+    entradas = {}
+    for clave, valor in datos.items():
+        clave = str(clave).strip().lower()
+        entradas[ALIAS.get(clave, clave)] = valor
+
+    faltan = [k for k in ENTRADAS if k != "pb" and (k not in entradas or _vacio(entradas[k]))]
+    if faltan:
+        raise ValueError(f"Faltan entradas: {', '.join(faltan)}")
+
+    if _vacio(entradas.get("pb")):
+        pb, valido, _ = resolver_pb(float(entradas["rsb"]), float(entradas["api"]),
+                                    float(entradas["sg_gas"]), float(entradas["tr"]))
+        if not valido:
+            raise ValueError("No se pudo calcular pb a partir de rsb, api, sg_gas y tr")
+        entradas["pb"] = float(pb)
+
+    for k, defecto in ADICIONALES.items():
+        entradas.setdefault(k, defecto)
+
+    limpio = {k: float(entradas[k]) for k in ENTRADAS + tuple(ADICIONALES)}
+    limpio["seed"] = int(entradas["seed"])
+    limpio["n_points"] = int(entradas["n_points"])
+    limpio["ajuste"] = {k: float(entradas[k]) for k in AJUSTE_BASE
+                        if k in entradas and not _vacio(entradas[k])}
+    return limpio
+
+
+def resumen_pr(entradas):
+    """
+    Resumen determinístico en Pr.
+
+    Retorna
+    -------
+    resumen : dict
+        Etiqueta de RESUMEN -> valor (None si es inválido).
+    fluido : FluidModel
+        Modelo del fluido de las entradas.
+    """
+    fluido = FluidModel(entradas["api"], entradas["sg_gas"], entradas["sgo"],
+                        entradas["rsb"], entradas["pb"], entradas["tr"], entradas["psep"],
+                        entradas["tsep"], entradas.get("ajuste"))
+    valores_pr = dict(zip(("rs", "bo", "co", "rho", "mu_o"), fluido.evaluate(entradas["pr"])))
+    resumen = {}
+    for etiqueta, clave in RESUMEN:
+        valor = float(valores_pr[clave])
+        resumen[etiqueta] = None if np.isnan(valor) else valor
+    return resumen, fluido
@@ -0,0 +1,251 @@
+#Acceso por bloques a las hojas de Excel (xlwings o LibroMemoria)
+#Cada lectura o escritura de un Range de xlwings es un viaje de ida y vuelta
+#al proceso de Excel (COM / AppleScript). PasarelaExcel agrupa las celdas en
+#bloques 2D: una lectura por bloque de entradas y una escritura por bloque de
+#salidas. Antes de escribir compara con lo que ya hay en la hoja (lo último
+#que escribió la pasarela o, si el bloque es pequeño, una lectura) y:
+#   - si nada cambió, no escribe (Excel no recalcula ni redibuja)
+#   - si cambió una parte, escribe solo el rectángulo que cubre los cambios
+#Las tablas (Results) borran las filas que sobran de una corrida anterior más
+#larga y las imágenes se buscan y se reemplazan por nombre (nombre in
+#hoja.pictures, pictures.add(update=True)); hoja.pictures solo se recorre
+#(imagenes) para borrar imágenes cuyo nombre no se conoce. Los gráficos
+#nativos (hoja.charts) se crean una vez y en las corridas siguientes solo se
+#actualiza su rango de datos.
+
+import re
+
+# Bloques de hasta este número de celdas se leen para compararlos si la
+# pasarela no los escribió antes; los más grandes se escriben directamente
+MAX_CELDAS_DIFERENCIA = 10_000
+
+_CELDA = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+
+def celda_a_indices(celda):
+    """'H20' -> (20, 8), fila y columna desde 1."""
+    m = _CELDA.match(celda.strip())
+    if not m:
+        raise ValueError(f"Referencia de celda no soportada: {celda!r}")
+    col = 0
+    for letra in m.group(1).upper():
+        col = col * 26 + (ord(letra) - 64)
+    return int(m.group(2)), col
+
+
+def indices_a_celda(fila, col):
+    """(20, 8) -> 'H20'."""
+    letras = ""
+    while col:
+        col, r = divmod(col - 1, 26)
+        letras = chr(65 + r) + letras
+    return f"{letras}{fila}"
+
+
+def _valor(v):
+    """Valor comparable de una celda: NaN y texto vacío son celda vacía."""
+    if hasattr(v, "item") and type(v).__module__ == "numpy":
+        v = v.item()
+    if v is None or (isinstance(v, float) and v != v) or v == "":
+        return None
+    return v
+
+
+def _a_filas(valor):
+    """Escalar, fila o tabla -> lista de filas (listas) con valores comparables."""
+    if hasattr(valor, "tolist"):
+        valor = valor.tolist()
+    if not isinstance(valor, (list, tuple)):
+        return [[_valor(valor)]]
+    if valor and isinstance(valor[0], (list, tuple)):
+        return [[_valor(v) for v in fila] for fila in valor]
+    return [[_valor(v) for v in valor]]
+
+
+def _rectangulo_cambios(previo, nuevo):
+    """(f0, c0, f1, c1) que cubre las celdas distintas, o None si son iguales."""
+    filas, columnas = [], []
+    for i, (a, b) in enumerate(zip(previo, nuevo)):
+        for j, (x, y) in enumerate(zip(a, b)):
+            if x != y:
+                filas.append(i)
+                columnas.append(j)
+    if not filas:
+        return None
+    return min(filas), min(columnas), max(filas), max(columnas)
+
+
+class PasarelaExcel:
+    """
+    Lecturas y escrituras por bloque sobre un libro de xlwings o un LibroMemoria.
+
+    diferencial : bool, comparar antes de escribir (por defecto True)
+    max_celdas_diferencia : int, tamaño máximo de un bloque que se lee de la
+        hoja para compararlo cuando la pasarela no lo escribió antes
+    """
+
+    def __init__(self, wb, diferencial=True, max_celdas_diferencia=MAX_CELDAS_DIFERENCIA):
+        self.wb = wb
+        self.diferencial = diferencial
+        self.max_celdas_diferencia = max_celdas_diferencia
+        # (hoja, celda) -> filas escritas por última vez (o su forma, en tablas)
+        self._escrito = {}
+        self._hojas = {}
+        self.estadisticas = {"lecturas": 0, "escrituras": 0, "omitidas": 0, "celdas_escritas": 0}
+
+    def hoja(self, nombre):
+        if nombre not in self._hojas:
+            self._hojas[nombre] = self.wb.sheets[nombre]
+        return self._hojas[nombre]
+
+    # =========================
+    # Lectura
+    # =========================
+    def leer(self, hoja, rango, expandir=False):
+        """Bloque como lista de filas, en una sola lectura."""
+        r = self.hoja(hoja)[rango]
+        opciones = {"ndim": 2}
+        if expandir:
+            opciones["expand"] = "table"
+        self.estadisticas["lecturas"] += 1
+        return r.options(**opciones).value
+
+    def leer_dict(self, hoja, rango, claves):
+        """Celdas de una fila o columna -> {clave: valor}; las claves None se omiten."""
+        valores = [v for fila in self.leer(hoja, rango) for v in fila]
+        return {k: v for k, v in zip(claves, valores) if k is not None}
+
+    # =========================
+    # Escritura
+    # =========================
+    def escribir(self, hoja, celda, valor):
+        """
+        Escribe un escalar, una fila o una tabla 2D desde celda.
+
+        Retorna el número de celdas escritas (0 si nada cambió).
+        """
+        nuevo = _a_filas(valor)
+        n_filas, n_cols = len(nuevo), max(len(f) for f in nuevo)
+        nuevo = [f + [None] * (n_cols - len(f)) for f in nuevo]
+        clave = (hoja, celda.upper())
+
+        previo = self._escrito.get(clave) if self.diferencial else None
+        if (previo is None and self.diferencial
+                and n_filas * n_cols <= self.max_celdas_diferencia):
+            f0, c0 = celda_a_indices(celda)
+            rango = f"{celda}:{indices_a_celda(f0 + n_filas - 1, c0 + n_cols - 1)}"
+            previo = [[_valor(v) for v in fila] for fila in self.leer(hoja, rango)]
+
+        sh = self.hoja(hoja)
+        if previo is not None and len(previo) == n_filas and len(previo[0]) == n_cols:
+            cambios = _rectangulo_cambios(previo, nuevo)
+            if cambios is None:
+                self.estadisticas["omitidas"] += 1
+                return 0
+            i0, j0, i1, j1 = cambios
+            bloque = [fila[j0:j1 + 1] for fila in nuevo[i0:i1 + 1]]
+            sh[celda].offset(i0, j0).value = bloque
+        else:
+            bloque = nuevo
+            sh[celda].value = nuevo
+        self._escrito[clave] = nuevo
+        escritas = len(bloque) * len(bloque[0])
+        self.estadisticas["escrituras"] += 1
+        self.estadisticas["celdas_escritas"] += escritas
+        return escritas
+
+    def escribir_tabla(self, hoja, celda, df):
+        """
+        DataFrame con encabezado desde celda, en una escritura.
+
+        Borra las filas que sobran si la tabla anterior era más larga. Las
+        tablas no se comparan celda a celda: se escriben siempre.
+        """
+        import pandas as pd
+
+        sh = self.hoja(hoja)
+        clave = (hoja, celda.upper())
+        forma_nueva = (len(df) + 1, len(df.columns))
+        forma_previa = self._escrito.get(clave)
+        if forma_previa is None:
+            forma_previa = sh[celda].expand("table").shape
+            self.estadisticas["lecturas"] += 1
+
+        sh[celda].options(pd.DataFrame, index=False).value = df
+        self.estadisticas["escrituras"] += 1
+        self.estadisticas["celdas_escritas"] += forma_nueva[0] * forma_nueva[1]
+
+        # Filas y columnas de la corrida anterior que quedaron fuera
+        f0, c0 = celda_a_indices(celda)
+        sobra_f, sobra_c = forma_previa[0] - forma_nueva[0], forma_previa[1] - forma_nueva[1]
+        if sobra_f > 0:
+            ini = indices_a_celda(f0 + forma_nueva[0], c0)
+            fin = indices_a_celda(f0 + forma_previa[0] - 1, c0 + max(forma_previa[1], forma_nueva[1]) - 1)
+            sh[f"{ini}:{fin}"].clear_contents()
+            self.estadisticas["escrituras"] += 1
+        if sobra_c > 0:
+            ini = indices_a_celda(f0, c0 + forma_nueva[1])
+            fin = indices_a_celda(f0 + forma_nueva[0] - 1, c0 + forma_previa[1] - 1)
+            sh[f"{ini}:{fin}"].clear_contents()
+            self.estadisticas["escrituras"] += 1
+        self._escrito[clave] = forma_nueva
+
+    def limpiar(self, hoja, celda):
+        """Borra la tabla contigua que empieza en celda (si hay una), en una llamada."""
+        self.hoja(hoja)[celda].expand("table").clear_contents()
+        self._escrito.pop((hoja, celda.upper()), None)
+        self.estadisticas["escrituras"] += 1
+
+    def imagen(self, hoja, nombre, figura, celda):
+        """Inserta o reemplaza (por nombre) una figura o un PNG anclado en celda."""
+        sh = self.hoja(hoja)
+        r = sh.range(celda)
+        sh.pictures.add(figura, name=nombre, update=True, left=r.left, top=r.top)
+        self.estadisticas["escrituras"] += 1
+
+    def existe_imagen(self, hoja, nombre):
+        """True si hoja tiene una imagen con ese nombre (una llamada, sin recorrer pictures)."""
+        self.estadisticas["lecturas"] += 1
+        return nombre in self.hoja(hoja).pictures
+
+    def imagenes(self, hoja):
+        """Nombres de las imágenes de hoja (recorre hoja.pictures: una llamada por imagen)."""
+        self.estadisticas["lecturas"] += 1
+        return [img.name for img in self.hoja(hoja).pictures]
+
+    def quitar_imagen(self, hoja, nombre):
+        """Borra la imagen nombre si existe (p. ej. al pasar a un gráfico nativo)."""
+        imagenes = self.hoja(hoja).pictures
+        self.estadisticas["lecturas"] += 1
+        if nombre in imagenes:
+            imagenes[nombre].delete()
+            self.estadisticas["escrituras"] += 1
+
+    def quitar_grafico(self, hoja, nombre):
+        """Borra el gráfico nativo nombre si existe (p. ej. al pasar a una imagen)."""
+        graficos = self.hoja(hoja).charts
+        self.estadisticas["lecturas"] += 1
+        if nombre in graficos:
+            graficos[nombre].delete()
+            self.estadisticas["escrituras"] += 1
+
+    def grafico(self, hoja, nombre, fuente, celda, ancho, alto, tipo="xy_scatter"):
+        """
+        Gráfico nativo de Excel enlazado al rango fuente, anclado en celda.
+
+        Si ya existe uno con ese nombre solo se actualiza la fuente.
+        Retorna (gráfico, nuevo).
+        """
+        graficos = self.hoja(hoja).charts
+        self.estadisticas["lecturas"] += 1
+        nuevo = nombre not in graficos
+        if not nuevo:
+            grafico = graficos[nombre]
+        else:
+            r = self.hoja(hoja).range(celda)
+            grafico = graficos.add(left=r.left, top=r.top, width=ancho, height=alto)
+            grafico.name = nombre
+            grafico.chart_type = tipo
+        grafico.set_source_data(fuente)
+        self.estadisticas["escrituras"] += 1
+        return grafico, nuevo
@@ -0,0 +1,350 @@
+#Libro de Excel en memoria (sin Excel ni xlwings)
+#Implementa el subconjunto de la API de xlwings que usan pvt_controller y
+#excel_io.PasarelaExcel: wb.sheets[nombre], hoja["B5"] / hoja["B5:B13"].value,
+#hoja.range("H2").left/.top, .options(pd.DataFrame, index=False,
+#expand="table"), .options(ndim=2, expand="table"), .offset(f, c),
+#.expand("table").shape, .clear_contents(), hoja.pictures (add/delete/
+#iteración/"nombre in") y hoja.charts (add, name, chart_type,
+#set_source_data con rangos de varias áreas "A1:A9,D1:D9"). Sirve para
+#ejecutar los macros en benchmarks y pruebas en Linux sin un libro abierto.
+#
+#Cada operación que en xlwings es un viaje de ida y vuelta a Excel se cuenta
+#en wb.llamadas y, si se da latencia, espera ese tiempo, para medir el efecto
+#de agrupar lecturas y escrituras. Las figuras se renderizan a PNG igual que
+#en xlwings, así que el costo de los gráficos queda incluido. numpy y pandas
+#no se importan aquí: un valor solo puede ser un DataFrame o un ndarray si el
+#que llama ya los importó, así que basta con buscarlos en sys.modules.
+
+import collections
+import io
+import sys
+import time
+
+from Controller.excel_io import celda_a_indices
+
+# Tamaño por defecto de las celdas de Excel en puntos (left/top)
+ANCHO_COLUMNA = 48.0
+ALTO_FILA = 15.0
+
+
+def _a_celda(v):
+    """Valor de Python/numpy -> valor de celda (NaN y NaT quedan vacíos)."""
+    if hasattr(v, "item") and type(v).__module__ == "numpy":
+        v = v.item()
+    if isinstance(v, float) and v != v:
+        return None
+    return v
+
+
+class RangoMemoria:
+    """Rango anclado en (fila, col) con forma (filas, columnas)."""
+
+    def __init__(self, hoja, fila, col, filas=1, columnas=1, opciones=None):
+        self.hoja = hoja
+        self.row, self.column = fila, col
+        self.filas, self.columnas = filas, columnas
+        self._opciones = opciones or {}
+
+    def options(self, convert=None, **opciones):
+        opciones = dict(self._opciones, **opciones)
+        if convert is not None:
+            opciones["convert"] = convert
+        return RangoMemoria(self.hoja, self.row, self.column, self.filas, self.columnas, opciones)
+
+    def offset(self, row_offset=0, column_offset=0):
+        return RangoMemoria(self.hoja, self.row + row_offset, self.column + column_offset,
+                            self.filas, self.columnas, self._opciones)
+
+    @property
+    def left(self):
+        self.hoja.libro.llamada("posicion")
+        return (self.column - 1) * ANCHO_COLUMNA
+
+    @property
+    def top(self):
+        self.hoja.libro.llamada("posicion")
+        return (self.row - 1) * ALTO_FILA
+
+    @property
+    def shape(self):
+        return self.filas, self.columnas
+
+    def expand(self, mode="table"):
+        """Rango con la forma de la tabla contigua desde el ancla."""
+        self.hoja.libro.llamada("leer")
+        filas, columnas = RangoMemoria(self.hoja, self.row, self.column,
+                                       opciones={"expand": "table"})._forma()
+        if self.hoja.celdas.get((self.row, self.column)) is None:
+            filas = columnas = 1
+        return RangoMemoria(self.hoja, self.row, self.column, filas, columnas, self._opciones)
+
+    def clear_contents(self):
+        self.hoja.libro.llamada("escribir")
+        self.hoja.escribir(self.row, self.column, [[None] * self.columnas] * self.filas)
+
+    # =========================
+    # Lectura
+    # =========================
+    def _forma(self):
+        """Forma del rango, expandida como la tabla contigua si expand='table'."""
+        if self._opciones.get("expand") != "table":
+            return self.filas, self.columnas
+        celdas = self.hoja.celdas
+        columnas = 0
+        while celdas.get((self.row, self.column + columnas)) is not None:
+            columnas += 1
+        filas = 0
+        while celdas.get((self.row + filas, self.column)) is not None:
+            filas += 1
+        return max(filas, 1), max(columnas, 1)
+
+    @property
+    def value(self):
+        self.hoja.libro.llamada("leer")
+        filas, columnas = self._forma()
+        celdas = self.hoja.celdas
+        datos = [[celdas.get((self.row + i, self.column + j)) for j in range(columnas)]
+                 for i in range(filas)]
+        pd = sys.modules.get("pandas")
+        if pd is not None and self._opciones.get("convert") is pd.DataFrame:
+            return pd.DataFrame(datos[1:], columns=datos[0])
+        if self._opciones.get("ndim") == 2:
+            return datos
+        if filas == 1 and columnas == 1:
+            return datos[0][0]
+        if filas == 1 or columnas == 1:
+            return [v for fila in datos for v in fila]
+        return datos
+
+    # =========================
+    # Escritura
+    # =========================
+    @value.setter
+    def value(self, valor):
+        self.hoja.libro.llamada("escribir")
+        pd, np = sys.modules.get("pandas"), sys.modules.get("numpy")
+        if pd is not None and isinstance(valor, pd.DataFrame):
+            if self._opciones.get("index", True):
+                valor = valor.reset_index()
+            filas = [list(valor.columns)] if self._opciones.get("header", True) else []
+            filas += valor.to_numpy(dtype=object).tolist()
+        elif np is not None and isinstance(valor, np.ndarray):
+            filas = np.atleast_2d(valor).tolist()
+        elif isinstance(valor, (list, tuple)):
+            filas = [list(f) if isinstance(f, (list, tuple)) else [f] for f in valor] \
+                if valor and isinstance(valor[0], (list, tuple)) else [list(valor)]
+        else:
+            filas = [[valor]]
+        self.hoja.escribir(self.row, self.column, filas)
+
+
+class ImagenMemoria:
+    """Imagen insertada en la hoja: nombre, posición y PNG renderizado."""
+
+    def __init__(self, coleccion, nombre, left, top, png):
+        self._coleccion = coleccion
+        self.name, self.left, self.top, self.png = nombre, left, top, png
+
+    def delete(self):
+        self._coleccion.libro.llamada("imagenes")
+        self._coleccion._imagenes.remove(self)
+
+
+class ImagenesMemoria:
+    """hoja.pictures: iterable, add(fig, name=..., update=..., left=..., top=...)."""
+
+    def __init__(self, libro):
+        self.libro = libro
+        self._imagenes = []
+
+    def __iter__(self):
+        # xlwings consulta cada imagen a Excel
+        for img in list(self._imagenes):
+            self.libro.llamada("imagenes")
+            yield img
+
+    def __len__(self):
+        return len(self._imagenes)
+
+    def __getitem__(self, nombre):
+        for img in self._imagenes:
+            if img.name == nombre:
+                return img
+        raise KeyError(nombre)
+
+    def __contains__(self, nombre):
+        self.libro.llamada("imagenes")
+        return any(img.name == nombre for img in self._imagenes)
+
+    def add(self, fig, name=None, update=False, left=0.0, top=0.0, **_):
+        """fig: figura de matplotlib o ruta de un PNG, como en xlwings."""
+        self.libro.llamada("imagenes")
+        buf = io.BytesIO()
+        if isinstance(fig, str):
+            with open(fig, "rb") as f:
+                buf.write(f.read())
+        else:
+            fig.savefig(buf, format="png")
+        if update and name is not None:
+            for img in list(self._imagenes):
+                if img.name == name:
+                    self._imagenes.remove(img)
+        img = ImagenMemoria(self, name or f"Picture {len(self._imagenes) + 1}", left, top,
+                            buf.getvalue())
+        self._imagenes.append(img)
+        return img
+
+
+class GraficoMemoria:
+    """Gráfico nativo: nombre, tipo, posición, tamaño y rango de datos."""
+
+    def __init__(self, coleccion, nombre, left, top, width, height):
+        self._coleccion = coleccion
+        self.name, self.chart_type = nombre, None
+        self.left, self.top, self.width, self.height = left, top, width, height
+        self.fuente = None
+
+    def set_source_data(self, fuente):
+        self._coleccion.libro.llamada("graficos")
+        self.fuente = fuente
+
+    def delete(self):
+        self._coleccion.libro.llamada("graficos")
+        self._coleccion._graficos.remove(self)
+
+
+class GraficosMemoria:
+    """hoja.charts: add(left, top, width, height), acceso por nombre y "nombre in"."""
+
+    def __init__(self, libro):
+        self.libro = libro
+        self._graficos = []
+
+    def __iter__(self):
+        return iter(list(self._graficos))
+
+    def __len__(self):
+        return len(self._graficos)
+
+    def __getitem__(self, nombre):
+        for g in self._graficos:
+            if g.name == nombre:
+                return g
+        raise KeyError(nombre)
+
+    def __contains__(self, nombre):
+        self.libro.llamada("graficos")
+        return any(g.name == nombre for g in self._graficos)
+
+    def add(self, left=0.0, top=0.0, width=355.0, height=211.0):
+        self.libro.llamada("graficos")
+        g = GraficoMemoria(self, f"Chart {len(self._graficos) + 1}", left, top, width, height)
+        self._graficos.append(g)
+        return g
+
+
+class AreasMemoria:
+    """Rango de varias áreas ("A1:A9,D1:D9"); solo sirve como fuente de gráficos."""
+
+    def __init__(self, areas):
+        self.areas = areas
+
+    @property
+    def shape(self):
+        return self.areas[0].filas, sum(a.columnas for a in self.areas)
+
+
+class HojaMemoria:
+    """Hoja con las celdas en un dict (fila, col) -> valor; las vacías no se guardan."""
+
+    def __init__(self, nombre, libro):
+        self.name = nombre
+        self.libro = libro
+        self.celdas = {}
+        self.pictures = ImagenesMemoria(libro)
+        self.charts = GraficosMemoria(libro)
+
+    def __getitem__(self, celda):
+        return self.range(celda)
+
+    def range(self, celda):
+        if "," in celda:
+            return AreasMemoria([self.range(a.strip()) for a in celda.split(",")])
+        if ":" in celda:
+            a, b = celda.split(":")
+            (f1, c1), (f2, c2) = celda_a_indices(a), celda_a_indices(b)
+            return RangoMemoria(self, f1, c1, f2 - f1 + 1, c2 - c1 + 1)
+        return RangoMemoria(self, *celda_a_indices(celda))
+
+    def escribir(self, fila, col, filas):
+        """Escribe una tabla 2D (lista de filas) desde (fila, col)."""
+        celdas = self.celdas
+        for i, valores in enumerate(filas):
+            for j, v in enumerate(valores):
+                v = _a_celda(v)
+                if v is None:
+                    celdas.pop((fila + i, col + j), None)
+                else:
+                    celdas[(fila + i, col + j)] = v
+
+    def clear(self):
+        self.celdas.clear()
+
+
+class HojasMemoria:
+    """wb.sheets: acceso por nombre o posición, iteración sobre hojas y add(nombre)."""
+
+    def __init__(self, nombres, libro):
+        self.libro = libro
+        self._hojas = {n: HojaMemoria(n, libro) for n in nombres}
+
+    def __getitem__(self, clave):
+        if isinstance(clave, int):
+            return list(self._hojas.values())[clave]
+        return self._hojas[clave]
+
+    def __iter__(self):
+        return iter(list(self._hojas.values()))
+
+    def __len__(self):
+        return len(self._hojas)
+
+    def add(self, name=None, **_):
+        name = name or f"Sheet{len(self._hojas) + 1}"
+        if name in self._hojas:
+            raise ValueError(f"La hoja ya existe: {name}")
+        self._hojas[name] = HojaMemoria(name, self.libro)
+        return self._hojas[name]
+
+
+class LibroMemoria:
+    """
+    Stand-in de xw.Book con hojas en memoria.
+
+    latencia : float, segundos de espera por cada viaje a "Excel"
+    """
+
+    def __init__(self, hojas=("Summary", "Results", "MonteCarlo"), latencia=0.0):
+        self.sheets = HojasMemoria(hojas, self)
+        self.latencia = latencia
+        self.llamadas = collections.Counter()
+
+    def llamada(self, tipo):
+        self.llamadas[tipo] += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+
+def libro_con_entradas(entradas, hojas=("Summary", "Results", "MonteCarlo"), latencia=0.0):
+    """LibroMemoria con las entradas (B5..B13) y el ajuste (B15..B19) escritos en Summary."""
+    celdas = {"pb": "B5", "rsb": "B6", "api": "B7", "sg_gas": "B8", "pr": "B9",
+              "tr": "B10", "seed": "B12", "n_points": "B13", "rs_mult": "B15",
+              "rs_exp": "B16", "bo_mult": "B17", "mu_a": "B18", "mu_b": "B19"}
+    wb = LibroMemoria(hojas)
+    for k, celda in celdas.items():
+        if k in entradas:
+            wb.sheets["Summary"][celda].value = entradas[k]
+    # La preparación no cuenta como llamadas del macro
+    wb.llamadas.clear()
+    wb.latencia = latencia
+    return wb
@@ -0,0 +1,343 @@
+#Ejecución del flujo PVT sin Excel
+#Lee las mismas entradas que la hoja Summary (pb, rsb, API, sg_gas, Pr, T,
+#seed, n_points) desde CSV o JSON y escribe la tabla Results y el resumen
+#determinístico en Pr como CSV o Parquet. pvt_controller.main usa run_pvt,
+#así que ambos caminos dan resultados idénticos para la misma semilla.
+#
+#Con --disco las realizaciones se calculan por bloques y Results se escribe
+#en un almacén columnar (model/almacen.py), así que n_points solo está
+#limitado por el disco; se escriben además una vista previa y estadísticas.
+#
+#Uso:
+#   python Controller/pvt_batch.py entradas.json -o salida --format csv
+#   python Controller/pvt_batch.py entradas.json -o salida --disco npy
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Ajustar ruta para importar model
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from Controller.entradas import (  # noqa: F401 (reexportadas para pvt_multi y otros)
+    ENTRADAS, ADICIONALES, ALIAS, RESUMEN, normalizar_entradas, resumen_pr,
+)
+from Controller.tiempos import INACTIVO
+from model.backends import BACKENDS, evaluar_pvt, set_backend
+from model.correlaciones import calc_todas
+from model.pvt_engine import COLUMNAS
+from model.diagnostics import NOMBRES, codigos_pvt, contar_codigos
+from model.gas import propiedades_gas
+from model.water import propiedades_agua
+from model.almacen import FORMATOS as FORMATOS_DISCO, EscritorColumnas
+from model.montecarlo import StreamingStats, guardar_resumen
+from model.pvt_result import PRECISIONES, PVTResult, precision
+from model.random_streams import BLOQUE, uniformes
+
+# Columnas de la hoja Results: P, T, propiedades del petróleo y del gas
+COLUMNAS_ACEITE = (
+    "Rs (scf/stb)",
+    "Bo (rb/stb)",
+    "Co (1/psia)",
+    "rho (lb/ft3)",
+    "mu_o (cp)",
+)
+COLUMNAS_GAS = (
+    "Z",
+    "Bg (rb/scf)",
+    "mu_g (cp)",
+    "rho_g (lb/ft3)",
+)
+COLUMNAS_AGUA = (
+    "Bw (rb/stb)",
+    "Rsw (scf/stb)",
+    "mu_w (cp)",
+    "cw (1/psia)",
+)
+COLUMNAS_RESULTS = ("P (psia)", "T (F)") + COLUMNAS_ACEITE + COLUMNAS_GAS + COLUMNAS_AGUA
+
+# Realizaciones por bloque de cálculo (múltiplo del bloque de los flujos
+# aleatorios) y filas de la vista previa de run_pvt_disco para Excel
+BLOQUE_RESULTS = 4 * BLOQUE
+N_VISTA = 10_000
+
+
+def leer_entradas(ruta):
+    """
+    Lee las entradas desde un archivo .json (objeto clave: valor) o .csv.
+
+    El CSV puede tener una fila con encabezados (pb,rsb,api,...) o dos
+    columnas clave,valor como en la hoja Summary.
+    """
+    if ruta.lower().endswith(".json"):
+        with open(ruta, encoding="utf-8") as f:
+            return normalizar_entradas(json.load(f))
+
+    df = pd.read_csv(ruta, header=None)
+    claves = df.iloc[:, 0].astype(str).str.strip().str.lower()
+    if {"pb", "rsb"} <= set(claves):
+        # Formato clave,valor como en la hoja Summary
+        return normalizar_entradas(dict(zip(claves, df.iloc[:, 1])))
+
+    # Una fila con encabezados
+    df = pd.read_csv(ruta)
+    if len(df) != 1:
+        raise ValueError("El CSV de entradas debe tener una sola fila de datos")
+    return normalizar_entradas(df.iloc[0].to_dict())
+
+
+def _columnas_bloque(entradas, fluido, inicio, n, tiempos=INACTIVO):
+    """
+    Columnas de Results (en el orden de COLUMNAS_RESULTS) para las
+    realizaciones [inicio, inicio + n). Los flujos aleatorios son por bloque,
+    así que cualquier partición da las mismas filas que una sola llamada.
+    """
+    pb, pr, tr = entradas["pb"], entradas["pr"], entradas["tr"]
+
+    # Presiones aleatorias por debajo y por encima de Pb, con flujos por
+    # bloque derivados de la semilla (independientes del particionado)
+    p_min = max(14.7, 0.1 * pb)
+    p_max = max(pb * 1.2, pr)
+    with tiempos.etapa("presiones"):
+        P = uniformes(entradas["seed"], n, p_min, p_max, inicio=inicio)
+        T = np.full_like(P, tr, dtype=float)
+
+    # Con el backend "numpy" esto equivale a fluido.evaluate(P); los
+    # backends no conocen el ajuste, así que un fluido calibrado usa FluidModel
+    with tiempos.etapa("aceite"):
+        if fluido.ajuste:
+            aceite = fluido.evaluate(P)
+        else:
+            aceite = evaluar_pvt(P, pb, fluido.rsb, fluido.api, fluido.sg_gas, tr,
+                                 fluido.sgo, fluido.psep, fluido.tsep)
+
+    # Gas: Z se resuelve una vez y lo comparten Bg, mu_g y rho_g
+    with tiempos.etapa("gas"):
+        gas = propiedades_gas(P, tr, fluido.sg_gas)
+    # Agua de formación con la salinidad de las entradas (% en peso de NaCl)
+    with tiempos.etapa("agua"):
+        agua = propiedades_agua(P, tr, entradas["salinidad"])
+
+    return (P, T) + tuple(aceite) + tuple(gas) + tuple(agua)
+
+
+def run_pvt(entradas, tiempos=INACTIVO, dtype=np.float64, bloque=BLOQUE_RESULTS):
+    """
+    Ejecuta el flujo completo de pvt_controller.main sin Excel.
+
+    Parámetros
+    ----------
+    entradas : dict
+        Salida de normalizar_entradas / leer_entradas.
+    tiempos : Tiempos, opcional
+        Cronometra las etapas internas (ver Controller/tiempos.py).
+    dtype : "float64" o "float32"
+        Precisión de la tabla (el cálculo es siempre en float64).
+    bloque : int
+        Realizaciones por bloque: la tabla se llena por bloques, así que los
+        temporales del cálculo no crecen con n_points.
+
+    Retorna
+    -------
+    resumen : dict
+        Etiqueta -> valor del resumen determinístico en Pr (None si es inválido).
+    resultado : PVTResult
+        Tabla Results con una fila por realización (to_dataframe() da un
+        DataFrame sin copiar las columnas).
+    fluido : FluidModel
+        Modelo del fluido usado en el cálculo.
+    """
+    n = entradas["n_points"]
+    with tiempos.etapa("resumen Pr"):
+        resumen, fluido = resumen_pr(entradas)
+
+    resultado = PVTResult(COLUMNAS_RESULTS, n, dtype)
+    for inicio in range(0, n, bloque):
+        with tiempos.etapa(f"bloque {inicio // bloque}"):
+            m = min(bloque, n - inicio)
+            resultado.llenar(inicio, _columnas_bloque(entradas, fluido, inicio, m, tiempos))
+    return resumen, resultado, fluido
+
+
+def run_pvt_disco(entradas, ruta, formato="npy", bloque=BLOQUE_RESULTS, n_vista=N_VISTA,
+                  dtype=np.float64, tiempos=INACTIVO):
+    """
+    Igual que run_pvt, pero las realizaciones se calculan por bloques y se
+    escriben en un almacén columnar en disco (model/almacen.py) en lugar de
+    una tabla en memoria. La memoria depende de bloque y no de n_points.
+
+    Parámetros
+    ----------
+    ruta : str
+        Carpeta (formato "npy") o archivo .parquet del almacén.
+    bloque : int
+        Realizaciones por bloque.
+    n_vista : int
+        Filas como máximo de la vista previa (una de cada ceil(n / n_vista)).
+    dtype : "float64" o "float32"
+        Precisión del almacén y de la vista previa.
+
+    Retorna
+    -------
+    resumen : dict
+        Resumen determinístico en Pr, como en run_pvt.
+    vista : PVTResult
+        Filas equiespaciadas de Results, para Excel y los gráficos.
+    estadisticas : dict
+        Columna -> StreamingStats sobre todas las realizaciones.
+    fluido : FluidModel
+    """
+    n = entradas["n_points"]
+    with tiempos.etapa("resumen Pr"):
+        resumen, fluido = resumen_pr(entradas)
+
+    paso = max(1, -(-n // n_vista))
+    estadisticas = {c: StreamingStats() for c in COLUMNAS_RESULTS}
+    vista = PVTResult(COLUMNAS_RESULTS, -(-n // paso), dtype)
+    with EscritorColumnas(ruta, COLUMNAS_RESULTS, n, formato, precision(dtype)) as escritor:
+        for inicio in range(0, n, bloque):
+            m = min(bloque, n - inicio)
+            with tiempos.etapa(f"bloque {inicio // bloque}"):
+                columnas = _columnas_bloque(entradas, fluido, inicio, m, tiempos)
+                with tiempos.etapa("escribir"):
+                    escritor.escribir(inicio, columnas)
+                with tiempos.etapa("estadisticas"):
+                    for v, s in zip(columnas, estadisticas.values()):
+                        s.update(v)
+                    # Filas globales múltiplo de paso que caen en este bloque
+                    primera = -inicio % paso
+                    vista.llenar((inicio + primera) // paso,
+                                 [v[primera::paso] for v in columnas])
+    return resumen, vista, estadisticas, fluido
+
+
+def diagnosticar(resultado, fluido):
+    """Código de error por fila de la tabla Results (PVTResult o DataFrame)."""
+    columnas = [np.asarray(resultado[c]) for c in COLUMNAS_ACEITE]
+    # Las presiones en float64, como en el cálculo (la tabla puede ser float32)
+    return codigos_pvt(np.asarray(resultado[COLUMNAS_RESULTS[0]], dtype=float), fluido.pb, fluido.rsb,
+                       fluido.api, fluido.sg_gas, fluido.T, fluido.sgo,
+                       fluido.psep, fluido.tsep, columnas=columnas)
+
+
+def tabla_correlaciones(resultado, fluido):
+    """
+    Todas las variantes de las correlaciones en las presiones de Results (QA).
+
+    Las variantes son las correlaciones publicadas; si fluido tiene ajuste,
+    las columnas por régimen (rs, bo, co, rho, mu_o) son las de
+    fluido.evaluate, igual que en Results.
+    """
+    P = np.asarray(resultado[COLUMNAS_RESULTS[0]], dtype=float)
+    todas = calc_todas(P, fluido.pb, fluido.rsb, fluido.api, fluido.sg_gas, fluido.T,
+                       fluido.sgo, fluido.psep, fluido.tsep)
+    if fluido.ajuste:
+        todas.update(zip(COLUMNAS, fluido.evaluate(P)))
+    return pd.DataFrame({COLUMNAS_RESULTS[0]: P, **todas})
+
+
+def escribir_salidas(resumen, resultado, carpeta, formato="csv"):
+    """
+    Escribe results.<formato> y summary.<formato> en la carpeta indicada.
+
+    resultado : PVTResult o pandas.DataFrame con la tabla Results
+    formato : "csv" o "parquet" (Parquet requiere pyarrow o fastparquet).
+    Retorna las rutas escritas.
+    """
+    if formato not in ("csv", "parquet"):
+        raise ValueError(f"Formato no soportado: {formato}")
+    os.makedirs(carpeta, exist_ok=True)
+
+    df_resumen = pd.DataFrame({"Propiedad": list(resumen),
+                               "Valor": [np.nan if v is None else v for v in resumen.values()]})
+    # DataFrame sobre las mismas columnas, sin copia
+    if isinstance(resultado, PVTResult):
+        resultado = resultado.to_dataframe()
+    rutas = []
+    for nombre, tabla in (("results", resultado), ("summary", df_resumen)):
+        ruta = os.path.join(carpeta, f"{nombre}.{formato}")
+        if formato == "csv":
+            tabla.to_csv(ruta, index=False)
+        else:
+            tabla.to_parquet(ruta, index=False)
+        rutas.append(ruta)
+    return rutas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flujo PVT sin Excel")
+    parser.add_argument("entradas", help="archivo .json o .csv con las entradas de Summary")
+    parser.add_argument("-o", "--out", default=".", help="carpeta de salida")
+    parser.add_argument("--format", default="csv", choices=("csv", "parquet"))
+    parser.add_argument("--backend", choices=tuple(BACKENDS),
+                        help="backend de cálculo (por defecto PVT_BACKEND o numpy)")
+    parser.add_argument("--correlaciones", action="store_true",
+                        help="escribe también correlaciones.<formato> con todas las variantes")
+    parser.add_argument("--disco", choices=FORMATOS_DISCO,
+                        help="calcula por bloques y escribe Results en un almacén en disco "
+                             "(npy: carpeta results/ con columnas mapeables; parquet: results.parquet)")
+    parser.add_argument("--bloque", type=int, default=BLOQUE_RESULTS,
+                        help="realizaciones por bloque de cálculo")
+    parser.add_argument("--precision", default="float64", choices=tuple(PRECISIONES),
+                        help="precisión de la tabla Results (float32 usa la mitad de memoria y disco)")
+    args = parser.parse_args(argv)
+    if args.backend:
+        set_backend(args.backend)
+
+    entradas = leer_entradas(args.entradas)
+    if args.disco:
+        return _main_disco(entradas, args)
+
+    resumen, resultado, fluido = run_pvt(entradas, dtype=args.precision, bloque=args.bloque)
+    for ruta in escribir_salidas(resumen, resultado, args.out, args.format):
+        print("Escrito:", ruta)
+    if args.correlaciones:
+        ruta = os.path.join(args.out, f"correlaciones.{args.format}")
+        tabla = tabla_correlaciones(resultado, fluido)
+        if args.format == "csv":
+            tabla.to_csv(ruta, index=False)
+        else:
+            tabla.to_parquet(ruta, index=False)
+        print("Escrito:", ruta)
+
+    # Conteo de puntos inválidos por causa, en lugar de un mensaje por punto
+    conteos = contar_codigos(diagnosticar(resultado, fluido))
+    problemas = {k: conteos[k] for k in NOMBRES.values() if conteos[k]}
+    if problemas:
+        print(f"Puntos válidos: {conteos['validos']} de {conteos['total']};",
+              ", ".join(f"{k}={v}" for k, v in problemas.items()))
+
+
+def _main_disco(entradas, args):
+    """Results en el almacén, más el resumen, la vista previa y las estadísticas."""
+    ruta = os.path.join(args.out, "results" + (".parquet" if args.disco == "parquet" else ""))
+    resumen, vista, estadisticas, _ = run_pvt_disco(entradas, ruta, args.disco, args.bloque,
+                                                    dtype=args.precision)
+    print("Escrito:", ruta)
+    rutas = escribir_salidas(resumen, vista, args.out, args.format)
+    # Con --disco results.<formato> es la vista previa
+    previa = os.path.join(args.out, f"preview.{args.format}")
+    os.replace(rutas[0], previa)
+    for r in (previa, rutas[1]):
+        print("Escrito:", r)
+    ruta = os.path.join(args.out, "statistics.csv")
+    guardar_resumen(estadisticas, ruta)
+    print("Escrito:", ruta)
+
+    nan = {c: s.n_nan for c, s in estadisticas.items() if s.n_nan}
+    if nan:
+        print(f"Valores NaN en {entradas['n_points']} realizaciones:",
+              ", ".join(f"{c}={k}" for c, k in nan.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#Benchmarks de las correlaciones PVT y del flujo del controlador
+#Mide, en un equipo sin Excel:
+#   correlacion : cada función de PVT.py punto a punto (escalar) contra su
+#                 versión de PVT_vec (vector), para n = 1 ... 10^7
+#   motor       : evaluar_pvt con cada backend disponible y calc_todas
+#   flujo       : run_pvt y pvt_controller.main contra un LibroMemoria
+#   io          : lectura de Summary y escritura del resumen y de Results,
+#                 celda a celda contra PasarelaExcel, con latencia simulada
+#                 por viaje a Excel (cuenta también los viajes)
+#   importacion : tiempo de importar cada módulo en un intérprete nuevo
+#Cada caso guarda el mejor tiempo por llamada, la mediana, puntos/s y el pico
+#de memoria asignada (tracemalloc, en una corrida aparte que no se cronometra).
+#El resultado es un JSON; con --comparar se contrasta contra otro JSON (por
+#ejemplo, el del commit anterior) y el proceso termina con código 1 si algún
+#caso es más lento que el umbral.
+#
+#Uso:
+#   python Controller/pvt_benchmark.py -o bench.json
+#   python Controller/pvt_benchmark.py --rapido -o nuevo.json --comparar bench.json --umbral 1.25
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+
+# =========================
+# Ajustar ruta para importar model y Controller
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from model import PVT, PVT_vec
+from model.backends import disponibles, evaluar_pvt
+from model.correlaciones import calc_todas
+from Controller.pvt_batch import normalizar_entradas, run_pvt, run_pvt_disco
+from Controller.excel_io import PasarelaExcel
+from Controller.libro_memoria import libro_con_entradas
+
+TAMANOS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+TAMANOS_RAPIDO = (1, 100, 10_000, 1_000_000)
+# El ciclo escalar de Python no se mide por encima de este tamaño
+MAX_ESCALAR = 10_000
+# Latencia simulada por viaje a Excel (una llamada COM típica, s)
+LATENCIA = 0.001
+
+# Fluido de referencia (los mismos valores de model/main.py)
+FLUIDO = {"pb": 3970.0, "rsb": 1124.0, "api": 38.982, "sg_gas": 0.65, "sgo": 0.83,
+          "tr": 140.0, "psep": 100.0, "tsep": 120.0}
+ENTRADAS_FLUJO = {"pb": 3970.0, "rsb": 1124.0, "api": 38.982, "sg_gas": 0.65,
+                  "pr": 4409.0, "tr": 140.0, "seed": 1}
+
+# Correlación -> (función escalar, función vectorial, argumentos). Los
+# argumentos en minúscula del fluido son escalares; "p", "rs", "rho_ob",
+# "co" y "mu_ob" varían por punto, como en el flujo real.
+CORRELACIONES = {
+    "rs_standing": (PVT.rs_standing, PVT_vec.rs_standing_vec, ("api", "sg_gas", "p", "tr")),
+    "rs_velarde": (PVT.rs_velarde, PVT_vec.rs_velarde_vec,
+                   ("rsb", "sg_gas", "sgo", "pb", "p", "tr")),
+    "bo_standing": (PVT.bo_standing, PVT_vec.bo_standing_vec, ("rs", "sg_gas", "sgo", "tr")),
+    "bo_vasbeg": (PVT.bo_vasbeg, PVT_vec.bo_vasbeg_vec,
+                  ("rs", "api", "sg_gas", "tr", "psep", "tsep")),
+    "co_petrosk": (PVT.co_petrosk, PVT_vec.co_petrosk_vec, ("rsb", "sg_gas", "p", "tr", "api")),
+    "co_vasquez_beggs": (PVT.co_vasquez_beggs, PVT_vec.co_vasquez_beggs_vec,
+                         ("rsb", "sg_gas", "api", "tr", "p", "psep", "tsep")),
+    "ro_standing": (PVT.ro_standing, PVT_vec.ro_standing_vec, ("rs", "sg_gas", "sgo", "tr")),
+    "ro_subsaturado": (PVT.ro_subsaturado, PVT_vec.ro_subsaturado_vec,
+                       ("rho_ob", "co", "p", "pb")),
+    "mu_beggs_robinson": (PVT.mu_beggs_robinson, PVT_vec.mu_beggs_robinson_vec,
+                          ("api", "tr", "rs")),
+    "muo_vasquez_beggs": (PVT.muo_vasquez_beggs, PVT_vec.muo_vasquez_beggs_vec,
+                          ("mu_ob", "p", "pb")),
+}
+
+MODULOS = ("model.PVT", "model.PVT_vec", "model.pvt_engine", "model.backends",
+           "Controller.entradas", "Controller.pvt_batch", "Controller.pvt_controller")
+
+
+# =========================
+# Medición
+# =========================
+def medir(fn, n, tiempo_min=0.2, repeticiones=5, memoria=True):
+    """
+    Cronometra fn() y devuelve el registro del caso.
+
+    Cada repetición agrupa tantas llamadas como hagan falta para durar
+    tiempo_min / repeticiones (las llamadas de n pequeño duran microsegundos).
+    El tiempo por llamada es el mejor de las repeticiones.
+    """
+    t0 = time.perf_counter()
+    fn()
+    t_una = max(time.perf_counter() - t0, 1e-7)
+    llamadas = max(1, int(tiempo_min / repeticiones / t_una))
+
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        for _ in range(llamadas):
+            fn()
+        tiempos.append((time.perf_counter() - t0) / llamadas)
+
+    registro = {"n": n, "segundos": min(tiempos), "mediana": statistics.median(tiempos),
+                "llamadas": llamadas * repeticiones,
+                "puntos_por_s": n / min(tiempos)}
+    if memoria:
+        tracemalloc.start()
+        fn()
+        registro["pico_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return registro
+
+
+def _datos(n, semilla=0):
+    """Fluido escalar y columnas por punto de largo n."""
+    rng = np.random.default_rng(semilla)
+    datos = dict(FLUIDO)
+    datos["p"] = rng.uniform(100.0, 6000.0, n)
+    datos["rs"] = rng.uniform(100.0, 1200.0, n)
+    datos["rho_ob"] = rng.uniform(40.0, 50.0, n)
+    datos["co"] = rng.uniform(5e-6, 2e-5, n)
+    datos["mu_ob"] = rng.uniform(0.3, 3.0, n)
+    return datos
+
+
+def bench_correlaciones(tamanos, max_escalar, memoria, **kw):
+    registros = []
+    for n in tamanos:
+        datos = _datos(n)
+        for nombre, (escalar, vectorial, claves) in CORRELACIONES.items():
+            args = [datos[k] for k in claves]
+            vec = lambda f=vectorial, a=args: f(*a)
+            registros.append({"grupo": "correlacion", "nombre": nombre, "modo": "vector",
+                              **medir(vec, n, memoria=memoria, **kw)})
+            if n > max_escalar:
+                continue
+            # Mismos valores como floats de Python, un punto por llamada
+            puntos = list(zip(*[np.broadcast_to(a, (n,)).tolist() for a in args]))
+
+            def esc(f=escalar, puntos=puntos):
+                for a in puntos:
+                    f(*a)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                registros.append({"grupo": "correlacion", "nombre": nombre, "modo": "escalar",
+                                  **medir(esc, n, memoria=memoria, **kw)})
+    return registros
+
+
+def bench_motor(tamanos, max_escalar, memoria, **kw):
+    registros = []
+    f = FLUIDO
+    for n in tamanos:
+        p = _datos(n)["p"]
+        args = (p, f["pb"], f["rsb"], f["api"], f["sg_gas"], f["tr"], f["sgo"],
+                f["psep"], f["tsep"])
+        for backend in disponibles():
+            if backend == "python" and n > max_escalar:
+                continue
+            fn = lambda b=backend: evaluar_pvt(*args, backend=b)
+            fn()  # compilación (numba) fuera de la medición
+            registros.append({"grupo": "motor", "nombre": backend, "modo": "vector",
+                              **medir(fn, n, memoria=memoria, **kw)})
+        registros.append({"grupo": "motor", "nombre": "calc_todas", "modo": "vector",
+                          **medir(lambda: calc_todas(*args), n, memoria=memoria, **kw)})
+    return registros
+
+
+def bench_flujo(puntos, memoria, **kw):
+    """run_pvt (float64 y float32), run_pvt_disco y pvt_controller.main (con LibroMemoria) para cada n_points."""
+    from Controller import pvt_controller
+
+    registros = []
+    for n in puntos:
+        entradas = normalizar_entradas(dict(ENTRADAS_FLUJO, n_points=n))
+        registros.append({"grupo": "flujo", "nombre": "run_pvt", "modo": "vector",
+                          **medir(lambda: run_pvt(entradas), n, memoria=memoria, **kw)})
+        registros.append({"grupo": "flujo", "nombre": "run_pvt", "modo": "float32",
+                          **medir(lambda: run_pvt(entradas, dtype="float32"), n,
+                                  memoria=memoria, **kw)})
+        # Por bloques hacia disco: la memoria pico no debería crecer con n
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "results")
+            registros.append({"grupo": "flujo", "nombre": "run_pvt_disco", "modo": "bloques",
+                              **medir(lambda: run_pvt_disco(entradas, ruta), n,
+                                      memoria=memoria, **kw)})
+        # Un libro nuevo por llamada, como una ejecución desde Excel. Con la
+        # caché de gráficos vacía en cada llamada y con la caché ya llena
+        libro = lambda: libro_con_entradas(dict(ENTRADAS_FLUJO, n_points=n))
+        # patch.dict restaura PVT_GRAFICOS_CACHE (o su ausencia) al salir
+        with tempfile.TemporaryDirectory() as cache, \
+                mock.patch.dict(os.environ, {"PVT_GRAFICOS_CACHE": cache}):
+
+            def sin_cache():
+                shutil.rmtree(cache, ignore_errors=True)
+                pvt_controller.main(libro())
+
+            casos = (("vector", sin_cache), ("cache", lambda: pvt_controller.main(libro())))
+            for modo, clic in casos:
+                registro = {"grupo": "flujo", "nombre": "pvt_controller", "modo": modo}
+                try:
+                    registro.update(medir(clic, n, memoria=memoria, **kw))
+                except ImportError as e:
+                    # Los gráficos necesitan matplotlib
+                    registro.update(n=n, omitido=str(e))
+                registros.append(registro)
+    return registros
+
+
+def _io_celda_a_celda(wb, resumen, df):
+    """Patrón anterior de pvt_controller.main: una llamada por celda."""
+    import pandas as pd
+    sh_sum, sh_res = wb.sheets["Summary"], wb.sheets["Results"]
+    for celda in ("B5", "B6", "B7", "B8", "B9", "B10", "B12", "B13"):
+        sh_sum[celda].value
+    for fila, (etiqueta, valor) in enumerate(resumen.items(), start=5):
+        sh_sum[f"C{fila}"].value = etiqueta
+        sh_sum[f"D{fila}"].value = valor
+    sh_res["A1"].options(pd.DataFrame, index=False, expand="table").value = df
+
+
+def _io_pasarela(wb, resumen, df):
+    """Mismas lecturas y escrituras con PasarelaExcel."""
+    from Controller.pvt_controller import CELDAS_ENTRADAS, RANGO_ENTRADAS
+    es = PasarelaExcel(wb)
+    es.leer_dict("Summary", RANGO_ENTRADAS, CELDAS_ENTRADAS)
+    es.escribir("Summary", "C5", [[k, v] for k, v in resumen.items()])
+    es.escribir_tabla("Results", "A1", df)
+
+
+def bench_io(puntos, latencia, memoria, **kw):
+    """
+    E/S de un clic contra LibroMemoria con latencia por viaje:
+    celda a celda, con la pasarela sobre un libro vacío y repitiendo la
+    corrida sobre un libro que ya tiene los mismos valores.
+    """
+    registros = []
+    for n in puntos:
+        entradas = normalizar_entradas(dict(ENTRADAS_FLUJO, n_points=n))
+        resumen, resultado, _ = run_pvt(entradas)
+        df = resultado.to_dataframe()
+        casos = (("celda_a_celda", _io_celda_a_celda, False),
+                 ("pasarela", _io_pasarela, False),
+                 ("pasarela_sin_cambios", _io_pasarela, True))
+        for nombre, fn, repetir in casos:
+            def clic(fn=fn, repetir=repetir):
+                wb = libro_con_entradas(ENTRADAS_FLUJO)
+                if repetir:
+                    fn(wb, resumen, df)
+                    wb.llamadas.clear()
+                wb.latencia = latencia
+                fn(wb, resumen, df)
+                return wb
+
+            registro = {"grupo": "io", "nombre": nombre, "modo": f"latencia={latencia}"}
+            registro.update(medir(clic, n, memoria=memoria, **kw))
+            registro["viajes"] = sum(clic().llamadas.values())
+            registros.append(registro)
+    return registros
+
+
+def bench_importacion(modulos=MODULOS, repeticiones=3):
+    """Tiempo de import en un intérprete nuevo (el mejor de varias corridas)."""
+    codigo = ("import sys, time; sys.path.insert(0, {raiz!r}); t = time.perf_counter(); "
+              "import {mod}; print(time.perf_counter() - t)")
+    registros = []
+    for mod in modulos:
+        tiempos, error = [], None
+        for _ in range(repeticiones):
+            r = subprocess.run([sys.executable, "-c", codigo.format(raiz=ROOT_DIR, mod=mod)],
+                               capture_output=True, text=True, cwd=ROOT_DIR)
+            if r.returncode != 0:
+                error = r.stderr.strip().splitlines()[-1] if r.stderr.strip() else "error"
+                break
+            tiempos.append(float(r.stdout.strip().splitlines()[-1]))
+        registro = {"grupo": "importacion", "nombre": mod, "modo": "import", "n": 1}
+        if error:
+            registro["omitido"] = error
+        else:
+            registro.update(segundos=min(tiempos), mediana=statistics.median(tiempos),
+                            llamadas=repeticiones)
+        registros.append(registro)
+    return registros
+
+
+def metadatos():
+    """Commit, versiones y equipo, para saber qué se está comparando."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=ROOT_DIR).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# =========================
+# Comparación entre corridas
+# =========================
+def _clave(r):
+    return (r["grupo"], r["nombre"], r["modo"], r["n"])
+
+
+def comparar(actual, base, umbral=1.25):
+    """
+    Razón de tiempos actual / base para los casos presentes en ambos.
+
+    Retorna lista de (clave, t_base, t_actual, razon, regresion) ordenada
+    de peor a mejor.
+    """
+    previos = {_clave(r): r for r in base["resultados"] if "segundos" in r}
+    filas = []
+    for r in actual["resultados"]:
+        b = previos.get(_clave(r))
+        if b is None or "segundos" not in r:
+            continue
+        razon = r["segundos"] / b["segundos"]
+        filas.append((_clave(r), b["segundos"], r["segundos"], razon, razon > umbral))
+    return sorted(filas, key=lambda f: -f[3])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks PVT")
+    parser.add_argument("-o", "--out", default="benchmark.json", help="JSON de salida")
+    parser.add_argument("--rapido", action="store_true",
+                        help=f"tamaños {TAMANOS_RAPIDO} en lugar de {TAMANOS}")
+    parser.add_argument("--tamanos", type=lambda s: int(float(s)), nargs="+")
+    parser.add_argument("--max-escalar", type=int, default=MAX_ESCALAR)
+    parser.add_argument("--grupos", nargs="+",
+                        default=["correlacion", "motor", "flujo", "io", "importacion"],
+                        choices=["correlacion", "motor", "flujo", "io", "importacion"])
+    parser.add_argument("--tiempo-min", type=float, default=0.2,
+                        help="segundos mínimos de medición por caso")
+    parser.add_argument("--sin-memoria", action="store_true", help="no medir el pico de memoria")
+    parser.add_argument("--latencia", type=float, default=LATENCIA,
+                        help="segundos por viaje a Excel en el grupo io")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--umbral", type=float, default=1.25,
+                        help="razón de tiempos a partir de la cual hay regresión")
+    args = parser.parse_args(argv)
+
+    tamanos = args.tamanos or (TAMANOS_RAPIDO if args.rapido else TAMANOS)
+    kw = {"memoria": not args.sin_memoria, "tiempo_min": args.tiempo_min}
+    resultados = []
+    t0 = time.perf_counter()
+    if "correlacion" in args.grupos:
+        resultados += bench_correlaciones(tamanos, args.max_escalar, **kw)
+    if "motor" in args.grupos:
+        resultados += bench_motor(tamanos, args.max_escalar, **kw)
+    if "flujo" in args.grupos:
+        resultados += bench_flujo([n for n in (100, 10_000) if n <= max(tamanos)] or [100], **kw)
+    if "io" in args.grupos:
+        resultados += bench_io([n for n in (100, 10_000) if n <= max(tamanos)] or [100],
+                               args.latencia, **kw)
+    if "importacion" in args.grupos:
+        resultados += bench_importacion()
+
+    # ru_maxrss está en KiB en Linux
+    salida = {"metadatos": dict(metadatos(), duracion_s=time.perf_counter() - t0,
+                                rss_max_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024),
+              "resultados": resultados}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(salida, f, indent=2)
+
+    for r in resultados:
+        if "omitido" in r:
+            print(f"{r['grupo']:12s} {r['nombre']:20s} {r['modo']:8s} n={r['n']:<9d} omitido: {r['omitido']}")
+        else:
+            vel = f"{r['puntos_por_s']:12.4g} pts/s" if "puntos_por_s" in r else ""
+            print(f"{r['grupo']:12s} {r['nombre']:20s} {r['modo']:8s} n={r['n']:<9d} "
+                  f"{r['segundos'] * 1e3:11.4f} ms {vel}")
+    print("Escrito:", args.out)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        filas = comparar(salida, base, args.umbral)
+        regresiones = [f for f in filas if f[4]]
+        for clave, tb, ta, razon, reg in filas[:20]:
+            marca = "REGRESIÓN" if reg else ""
+            print(f"{'/'.join(map(str, clave)):50s} {tb * 1e3:10.4f} -> {ta * 1e3:10.4f} ms "
+                  f"x{razon:5.2f} {marca}")
+        print(f"{len(regresiones)} regresiones de {len(filas)} casos (umbral x{args.umbral})")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#Presión de burbuja de muchas muestras de laboratorio sin Excel
+#Lee un CSV con columnas rsb, api, sg_gas y tr (una fila por muestra) y
+#escribe el mismo CSV con las columnas pb, convergido e iteraciones.
+#
+#Uso:
+#   python Controller/pvt_bubble.py muestras.csv -o muestras_pb.csv
+#   python Controller/pvt_bubble.py muestras.csv --metodo newton
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+# =========================
+# Ajustar ruta para importar model y Controller
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from Controller.pvt_batch import ALIAS
+from model.bubble_point import resolver_pb
+
+
+def calcular_pb(muestras, metodo="cerrada"):
+    """Agrega pb, convergido e iteraciones a la tabla de muestras."""
+    muestras = muestras.rename(columns=lambda c: ALIAS.get(str(c).strip().lower(),
+                                                           str(c).strip().lower()))
+    faltan = [k for k in ("rsb", "api", "sg_gas", "tr") if k not in muestras]
+    if faltan:
+        raise ValueError(f"Faltan columnas: {', '.join(faltan)}")
+
+    pb, convergido, iteraciones = resolver_pb(
+        muestras["rsb"].to_numpy(float), muestras["api"].to_numpy(float),
+        muestras["sg_gas"].to_numpy(float), muestras["tr"].to_numpy(float),
+        metodo=metodo)
+    return muestras.assign(pb=pb, convergido=convergido, iteraciones=iteraciones)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pb de Standing para muchas muestras")
+    parser.add_argument("muestras", help="CSV con rsb, api, sg_gas y tr")
+    parser.add_argument("-o", "--out", default="muestras_pb.csv", help="CSV de salida")
+    parser.add_argument("--metodo", default="cerrada", choices=("cerrada", "newton"))
+    args = parser.parse_args(argv)
+
+    tabla = calcular_pb(pd.read_csv(args.muestras), args.metodo)
+    tabla.to_csv(args.out, index=False)
+    print(f"Escrito: {args.out} ({int((~tabla['convergido']).sum())} sin solución)")
+
+
+if __name__ == "__main__":
+    main()
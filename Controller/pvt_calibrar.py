@@ -0,0 +1,62 @@
+#Calibración de las correlaciones contra muestras de laboratorio
+#Lee un CSV con una fila por medición (p, tr, api, sg_gas, sgo/pb opcionales
+#y los observados rs, bo, mu_o), ajusta los parámetros de model.calibracion
+#y escribe un JSON con el ajuste. Con --entradas el ajuste se agrega a un
+#archivo de entradas de pvt_batch, que entonces usa el fluido calibrado.
+#
+#Uso:
+#   python Controller/pvt_calibrar.py laboratorio.csv -o ajuste.json
+#   python Controller/pvt_calibrar.py laboratorio.csv --entradas entradas.json -o entradas_ajustadas.json
+
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+# =========================
+# Ajustar ruta para importar model y Controller
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from Controller.pvt_batch import ALIAS
+from model.calibracion import PARAMETROS, calibrar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibración de correlaciones PVT")
+    parser.add_argument("muestras", help="CSV de laboratorio (p, tr, api, sg_gas, rs, bo, mu_o)")
+    parser.add_argument("-o", "--out", default="ajuste.json", help="JSON de salida")
+    parser.add_argument("--entradas", help="JSON de entradas de pvt_batch al que agregar el ajuste")
+    parser.add_argument("--correlaciones", nargs="+", choices=tuple(PARAMETROS))
+    args = parser.parse_args(argv)
+
+    muestras = pd.read_csv(args.muestras)
+    muestras = muestras.rename(columns=lambda c: ALIAS.get(str(c).strip().lower(),
+                                                           str(c).strip().lower()))
+    faltan = [k for k in ("p", "tr", "api", "sg_gas") if k not in muestras]
+    if faltan:
+        raise ValueError(f"Faltan columnas: {', '.join(faltan)}")
+
+    ajuste, resumen = calibrar(muestras, args.correlaciones)
+    for c, r in resumen.items():
+        estado = "convergió" if r["convergido"] else "NO convergió"
+        print(f"{c}: n={r['n']}, rms {r['rms_inicial']:.4g} -> {r['rms_final']:.4g} "
+              f"({estado}, {r['iteraciones']} iteraciones)")
+
+    if args.entradas:
+        with open(args.entradas, encoding="utf-8") as f:
+            salida = dict(json.load(f), **ajuste)
+    else:
+        salida = ajuste
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(salida, f, indent=2)
+    print("Escrito:", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
+#Macros de Excel (xlwings) de la hoja Summary
+#   main            : flujo completo (resumen en Pr, tabla Results y gráficos)
+#                     Con más de MAX_FILAS_RESULTS realizaciones, Results
+#                     completo va a un almacén en disco (model/almacen.py) y
+#                     la hoja recibe una vista previa y las estadísticas.
+#   main_resumen    : solo el resumen determinístico en Pr (botón rápido)
+#   main_montecarlo : Monte Carlo de incertidumbre
+#xlwings abre un intérprete nuevo en cada clic, así que este módulo solo
+#importa la biblioteca estándar al cargarse: numpy, pandas, matplotlib y el
+#modelo se importan dentro de cada macro cuando hacen falta. Los gráficos
+#están en View/graficos.py. main_resumen usa
+#el worker residente (Controller/pvt_worker.py) si está corriendo y si no,
+#solo necesita numpy y FluidModel.
+
 import os
 import sys
 
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import xlwings as xw
-
 # =========================
 # Ajustar ruta para importar model.PVT
 # =========================
@@ -15,296 +23,215 @@ ROOT_DIR = os.path.dirname(BASE_DIR)
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
-from model.PVT import (
-    rs_standing,
-    rs_velarde,
-    bo_standing,
-    bo_vasbeg,
-    co_petrosk,
-    co_vasquez_beggs,
-    ro_standing,
-    ro_subsaturado,
-    mu_beggs_robinson,
-    muo_vasquez_beggs,
-)
+from Controller.excel_io import PasarelaExcel
+from Controller.pvt_worker import solicitar
+from Controller.tiempos import desde_entorno
 
 SUMMARY = "Summary"
 RESULTS = "Results"
+MONTECARLO = "MonteCarlo"
 
+# Celda donde se escribe el resumen Monte Carlo en Summary
+MC_CELDA = "A20"
 
-def main():
-    wb = xw.Book.caller()
-    sh_sum = wb.sheets[SUMMARY]
-    sh_res = wb.sheets[RESULTS]
+# Entradas en Summary!B5:B13 (B11 no se usa), parámetros de ajuste opcionales
+# de model.calibracion en B15:B19 (vacías = sin ajuste) y resumen en C5:D9
+RANGO_ENTRADAS = "B5:B19"
+CELDAS_AJUSTE = ("rs_mult", "rs_exp", "bo_mult", "mu_a", "mu_b")
+CELDAS_ENTRADAS = ("pb", "rsb", "api", "sg_gas", "pr", "tr", None, "seed", "n_points",
+                   None) + CELDAS_AJUSTE
+CELDA_RESUMEN = "C5"
 
-    # =========================
-    # 1) LEER INPUTS DESDE SUMMARY
-    # =========================
-    pb = float(sh_sum["B5"].value)      # Presión de burbuja
-    rsb = float(sh_sum["B6"].value)     # Rs en Pb
-    api = float(sh_sum["B7"].value)
-    sg_gas = float(sh_sum["B8"].value)  # γg
-    pr = float(sh_sum["B9"].value)      # Presión de referencia
-    tr = float(sh_sum["B10"].value)     # Temperatura (°F)
+# Más realizaciones que esto no se escriben en Results: se calculan por
+# bloques hacia disco (carpeta resultados/ junto al libro) y la hoja recibe
+# una vista previa de N_VISTA filas y las estadísticas desde CELDA_ESTADISTICAS
+MAX_FILAS_RESULTS = 100_000
+CELDA_ESTADISTICAS = "R1"
 
-    seed = int(sh_sum["B12"].value)     # Semilla para NumPy
-    n_points = int(sh_sum["B13"].value) # Número de realizaciones
+# Segundos que main_resumen espera al worker antes de calcular localmente
+ESPERA_WORKER = 2.0
 
-    np.random.seed(seed)
 
-    # Valores adicionales para algunas correlaciones
-    sgo = 0.82       # gravedad específica del petróleo a tanque (γo)
-    psep = 100.0     # psia
-    tsep = 120.0     # °F
+def _libro(wb):
+    """Libro que llamó a la macro; wb permite pasar otro (p. ej. LibroMemoria)."""
+    if wb is None:
+        import xlwings as xw
+        wb = xw.Book.caller()
+    return wb
 
-    # Densidad en el punto de burbuja: ρob
-    rho_pb = ro_standing(rsb, sg_gas, sgo, tr)
 
-    # =========================
-    # 2) FUNCIÓN AUXILIAR: CÁLCULO PVT EN UNA PRESIÓN P
-    # =========================
-    def calc_pvt_at_p(p):
-        """
-        Devuelve: Rs, Bo, Co, rho, mu_o en la presión p,
-        usando una correlación para P <= Pb y otra para P > Pb.
-        """
-
-        # --- 2.1 Rs ---
-        if p <= pb:
-            # Debajo de Pb: Standing
-            rs_p = rs_standing(api, sg_gas, p, tr)
-        else:
-            # Encima de Pb: Velarde (como segunda correlación de Rs)
-            rs_p = rs_velarde(rsb, sg_gas, sgo, pb, p, tr)
+def _leer_entradas(es):
+    """Valores crudos de las entradas de Summary, leídos en un solo rango."""
+    return es.leer_dict(SUMMARY, RANGO_ENTRADAS, CELDAS_ENTRADAS)
 
-        # --- 2.2 Co (compresibilidad) ---
-        if p <= pb:
-            # Región saturada: Vasquez–Beggs
-            co_p = co_vasquez_beggs(rsb, sg_gas, api, tr, p, psep, tsep)
-        else:
-            # Región subsaturada: Petrosky–Farshad
-            co_p = co_petrosk(rsb, sg_gas, p, tr, api)
 
-        # --- 2.3 Bo (factor volumétrico) ---
-        if p <= pb:
-            # Debajo de Pb: Standing
-            bo_p = bo_standing(rs_p, sg_gas, sgo, tr)
-        else:
-            # Encima de Pb: Vasquez–Beggs
-            bo_p = bo_vasbeg(rs_p, api, sg_gas, tr, psep, tsep)
+def _escribir_resumen(es, resumen):
+    """Etiquetas y valores del resumen en Pr (C5:D9) como un bloque."""
+    es.escribir(SUMMARY, CELDA_RESUMEN, [[etiqueta, valor] for etiqueta, valor in resumen.items()])
 
-        # --- 2.4 ρo (densidad del petróleo) ---
-        if p <= pb:
-            # Saturado: Standing
-            rho_p = ro_standing(rs_p, sg_gas, sgo, tr)
-        else:
-            # Subsaturado: correlación general ρo = ρob * exp(Co * (P - Pb))
-            rho_p = ro_subsaturado(rho_pb, co_p, p, pb)
 
-        # --- 2.5 μo (viscosidad del petróleo) ---
-        # Primero viscosidad saturada a partir de Rs
-        mu_ob_p = mu_beggs_robinson(api, tr, Rs=rs_p)
+def _ruta_resultados(wb):
+    """Carpeta del almacén de Results: resultados/results junto al libro."""
+    ruta_libro = getattr(wb, "fullname", None)
+    carpeta = os.path.dirname(ruta_libro) if ruta_libro and os.path.isabs(ruta_libro) else ROOT_DIR
+    return os.path.join(carpeta, "resultados", "results")
 
-        if p <= pb:
-            # Debajo de Pb: viscosidad saturada (μob)
-            mu_o_p = mu_ob_p
-        else:
-            # Encima de Pb: Vasquez–Beggs para petróleo subsaturado
-            mu_o_p = muo_vasquez_beggs(mu_ob_p, p, pb)
 
-        return rs_p, bo_p, co_p, rho_p, mu_o_p
+def main(wb=None, tiempos=None):
+    """
+    Macro del botón de Summary.
 
-    # =========================
-    # 3) CÁLCULO DETERMINÍSTICO EN Pr
-    # =========================
-    rs_pr, bo_pr, co_pr, rho_pr, mu_o_pr = calc_pvt_at_p(pr)
+    wb : libro a usar (por defecto el que llamó a la macro)
+    tiempos : Tiempos para cronometrar las etapas (por defecto según las
+              variables PVT_TIEMPOS*, ver Controller/tiempos.py)
+    """
+    wb = _libro(wb)
+    if tiempos is None:
+        tiempos = desde_entorno()
+    es = PasarelaExcel(wb)
 
-    # Escribir resultados determinísticos en Summary
-    sh_sum["C5"].value = "Rs(Pr) [scf/stb]"
-    sh_sum["C6"].value = "Bo(Pr) [rb/stb]"
-    sh_sum["C7"].value = "Co(Pr) [1/psia]"
-    sh_sum["C8"].value = "mu_o(Pr) [cp]"
-    sh_sum["C9"].value = "rho(Pr) [lb/ft3]"
-
-    sh_sum["D5"].value = rs_pr
-    sh_sum["D6"].value = bo_pr
-    sh_sum["D7"].value = co_pr
-    sh_sum["D8"].value = mu_o_pr
-    sh_sum["D9"].value = rho_pr
+    with tiempos.etapa("importar"):
+        from Controller.pvt_batch import normalizar_entradas, run_pvt, run_pvt_disco
+        from model.backends import get_backend
+        from View import graficos
 
     # =========================
-    # 4) GENERAR PRESIONES ALEATORIAS
+    # 1) LEER INPUTS DESDE SUMMARY
     # =========================
-    # Queremos puntos por debajo y por encima de Pb
-    p_min = max(14.7, 0.1 * pb)
-    p_max = max(pb * 1.2, pr)
-
-    P = np.random.uniform(low=p_min, high=p_max, size=n_points)
-    T = np.full_like(P, tr, dtype=float)
+    with tiempos.etapa("leer Summary"):
+        # pb vacía: Standing invertida (ver normalizar_entradas)
+        entradas = normalizar_entradas(_leer_entradas(es))
 
     # =========================
-    # 5) CALCULAR PVT PARA CADA P
+    # 2) CÁLCULO PVT (determinístico en Pr y realizaciones aleatorias)
     # =========================
-    Rs_list = []
-    Bo_list = []
-    Co_list = []
-    Rho_list = []
-    Mu_list = []
-
-    for p in P:
-        rs_p, bo_p, co_p, rho_p, mu_o_p = calc_pvt_at_p(p)
-        Rs_list.append(rs_p)
-        Bo_list.append(bo_p)
-        Co_list.append(co_p)
-        Rho_list.append(rho_p)
-        Mu_list.append(mu_o_p)
+    # Mismas funciones que el flujo sin Excel (Controller/pvt_batch.py)
+    en_disco = entradas["n_points"] > MAX_FILAS_RESULTS
+    with tiempos.perfilar("calculo"):
+        if en_disco:
+            ruta = _ruta_resultados(wb)
+            resumen, resultado, estadisticas, fluido = run_pvt_disco(entradas, ruta,
+                                                                     tiempos=tiempos)
+        else:
+            resumen, resultado, fluido = run_pvt(entradas, tiempos)
+
+    # Escribir resultados determinísticos en Summary
+    with tiempos.etapa("escribir Summary"):
+        _escribir_resumen(es, resumen)
 
     # =========================
-    # 6) ESCRIBIR TABLA EN HOJA RESULTS
+    # 3) ESCRIBIR TABLA EN HOJA RESULTS
     # =========================
-    df = pd.DataFrame(
-        {
-            "P (psia)": P,
-            "T (F)": T,
-            "Rs (scf/stb)": Rs_list,
-            "Bo (rb/stb)": Bo_list,
-            "Co (1/psia)": Co_list,
-            "rho (lb/ft3)": Rho_list,
-            "mu_o (cp)": Mu_list,
-        }
-    )
-
-    sh_res["A1"].options(pd.DataFrame, index=False, expand="table").value = df
+    # En disco: resultado es la vista previa y al lado van las estadísticas
+    # de todas las realizaciones. to_dataframe no copia las columnas
+    with tiempos.etapa("escribir Results"):
+        es.escribir_tabla(RESULTS, "A1", resultado.to_dataframe())
+        if en_disco:
+            from model.montecarlo import resumen_tabla
+            # Encabezado de la tabla primero: limpiar() expande por la
+            # primera fila y la primera columna
+            es.escribir(RESULTS, CELDA_ESTADISTICAS,
+                        resumen_tabla(estadisticas) +
+                        [["Resultados completos", ruta],
+                         ["Realizaciones", entradas["n_points"]],
+                         ["Filas en la vista previa", len(resultado)]])
+        else:
+            es.limpiar(RESULTS, CELDA_ESTADISTICAS)
 
     # =========================
-    # 7) GRÁFICOS
+    # 4) GRÁFICOS
     # =========================
-    sns.set_style("whitegrid")
-
-    P_arr = np.array(P)
-    Rs_arr = np.array(Rs_list)
-    Bo_arr = np.array(Bo_list)
-    Rho_arr = np.array(Rho_list)
-    Mu_arr = np.array(Mu_list)
-
-    sort_idx = np.argsort(P_arr)
-    P_sorted = P_arr[sort_idx]
-    Rs_sorted = Rs_arr[sort_idx]
-    Bo_sorted = Bo_arr[sort_idx]
-    Rho_sorted = Rho_arr[sort_idx]
-    Mu_sorted = Mu_arr[sort_idx]
-
-    # Punto de burbuja (usando Rsb para el marcador)
-    rs_pb = rsb
-    bo_pb = bo_standing(rsb, sg_gas, sgo, tr)
-    mu_ob_pb = mu_beggs_robinson(api, tr, Rs=rsb)
-
-    # ===== 7.1 Rs vs P =====
-    fig1, ax1 = plt.subplots(figsize=(6, 4))
-    ax1.scatter(P_arr, Rs_arr, color="blue", s=20, label="Datos")
-    ax1.plot(P_sorted, Rs_sorted, color="blue", linewidth=1, label="Tendencia")
-
-    ax1.scatter(pb, rs_pb, color="red", s=70, zorder=10, label="Punto de burbuja (pb)")
-    ax1.axvline(pb, color="red", linestyle="--", linewidth=1.5, label=f"pb = {pb} psia")
-
-    ax1.set_title("Solubilidad del Gas (Rs) vs Presión")
-    ax1.set_xlabel("P (psia)")
-    ax1.set_ylabel("Rs (scf/stb)")
-    ax1.grid(True)
-    ax1.legend()
-
-    for pic in sh_sum.pictures:
-        if pic.name == "Rs_vs_P":
-            pic.delete()
-    sh_sum.pictures.add(
-        fig1,
-        name="Rs_vs_P",
-        update=True,
-        left=sh_sum.range("H2").left,
-        top=sh_sum.range("H2").top,
-    )
-    plt.close(fig1)
-
-    # ===== 7.2 Bo vs P =====
-    fig2, ax2 = plt.subplots(figsize=(6, 4))
-    ax2.scatter(P_arr, Bo_arr, color="green", s=20, label="Datos")
-    ax2.plot(P_sorted, Bo_sorted, color="green", linewidth=1, label="Tendencia")
-
-    ax2.scatter(pb, bo_pb, color="red", s=70, zorder=10, label="Punto de burbuja (pb)")
-    ax2.axvline(pb, color="red", linestyle="--", linewidth=1.5, label=f"pb = {pb} psia")
-
-    ax2.set_title("Factor Volumétrico del Petróleo (Bo) vs Presión")
-    ax2.set_xlabel("P (psia)")
-    ax2.set_ylabel("Bo (rb/stb)")
-    ax2.grid(True)
-    ax2.legend()
-
-    for pic in sh_sum.pictures:
-        if pic.name == "Bo_vs_P":
-            pic.delete()
-    sh_sum.pictures.add(
-        fig2,
-        name="Bo_vs_P",
-        update=True,
-        left=sh_sum.range("H20").left,
-        top=sh_sum.range("H20").top,
-    )
-    plt.close(fig2)
-
-    # ===== 7.3 ρo vs P =====
-    fig3, ax3 = plt.subplots(figsize=(6, 4))
-    ax3.scatter(P_arr, Rho_arr, color="orange", s=20, label="Datos")
-    ax3.plot(P_sorted, Rho_sorted, color="orange", linewidth=1, label="Tendencia")
-
-    ax3.scatter(pb, rho_pb, color="red", s=70, zorder=10, label="Punto de burbuja (pb)")
-    ax3.axvline(pb, color="red", linestyle="--", linewidth=1.5, label=f"pb = {pb} psia")
-
-    ax3.set_title("Densidad del Petróleo (ρo) vs Presión")
-    ax3.set_xlabel("P (psia)")
-    ax3.set_ylabel("ρo (lb/ft³)")
-    ax3.grid(True)
-    ax3.legend()
-
-    for pic in sh_sum.pictures:
-        if pic.name == "Rho_vs_P":
-            pic.delete()
-    sh_sum.pictures.add(
-        fig3,
-        name="Rho_vs_P",
-        update=True,
-        left=sh_sum.range("H38").left,
-        top=sh_sum.range("H38").top,
-    )
-    plt.close(fig3)
-
-    # ===== 7.4 μo vs P =====
-    fig4, ax4 = plt.subplots(figsize=(6, 4))
-    ax4.scatter(P_arr, Mu_arr, color="purple", s=20, label="Datos")
-    ax4.plot(P_sorted, Mu_sorted, color="purple", linewidth=1, label="Tendencia")
-
-    ax4.scatter(pb, mu_ob_pb, color="red", s=70, zorder=10, label="Punto de burbuja (pb)")
-    ax4.axvline(pb, color="red", linestyle="--", linewidth=1.5, label=f"pb = {pb} psia")
-
-    ax4.set_title("Viscosidad del Petróleo (μo) vs Presión")
-    ax4.set_xlabel("P (psia)")
-    ax4.set_ylabel("μo (cp)")
-    ax4.grid(True)
-    ax4.legend()
-
-    for pic in sh_sum.pictures:
-        if pic.name == "Mu_vs_P":
-            pic.delete()
-    sh_sum.pictures.add(
-        fig4,
-        name="Mu_vs_P",
-        update=True,
-        left=sh_sum.range("H56").left,
-        top=sh_sum.range("H56").top,
-    )
-    plt.close(fig4)
+    # Imágenes (con caché por hash de las entradas) o gráficos nativos de
+    # Excel sobre Results, según PVT_GRAFICOS (ver View/graficos.py)
+    modo = graficos.modo_entorno()
+    with tiempos.etapa("graficos"):
+        if modo == "imagen":
+            base = graficos.clave(entradas, len(resultado), resultado.dtype,
+                                  {"backend": get_backend()})
+            graficos.graficos_imagen(es, SUMMARY, resultado, fluido, base, tiempos=tiempos)
+        elif modo == "excel":
+            graficos.graficos_excel(es, SUMMARY, RESULTS, "A1", resultado.columnas,
+                                    len(resultado))
+
+    tiempos.finalizar(wb, macro="main", n_points=entradas["n_points"], backend=get_backend(),
+                      graficos=modo)
+
+
+def main_resumen(wb=None, tiempos=None):
+    """
+    Botón rápido: solo el resumen determinístico en Pr (C5:D9).
+
+    Se calcula en el worker residente si está corriendo; si no está, no se
+    autentica o no responde en ESPERA_WORKER segundos, localmente con
+    FluidModel (sin pandas ni matplotlib).
+    """
+    wb = _libro(wb)
+    if tiempos is None:
+        tiempos = desde_entorno()
+    es = PasarelaExcel(wb)
+
+    with tiempos.etapa("leer Summary"):
+        datos = _leer_entradas(es)
+    with tiempos.perfilar("calculo"):
+        try:
+            resumen = solicitar("resumen", datos, espera=ESPERA_WORKER)
+            origen = "worker"
+        except OSError:
+            from Controller.entradas import normalizar_entradas, resumen_pr
+            resumen, _ = resumen_pr(normalizar_entradas(datos))
+            origen = "local"
+    with tiempos.etapa("escribir Summary"):
+        _escribir_resumen(es, resumen)
+
+    tiempos.finalizar(wb, macro="main_resumen", origen=origen)
+    return origen
+
+
+def main_montecarlo(wb=None, tiempos=None):
+    """
+    Monte Carlo de incertidumbre desde Excel.
+
+    Las distribuciones se leen de la hoja MonteCarlo desde A2, una fila por
+    parámetro: parametro | distribucion | a | b | c (por ejemplo
+    "api | normal | 35 | 3"). El número de realizaciones y la semilla son
+    los de Summary (B13 y B12). El resumen se escribe en Summary desde MC_CELDA.
+    Las distribuciones se evalúan con las correlaciones publicadas, así que
+    lanza ValueError si hay parámetros de ajuste en Summary (B15:B19).
+    """
+    wb = _libro(wb)
+    if tiempos is None:
+        tiempos = desde_entorno()
+    es = PasarelaExcel(wb)
+
+    with tiempos.etapa("leer MonteCarlo"):
+        distribuciones = {}
+        for fila in es.leer(MONTECARLO, "A2", expandir=True):
+            parametro, nombre = fila[0], fila[1]
+            if parametro is None:
+                continue
+            args = [float(v) for v in fila[2:] if v is not None]
+            distribuciones[str(parametro).strip()] = (str(nombre).strip(), *args)
+
+        summary = _leer_entradas(es)
+        ajuste = [k for k in CELDAS_AJUSTE if summary[k] is not None and str(summary[k]).strip()]
+        if ajuste:
+            raise ValueError("Monte Carlo no admite parámetros de ajuste "
+                             f"({', '.join(ajuste)}): vacíe Summary!B15:B19")
+        seed = int(summary["seed"])
+        n_points = int(summary["n_points"])
+
+    from model.montecarlo import run_montecarlo, resumen_tabla
+
+    with tiempos.perfilar("calculo"):
+        stats = run_montecarlo(distribuciones, n_points, seed=seed)
+    with tiempos.etapa("escribir Summary"):
+        es.escribir(SUMMARY, MC_CELDA, [["Resumen Monte Carlo"]] + resumen_tabla(stats))
+
+    tiempos.finalizar(wb, macro="main_montecarlo", n_points=n_points)
 
 
 if __name__ == "__main__":
+    import xlwings as xw
     xw.Book("PVT_App.xlsm").set_mock_caller()
     main()
 
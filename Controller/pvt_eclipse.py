@@ -0,0 +1,67 @@
+#Exportación de tablas PVT para el simulador (PVTO, PVDG y PVTW de Eclipse)
+#Lee las mismas entradas que pvt_batch (JSON o CSV de la hoja Summary) y
+#escribe un archivo de inclusión con una tabla por temperatura. La malla de
+#presiones va por defecto de max(14.7, 0.1·Pb) a max(1.2·Pb, Pr), igual que
+#las realizaciones de run_pvt. Los parámetros de ajuste de las entradas
+#(rs_mult, rs_exp, bo_mult, mu_a, mu_b) se aplican a las tablas de petróleo.
+#
+#Uso:
+#   python Controller/pvt_eclipse.py entradas.json -o pvt.inc
+#   python Controller/pvt_eclipse.py entradas.json --t-min 150 --t-max 250 --nt 5 --np 200
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# =========================
+# Ajustar ruta para importar model y Controller
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from Controller.pvt_batch import leer_entradas
+from model.eclipse import PALABRAS, escribir_eclipse
+
+
+def mallas(entradas, n_p=100, p_min=None, p_max=None, t_min=None, t_max=None, n_t=1):
+    """Presiones y temperaturas de la malla a partir de las entradas de Summary."""
+    pb, pr, tr = entradas["pb"], entradas["pr"], entradas["tr"]
+    p_min = max(14.7, 0.1 * pb) if p_min is None else p_min
+    p_max = max(1.2 * pb, pr) if p_max is None else p_max
+    t_min = tr if t_min is None else t_min
+    t_max = tr if t_max is None else t_max
+    return np.linspace(p_min, p_max, n_p), np.unique(np.linspace(t_min, t_max, n_t))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tablas PVTO/PVDG/PVTW para el simulador")
+    parser.add_argument("entradas", help="archivo .json o .csv con las entradas de Summary")
+    parser.add_argument("-o", "--out", default="pvt.inc", help="archivo de inclusión de salida")
+    parser.add_argument("--np", dest="n_p", type=int, default=100, help="nodos de presión")
+    parser.add_argument("--p-min", type=float)
+    parser.add_argument("--p-max", type=float)
+    parser.add_argument("--nt", dest="n_t", type=int, default=1, help="número de temperaturas")
+    parser.add_argument("--t-min", type=float, help="°F (por defecto, T de yacimiento)")
+    parser.add_argument("--t-max", type=float, help="°F (por defecto, T de yacimiento)")
+    parser.add_argument("--max-subsat", type=int, default=10,
+                        help="filas subsaturadas por registro de PVTO")
+    parser.add_argument("--palabras", nargs="+", default=list(PALABRAS), choices=PALABRAS)
+    args = parser.parse_args(argv)
+
+    entradas = leer_entradas(args.entradas)
+    fluido = {"api": entradas["api"], "sg_gas": entradas["sg_gas"], "sgo": entradas["sgo"],
+              "rsb": entradas["rsb"], "pb": entradas["pb"], "T": entradas["tr"],
+              "psep": entradas["psep"], "tsep": entradas["tsep"], "ajuste": entradas["ajuste"]}
+    p, t = mallas(entradas, args.n_p, args.p_min, args.p_max, args.t_min, args.t_max, args.n_t)
+
+    filas = escribir_eclipse(args.out, fluido, p, t, entradas["salinidad"], args.palabras,
+                             args.max_subsat, p_ref=entradas["pr"])
+    print(f"Escrito: {args.out} (" + ", ".join(f"{k}: {v} filas" for k, v in filas.items()) + ")")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#Monte Carlo de incertidumbre PVT sin Excel
+#Lee un JSON con las distribuciones de los parámetros y escribe el resumen
+#(momentos y P10/P50/P90 de cada propiedad) en .json o .csv.
+#
+#Ejemplo de entrada:
+#   {"n": 100000000, "seed": 1, "chunk_size": 1048576,
+#    "distribuciones": {"api": ["normal", 35, 3], "sg_gas": ["uniform", 0.6, 0.8],
+#                       "rsb": ["triangular", 800, 1100, 1400],
+#                       "pb": ["uniform", 3500, 4200], "tr": 140, "p": 4409}}
+#
+#Uso:
+#   python Controller/pvt_montecarlo.py mc.json -o resumen_mc.csv
+
+import argparse
+import json
+import os
+import sys
+
+# =========================
+# Ajustar ruta para importar model
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from model.backends import BACKENDS
+from model.montecarlo import run_montecarlo, guardar_resumen
+from model.random_streams import BLOQUE
+
+
+def leer_configuracion(ruta):
+    """Lee el JSON de configuración y convierte las listas en tuplas."""
+    with open(ruta, encoding="utf-8") as f:
+        config = json.load(f)
+    config["distribuciones"] = {
+        k: tuple(v) if isinstance(v, list) else v
+        for k, v in config["distribuciones"].items()
+    }
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo de incertidumbre PVT")
+    parser.add_argument("config", help="JSON con n, seed, chunk_size y distribuciones")
+    parser.add_argument("-o", "--out", default="resumen_mc.csv",
+                        help="archivo de salida (.csv o .json)")
+    parser.add_argument("--workers", type=int, default=1, help="procesos en paralelo")
+    parser.add_argument("--backend", choices=tuple(BACKENDS),
+                        help="backend de cálculo (por defecto PVT_BACKEND o numpy)")
+    args = parser.parse_args(argv)
+
+    config = leer_configuracion(args.config)
+    stats = run_montecarlo(config["distribuciones"], int(config["n"]),
+                           seed=config.get("seed"),
+                           chunk_size=int(config.get("chunk_size", 16 * BLOQUE)),
+                           workers=args.workers, backend=args.backend)
+    guardar_resumen(stats, args.out)
+    print("Escrito:", args.out)
+
+
+if __name__ == "__main__":
+    main()
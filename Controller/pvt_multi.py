@@ -0,0 +1,158 @@
+#Evaluación PVT de muchos fluidos (pozos / muestras) en paralelo
+#Cada fila de la tabla de entrada es un fluido con las mismas entradas de la
+#hoja Summary. Las filas se agrupan en lotes que se reparten en un pool de
+#procesos; cada lote ejecuta run_pvt para sus fluidos y los resultados se
+#concatenan en una sola tabla columnar.
+#
+#Uso:
+#   python Controller/pvt_multi.py fluidos.csv -o salida --workers 8 --chunksize 16
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+# =========================
+# Ajustar ruta para importar model y Controller
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from Controller.pvt_batch import normalizar_entradas, run_pvt, ALIAS, RESUMEN
+from model.bubble_point import resolver_pb
+
+# Columna que identifica a cada fluido en la salida
+COLUMNA_ID = "fluido"
+
+
+def _evaluar_lote(lote):
+    """
+    Evalúa un lote de fluidos en un proceso del pool.
+
+    lote : lista de (id, entradas) con entradas ya normalizadas.
+    Retorna (results, summary) del lote como DataFrames.
+    """
+    tablas = []
+    resumenes = []
+    for id_fluido, entradas in lote:
+        resumen, resultado, _ = run_pvt(entradas)
+        df = resultado.to_dataframe()
+        df.insert(0, COLUMNA_ID, id_fluido)
+        tablas.append(df)
+        resumenes.append({COLUMNA_ID: id_fluido, **resumen})
+    # float64 explícito: si Rs o Bo son None en todo el lote, pandas infiere object
+    resumen = pd.DataFrame(resumenes).astype({etiqueta: float for etiqueta, _ in RESUMEN})
+    return pd.concat(tablas, ignore_index=True), resumen
+
+
+def _lotes(filas, chunksize):
+    """Divide la lista de fluidos en lotes de chunksize fluidos."""
+    return [filas[i:i + chunksize] for i in range(0, len(filas), chunksize)]
+
+
+def _completar_pb(fluidos):
+    """Calcula en bloque la pb de los fluidos que no la traen."""
+    fluidos = [{ALIAS.get(str(k).strip().lower(), str(k).strip().lower()): v
+                for k, v in fila.items()} for fila in fluidos]
+    sin_pb = [f for f in fluidos if pd.isna(f.get("pb"))]
+    if sin_pb:
+        columnas = [[f.get(k) for f in sin_pb] for k in ("rsb", "api", "sg_gas", "tr")]
+        pb, _, _ = resolver_pb(*[pd.to_numeric(c) for c in columnas])
+        for f, valor in zip(sin_pb, pb):
+            f["pb"] = valor
+    return fluidos
+
+
+def run_many(fluidos, workers=None, chunksize=16, ordered=True):
+    """
+    Evalúa el conjunto de propiedades de pvt_controller para cada fluido,
+    cada uno sobre su propio rango de presiones.
+
+    Parámetros
+    ----------
+    fluidos : pandas.DataFrame o lista de dict
+        Una fila por fluido con las entradas de Summary (pb, rsb, api,
+        sg_gas, pr, tr, seed, n_points y opcionalmente sgo, psep, tsep,
+        salinidad).
+        Las pb vacías se calculan todas juntas con la inversa de Standing.
+        Si existe la columna "fluido" se usa como identificador; si no,
+        se usa la posición de la fila.
+    workers : int, opcional
+        Número de procesos. None usa os.cpu_count(); 1 evalúa en el
+        proceso actual sin pool.
+    chunksize : int
+        Número de fluidos por tarea enviada al pool.
+    ordered : bool
+        True devuelve los fluidos en el orden de entrada; False los
+        concatena en el orden en que terminan los lotes.
+
+    Retorna
+    -------
+    results : pandas.DataFrame
+        Tabla Results de todos los fluidos, con la columna "fluido".
+    summary : pandas.DataFrame
+        Resumen determinístico en Pr, una fila por fluido.
+    """
+    if isinstance(fluidos, pd.DataFrame):
+        fluidos = fluidos.to_dict("records")
+    if chunksize < 1:
+        raise ValueError("chunksize debe ser >= 1")
+    fluidos = _completar_pb(fluidos)
+
+    filas = []
+    for i, fila in enumerate(fluidos):
+        fila = dict(fila)
+        id_fluido = fila.pop(COLUMNA_ID, i)
+        filas.append((id_fluido, normalizar_entradas(fila)))
+
+    if not filas:
+        return pd.DataFrame(), pd.DataFrame()
+
+    lotes = _lotes(filas, chunksize)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(lotes) == 1:
+        partes = [_evaluar_lote(lote) for lote in lotes]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(lotes))) as pool:
+            if ordered:
+                partes = list(pool.map(_evaluar_lote, lotes))
+            else:
+                futuros = [pool.submit(_evaluar_lote, lote) for lote in lotes]
+                partes = [f.result() for f in as_completed(futuros)]
+
+    results = pd.concat([p[0] for p in partes], ignore_index=True)
+    summary = pd.concat([p[1] for p in partes], ignore_index=True)
+    return results, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flujo PVT para muchos fluidos")
+    parser.add_argument("fluidos", help="CSV con una fila por fluido")
+    parser.add_argument("-o", "--out", default=".", help="carpeta de salida")
+    parser.add_argument("--format", default="csv", choices=("csv", "parquet"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--unordered", action="store_true",
+                        help="no conservar el orden de entrada")
+    args = parser.parse_args(argv)
+
+    results, summary = run_many(pd.read_csv(args.fluidos), workers=args.workers,
+                                chunksize=args.chunksize, ordered=not args.unordered)
+
+    os.makedirs(args.out, exist_ok=True)
+    for nombre, tabla in (("results", results), ("summary", summary)):
+        ruta = os.path.join(args.out, f"{nombre}.{args.format}")
+        if args.format == "csv":
+            tabla.to_csv(ruta, index=False)
+        else:
+            tabla.to_parquet(ruta, index=False)
+        print("Escrito:", ruta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#Intérprete residente para el botón de Excel
+#xlwings abre un intérprete nuevo en cada clic, que vuelve a importar numpy,
+#pandas, matplotlib y el modelo. Este proceso los deja cargados: escucha en
+#localhost y atiende las operaciones de OPERACIONES. El lado del cliente
+#(solicitar) solo usa la biblioteca estándar, así que el macro no paga esas
+#importaciones; si el worker no está corriendo o no responde a tiempo, el
+#macro calcula localmente.
+#
+#Protocolo: mensajes JSON con un prefijo de 4 bytes con su largo (nunca
+#pickle, así que un mensaje no puede ejecutar código en ninguno de los dos
+#lados). Al conectar, servidor y cliente se autentican mutuamente con
+#HMAC-SHA256 sobre nonces aleatorios y una clave compartida: la de
+#PVT_WORKER_CLAVE o, si no está definida, una clave aleatoria por usuario
+#guardada en ~/.pvt_worker_clave (solo legible por el usuario, se crea la
+#primera vez). Cada conexión se atiende en su propio hilo y todas las
+#lecturas tienen tiempo límite, así que una conexión inactiva no bloquea a
+#las demás ni deja colgado al macro.
+#
+#Variables de entorno: PVT_WORKER=host:puerto y PVT_WORKER_CLAVE.
+#
+#Uso:
+#   python Controller/pvt_worker.py              (iniciar; Ctrl+C o --detener para salir)
+#   python Controller/pvt_worker.py --ping
+#   python Controller/pvt_worker.py --detener
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import socket
+import struct
+import sys
+import threading
+import time
+
+# =========================
+# Ajustar ruta para importar model y Controller
+# =========================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+DIRECCION_DEFECTO = ("127.0.0.1", 47121)
+ARCHIVO_CLAVE = os.path.join(os.path.expanduser("~"), ".pvt_worker_clave")
+
+# Segundos que el servidor espera cada mensaje de un cliente y que el
+# cliente espera para conectar y para cada respuesta (por defecto)
+ESPERA_SERVIDOR = 5.0
+ESPERA_CLIENTE = 5.0
+# Tamaño máximo de un mensaje (bytes)
+MAX_MENSAJE = 256 * 1024 * 1024
+
+_LARGO = struct.Struct("!I")
+_NONCE = 32
+
+# Excepciones del worker que el cliente vuelve a lanzar con su tipo; las
+# demás llegan como RuntimeError
+EXCEPCIONES = {e.__name__: e for e in (ValueError, KeyError, TypeError, ZeroDivisionError)}
+
+
+def direccion():
+    """(host, puerto) de PVT_WORKER o DIRECCION_DEFECTO."""
+    valor = os.environ.get("PVT_WORKER", "").strip()
+    if not valor:
+        return DIRECCION_DEFECTO
+    host, _, puerto = valor.rpartition(":")
+    return (host or DIRECCION_DEFECTO[0], int(puerto))
+
+
+def clave(archivo=ARCHIVO_CLAVE):
+    """
+    Clave de PVT_WORKER_CLAVE o del archivo por usuario (se crea con 32 bytes
+    aleatorios y permisos 0600 si no existe).
+    """
+    valor = os.environ.get("PVT_WORKER_CLAVE")
+    if valor:
+        return valor.encode()
+    try:
+        with open(archivo, encoding="ascii") as f:
+            valor = f.read().strip()
+        if valor:
+            return valor.encode()
+    except FileNotFoundError:
+        pass
+    valor = secrets.token_hex(32)
+    try:
+        fd = os.open(archivo, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Otro proceso la creó al mismo tiempo
+        return clave(archivo)
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(valor)
+    return valor.encode()
+
+
+# =========================
+# Mensajes y autenticación
+# =========================
+def _enviar(sock, obj):
+    datos = json.dumps(obj, default=_a_json).encode()
+    sock.sendall(_LARGO.pack(len(datos)) + datos)
+
+
+def _recibir_exacto(sock, n):
+    partes = []
+    while n:
+        parte = sock.recv(min(n, 1 << 20))
+        if not parte:
+            raise ConnectionError("Conexión cerrada por el otro extremo")
+        partes.append(parte)
+        n -= len(parte)
+    return b"".join(partes)
+
+
+def _recibir(sock):
+    (largo,) = _LARGO.unpack(_recibir_exacto(sock, _LARGO.size))
+    if largo > MAX_MENSAJE:
+        raise ConnectionError(f"Mensaje demasiado grande: {largo} bytes")
+    return json.loads(_recibir_exacto(sock, largo))
+
+
+def _a_json(v):
+    """numpy y pandas -> tipos de JSON."""
+    if hasattr(v, "to_dict"):
+        return v.to_dict("list")
+    if hasattr(v, "tolist"):
+        return v.tolist()
+    return str(v)
+
+
+def _firma(clave_, nonce):
+    return hmac.new(clave_, nonce, hashlib.sha256).digest()
+
+
+def _autenticar_servidor(sock, clave_):
+    """El cliente prueba que conoce la clave y luego el servidor."""
+    nonce = secrets.token_bytes(_NONCE)
+    sock.sendall(nonce)
+    respuesta = _recibir_exacto(sock, 32 + _NONCE)
+    if not hmac.compare_digest(respuesta[:32], _firma(clave_, nonce)):
+        raise ConnectionError("Cliente no autenticado")
+    sock.sendall(_firma(clave_, respuesta[32:]))
+
+
+def _autenticar_cliente(sock, clave_):
+    nonce_servidor = _recibir_exacto(sock, _NONCE)
+    nonce = secrets.token_bytes(_NONCE)
+    sock.sendall(_firma(clave_, nonce_servidor) + nonce)
+    if not hmac.compare_digest(_recibir_exacto(sock, 32), _firma(clave_, nonce)):
+        raise ConnectionError("El proceso en el puerto del worker no conoce la clave")
+
+
+# =========================
+# Operaciones (se ejecutan en el worker)
+# =========================
+def _op_ping(datos):
+    return {"pid": os.getpid()}
+
+
+def _op_resumen(datos):
+    """Celdas crudas de Summary -> resumen determinístico en Pr."""
+    from Controller.entradas import normalizar_entradas, resumen_pr
+    resumen, _ = resumen_pr(normalizar_entradas(datos))
+    return resumen
+
+
+def _op_run_pvt(datos):
+    """Celdas crudas de Summary -> (resumen, tabla Results como {columna: lista})."""
+    from Controller.pvt_batch import normalizar_entradas, run_pvt
+    resumen, resultado, _ = run_pvt(normalizar_entradas(datos))
+    return resumen, {c: v.tolist() for c, v in resultado.as_dict().items()}
+
+
+OPERACIONES = {"ping": _op_ping, "resumen": _op_resumen, "run_pvt": _op_run_pvt}
+
+# Entradas de ejemplo para ejercitar el flujo al arrancar
+_CALENTAR = {"pb": 3970.0, "rsb": 1124.0, "api": 38.982, "sg_gas": 0.65, "pr": 4409.0,
+             "tr": 140.0, "seed": 1, "n_points": 100}
+
+
+def precargar(graficos=True):
+    """Importa el modelo (y los gráficos) y ejecuta el flujo una vez."""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    from Controller import pvt_batch  # noqa: F401
+    from model import PVT  # noqa: F401
+    if graficos:
+        import matplotlib.colors  # noqa: F401
+        import matplotlib.figure  # noqa: F401
+        from View import graficos  # noqa: F401
+    # Primera ejecución: inicializaciones perezosas (p. ej. compilar numba)
+    _op_resumen(_CALENTAR)
+    _op_run_pvt(_CALENTAR)
+
+
+def _atender(sock, clave_, detener, espera):
+    """Una conexión: autenticación, una solicitud y su respuesta."""
+    with sock:
+        try:
+            sock.settimeout(espera)
+            _autenticar_servidor(sock, clave_)
+            mensaje = _recibir(sock)
+            operacion, datos = mensaje["op"], mensaje.get("datos")
+        except (OSError, ValueError, KeyError, TypeError):
+            # Incluye tiempo agotado, clave incorrecta y mensajes mal formados
+            return
+        if operacion == "detener":
+            detener.set()
+            respuesta = {"estado": "ok", "resultado": None}
+        elif operacion not in OPERACIONES:
+            respuesta = {"estado": "error", "tipo": "ValueError",
+                         "mensaje": f"Operación desconocida: {operacion}"}
+        else:
+            try:
+                respuesta = {"estado": "ok", "resultado": OPERACIONES[operacion](datos)}
+            except Exception as e:
+                respuesta = {"estado": "error", "tipo": type(e).__name__, "mensaje": str(e)}
+        try:
+            _enviar(sock, respuesta)
+        except OSError:
+            pass
+
+
+def servir(dir_=None, clave_=None, graficos=True, espera=ESPERA_SERVIDOR):
+    """Atiende solicitudes (un hilo por conexión) hasta recibir "detener"."""
+    dir_ = dir_ or direccion()
+    clave_ = clave_ or clave()
+    t0 = time.perf_counter()
+    precargar(graficos)
+    detener = threading.Event()
+    with socket.create_server(dir_) as oyente:
+        # accept con tiempo límite para revisar si hay que detenerse
+        oyente.settimeout(0.2)
+        print(f"Worker PVT listo en {dir_[0]}:{dir_[1]} ({time.perf_counter() - t0:.2f} s de carga)")
+        while not detener.is_set():
+            try:
+                sock, _ = oyente.accept()
+            except socket.timeout:
+                continue
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=_atender, args=(sock, clave_, detener, espera),
+                             daemon=True).start()
+
+
+# =========================
+# Cliente (solo biblioteca estándar)
+# =========================
+def solicitar(operacion, datos=None, dir_=None, clave_=None, espera=ESPERA_CLIENTE):
+    """
+    Ejecuta una operación en el worker.
+
+    Lanza OSError si el worker no está corriendo, no se autentica o no
+    responde en espera segundos (TimeoutError), y vuelve a lanzar la
+    excepción del worker si la operación falla (RuntimeError si su tipo no
+    está en EXCEPCIONES).
+    """
+    with socket.create_connection(dir_ or direccion(), timeout=espera) as sock:
+        # Sin Nagle: los mensajes cortos salen sin esperar el ACK retardado
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _autenticar_cliente(sock, clave_ or clave())
+        _enviar(sock, {"op": operacion, "datos": datos})
+        respuesta = _recibir(sock)
+    if respuesta["estado"] == "error":
+        tipo = EXCEPCIONES.get(respuesta["tipo"])
+        if tipo is None:
+            raise RuntimeError(f"{respuesta['tipo']}: {respuesta['mensaje']}")
+        raise tipo(respuesta["mensaje"])
+    return respuesta["resultado"]
+
+
+def disponible():
+    """True si hay un worker escuchando en la dirección configurada."""
+    try:
+        solicitar("ping")
+    except OSError:
+        return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker PVT residente para Excel")
+    parser.add_argument("--sin-graficos", action="store_true",
+                        help="no precargar matplotlib")
+    parser.add_argument("--ping", action="store_true", help="consultar si hay un worker")
+    parser.add_argument("--detener", action="store_true", help="detener el worker")
+    args = parser.parse_args(argv)
+
+    if args.ping or args.detener:
+        try:
+            t0 = time.perf_counter()
+            respuesta = solicitar("detener" if args.detener else "ping")
+            print("Detenido" if args.detener else
+                  f"Worker activo (pid {respuesta['pid']}, {1e3 * (time.perf_counter() - t0):.1f} ms)")
+        except OSError:
+            print("No hay un worker en", "{}:{}".format(*direccion()))
+            return 1
+        return 0
+
+    try:
+        servir(graficos=not args.sin_graficos)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
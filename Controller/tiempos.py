@@ -0,0 +1,219 @@
+#Instrumentación por etapas del flujo PVT (pvt_controller / run_pvt)
+#Cada etapa es un bloque "with tiempos.etapa(nombre):"; las etapas se pueden
+#anidar y quedan registradas con su nivel, en el orden en que empiezan.
+#Alrededor del cálculo se puede activar un perfil con cProfile o un muestreo
+#de la pila del hilo principal (sin dependencias). El registro se agrega como
+#una línea a un log JSON (JSON Lines) y, opcionalmente, a la hoja Timings.
+#
+#Desactivado (por defecto) etapa() devuelve siempre el mismo contexto vacío,
+#así que el costo es el de un "with" sin cuerpo por etapa. cProfile y pstats
+#se importan solo si se pide el perfil.
+#
+#Variables de entorno (leídas por desde_entorno):
+#   PVT_TIEMPOS=1                 activa las etapas
+#   PVT_PERFIL=cprofile|muestreo  perfil alrededor del cálculo (activa las etapas)
+#   PVT_TIEMPOS_HOJA=1            escribe la hoja Timings en el libro
+#   PVT_TIEMPOS_LOG=ruta.jsonl    log (por defecto pvt_tiempos.jsonl en la raíz)
+
+import collections
+import contextlib
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+
+LOG_DEFECTO = os.path.join(ROOT_DIR, "pvt_tiempos.jsonl")
+HOJA = "Timings"
+PERFILES = ("cprofile", "muestreo")
+# Funciones del perfil que se guardan en el registro
+TOP_PERFIL = 25
+# Intervalo del muestreo de la pila (s)
+INTERVALO_MUESTREO = 0.001
+
+_NULO = contextlib.nullcontext()
+
+
+def _activo(variable):
+    return os.environ.get(variable, "").strip().lower() not in ("", "0", "false", "no")
+
+
+class Tiempos:
+    """
+    Etapas cronometradas de una ejecución.
+
+    activo : bool, si es False etapa() y perfilar() no hacen nada
+    perfil : None, "cprofile" o "muestreo", solo dentro de perfilar()
+    """
+
+    def __init__(self, activo=True, perfil=None, hoja=False, log=None):
+        if perfil is not None and perfil not in PERFILES:
+            raise ValueError(f"Perfil desconocido: {perfil}. Opciones: {', '.join(PERFILES)}")
+        self.activo = activo or perfil is not None
+        self.perfil = perfil
+        self.hoja = hoja
+        self.log = log
+        self.etapas = []          # [nombre, nivel, inicio, duración]
+        self.perfiles = {}        # etapa -> resultado del perfil
+        self._nivel = 0
+        self._t0 = time.perf_counter()
+
+    def etapa(self, nombre):
+        """Contexto que cronometra el bloque; sin efecto si no está activo."""
+        if not self.activo:
+            return _NULO
+        return self._etapa(nombre)
+
+    @contextlib.contextmanager
+    def _etapa(self, nombre):
+        registro = [nombre, self._nivel, time.perf_counter() - self._t0, None]
+        self.etapas.append(registro)
+        self._nivel += 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            registro[3] = time.perf_counter() - t0
+            self._nivel -= 1
+
+    def perfilar(self, nombre):
+        """Etapa con el perfil configurado (cProfile o muestreo) alrededor."""
+        if not self.activo:
+            return _NULO
+        if self.perfil is None:
+            return self._etapa(nombre)
+        return self._perfilar(nombre)
+
+    @contextlib.contextmanager
+    def _perfilar(self, nombre):
+        with self._etapa(nombre):
+            if self.perfil == "cprofile":
+                import cProfile
+                perfil = cProfile.Profile()
+                perfil.enable()
+                try:
+                    yield
+                finally:
+                    perfil.disable()
+                    self.perfiles[nombre] = _resumen_cprofile(perfil)
+            else:
+                muestreo = _Muestreo(threading.get_ident())
+                muestreo.start()
+                try:
+                    yield
+                finally:
+                    muestreo.detener()
+                    self.perfiles[nombre] = muestreo.resumen()
+
+    # =========================
+    # Salidas
+    # =========================
+    def tabla(self):
+        """Filas [etapa (sangrada por nivel), ms, % del total, inicio ms]."""
+        total = self.total()
+        return [["  " * nivel + nombre, 1e3 * dur, 100.0 * dur / total if total else 0.0,
+                 1e3 * inicio]
+                for nombre, nivel, inicio, dur in self.etapas if dur is not None]
+
+    def total(self):
+        """Suma de las etapas de primer nivel (s)."""
+        return sum(d for _, nivel, _, d in self.etapas if nivel == 0 and d is not None)
+
+    def registro(self, **extra):
+        """Dict serializable de la ejecución."""
+        return {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "total_s": self.total(),
+            "etapas": [{"etapa": n, "nivel": nivel, "inicio_s": i, "duracion_s": d}
+                       for n, nivel, i, d in self.etapas],
+            **({"perfil": self.perfil, "perfiles": self.perfiles} if self.perfiles else {}),
+            **extra,
+        }
+
+    def guardar(self, ruta=None, **extra):
+        """Agrega el registro como una línea al log JSON. Retorna la ruta."""
+        ruta = ruta or self.log or LOG_DEFECTO
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.registro(**extra)) + "\n")
+        return ruta
+
+    def escribir_hoja(self, wb, nombre=HOJA):
+        """Escribe la tabla de etapas en la hoja nombre (se crea si no existe)."""
+        if nombre in [sh.name for sh in wb.sheets]:
+            sh = wb.sheets[nombre]
+            sh.clear()
+        else:
+            sh = wb.sheets.add(nombre)
+        sh["A1"].value = [["Etapa", "ms", "% total", "Inicio (ms)"]] + self.tabla()
+        return sh
+
+    def finalizar(self, wb=None, **extra):
+        """Log y hoja Timings según la configuración; sin efecto si no está activo."""
+        if not self.activo:
+            return
+        self.guardar(**extra)
+        if self.hoja and wb is not None:
+            self.escribir_hoja(wb)
+
+
+INACTIVO = Tiempos(activo=False)
+
+
+def desde_entorno():
+    """Tiempos configurado con las variables PVT_TIEMPOS*, o INACTIVO."""
+    perfil = os.environ.get("PVT_PERFIL", "").strip().lower() or None
+    if not _activo("PVT_TIEMPOS") and perfil is None:
+        return INACTIVO
+    return Tiempos(True, perfil, hoja=_activo("PVT_TIEMPOS_HOJA"),
+                   log=os.environ.get("PVT_TIEMPOS_LOG") or None)
+
+
+# =========================
+# Perfiles
+# =========================
+def _resumen_cprofile(perfil, top=TOP_PERFIL):
+    """Las funciones con más tiempo acumulado."""
+    import pstats
+    stats = pstats.Stats(perfil)
+    filas = []
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in stats.stats.items():
+        filas.append({"funcion": f"{os.path.basename(archivo)}:{linea}({funcion})",
+                      "llamadas": llamadas, "propio_s": propio, "acumulado_s": acumulado})
+    filas.sort(key=lambda f: -f["acumulado_s"])
+    return filas[:top]
+
+
+class _Muestreo(threading.Thread):
+    """Muestrea la pila de un hilo cada INTERVALO_MUESTREO (pilas colapsadas)."""
+
+    def __init__(self, hilo, intervalo=INTERVALO_MUESTREO):
+        super().__init__(daemon=True)
+        self.hilo, self.intervalo = hilo, intervalo
+        self.pilas = collections.Counter()
+        self._fin = threading.Event()
+
+    def run(self):
+        while not self._fin.wait(self.intervalo):
+            frame = sys._current_frames().get(self.hilo)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                frame = frame.f_back
+            self.pilas[";".join(reversed(pila))] += 1
+
+    def detener(self):
+        self._fin.set()
+        self.join()
+
+    def resumen(self, top=TOP_PERFIL):
+        """Muestras totales y las pilas más frecuentes (formato flamegraph)."""
+        return {"intervalo_s": self.intervalo, "muestras": sum(self.pilas.values()),
+                "pilas": [{"pila": p, "muestras": n} for p, n in self.pilas.most_common(top)]}
@@ -0,0 +1,259 @@
+#Gráficos de propiedades del petróleo vs presión (Rs, Bo, ρo, μo) en Summary
+#Dos modos (MODOS):
+#   "imagen": figuras de matplotlib insertadas como PNG. Con más de
+#             MAX_DISPERSION puntos la nube se dibuja como densidad
+#             (histograma 2D sombreado en escala logarítmica) con una muestra
+#             equiespaciada de puntos encima, y la tendencia es la media por
+#             intervalos de P (sin ordenar P). Los PNG se guardan en una caché
+#             con clave = hash de las entradas: un fluido sin cambios no se
+#             vuelve a dibujar. La imagen en el libro lleva la clave en su
+#             nombre ("Rs_vs_P <clave>"): se busca por ese nombre y si ya
+#             está tampoco se vuelve a subir. Solo cuando la clave cambió se
+#             recorre hoja.pictures para borrar la imagen de la clave anterior. Las figuras pendientes se dibujan en paralelo
+#             (hilos con la API orientada a objetos de matplotlib, sin
+#             pyplot, que no es seguro entre hilos); la inserción en Excel es
+#             secuencial porque COM no admite llamadas desde otros hilos.
+#   "excel" : gráficos de dispersión nativos enlazados a las columnas de
+#             Results; no se rasteriza nada y Excel los redibuja cuando cambia
+#             la tabla. No llevan el marcador de Pb ni la tendencia. Las
+#             imágenes del modo "imagen" se borran al crear cada gráfico.
+#
+#Variables de entorno: PVT_GRAFICOS=imagen|excel|no (por defecto imagen) y
+#PVT_GRAFICOS_CACHE=carpeta de la caché (por defecto resultados/graficos).
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Controller.excel_io import celda_a_indices, indices_a_celda
+from Controller.tiempos import INACTIVO
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+
+MODOS = ("imagen", "excel", "no")
+CACHE_DEFECTO = os.path.join(ROOT_DIR, "resultados", "graficos")
+# PNG que se conservan en la caché (se borran los más viejos)
+MAX_CACHE = 200
+# Cambia la clave de la caché cuando cambia el dibujo
+VERSION = 1
+
+# Más puntos que esto: densidad + muestra + tendencia por intervalos
+MAX_DISPERSION = 5_000
+CELDAS_DENSIDAD = (120, 80)
+INTERVALOS_TENDENCIA = 60
+
+ESTILO = "seaborn-v0_8-whitegrid"
+TAMANO = (6, 4)              # pulgadas (imagen)
+TAMANO_EXCEL = (432, 288)    # puntos (gráfico nativo)
+
+# nombre, columna de Results, color, título, eje y, celda de Summary
+GRAFICOS = (
+    ("Rs_vs_P", "Rs (scf/stb)", "blue",
+     "Solubilidad del Gas (Rs) vs Presión", "Rs (scf/stb)", "H2"),
+    ("Bo_vs_P", "Bo (rb/stb)", "green",
+     "Factor Volumétrico del Petróleo (Bo) vs Presión", "Bo (rb/stb)", "H20"),
+    ("Rho_vs_P", "rho (lb/ft3)", "orange",
+     "Densidad del Petróleo (ρo) vs Presión", "ρo (lb/ft³)", "H38"),
+    ("Mu_vs_P", "mu_o (cp)", "purple",
+     "Viscosidad del Petróleo (μo) vs Presión", "μo (cp)", "H56"),
+)
+COLUMNA_P = "P (psia)"
+
+
+def modo_entorno():
+    """Modo de PVT_GRAFICOS (por defecto "imagen")."""
+    modo = os.environ.get("PVT_GRAFICOS", "").strip().lower() or "imagen"
+    if modo not in MODOS:
+        raise ValueError(f"PVT_GRAFICOS desconocido: {modo}. Opciones: {', '.join(MODOS)}")
+    return modo
+
+
+def puntos_pb(fluido):
+    """Columna -> valor de la propiedad en Pb (Rs = Rsb) para el marcador."""
+    rsb = fluido.rsb
+    return {"Rs (scf/stb)": rsb,
+            "Bo (rb/stb)": float(fluido.bo_standing(rsb)),
+            "rho (lb/ft3)": fluido.rho_ob,
+            "mu_o (cp)": float(fluido.mu_beggs_robinson(rsb))}
+
+
+# =========================
+# Modo "imagen"
+# =========================
+def _tendencia(P, y, pb):
+    """Media de y por intervalos de P (con Pb como borde), sin ordenar P."""
+    p_min, p_max = P.min(), P.max()
+    bordes = np.linspace(p_min, p_max, INTERVALOS_TENDENCIA + 1)
+    if p_min < pb < p_max:
+        # Las correlaciones cambian en Pb: ningún intervalo la cruza
+        bordes = np.unique(np.append(bordes, pb))
+    conteo, _ = np.histogram(P, bordes)
+    suma, _ = np.histogram(P, bordes, weights=y)
+    usados = conteo > 0
+    centros = 0.5 * (bordes[:-1] + bordes[1:])
+    return centros[usados], suma[usados] / conteo[usados]
+
+
+def _densidad(ax, P, y, pb, color):
+    """Nube grande: histograma 2D sombreado, muestra equiespaciada y tendencia."""
+    from matplotlib.colors import LinearSegmentedColormap, LogNorm
+
+    n = len(P)
+    ok = np.isfinite(P) & np.isfinite(y)
+    P, y = np.asarray(P[ok], dtype=float), np.asarray(y[ok], dtype=float)
+    if not len(P):
+        return
+    densidad, bx, by = np.histogram2d(P, y, bins=CELDAS_DENSIDAD)
+    mapa = LinearSegmentedColormap.from_list(color, ["white", color])
+    ax.pcolormesh(bx, by, np.ma.masked_equal(densidad.T, 0), cmap=mapa, norm=LogNorm(),
+                  shading="flat")
+    paso = -(-n // MAX_DISPERSION)
+    ax.scatter(P[::paso], y[::paso], color=color, s=2, alpha=0.3,
+               label=f"Datos (1 de cada {paso} de {n})")
+    ax.plot(*_tendencia(P, y, pb), color=color, linewidth=1, label="Tendencia")
+
+
+def _dibujar(ruta, P, y, pb, y_pb, color, titulo, etiqueta_y):
+    """Dibuja una figura y la guarda como PNG en ruta (seguro entre hilos)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=TAMANO)
+    ax = fig.subplots()
+    if len(P) <= MAX_DISPERSION:
+        orden = np.argsort(P)
+        ax.scatter(P, y, color=color, s=20, label="Datos")
+        ax.plot(P[orden], y[orden], color=color, linewidth=1, label="Tendencia")
+    else:
+        _densidad(ax, P, y, pb, color)
+
+    ax.scatter(pb, y_pb, color="red", s=70, zorder=10, label="Punto de burbuja (pb)")
+    ax.axvline(pb, color="red", linestyle="--", linewidth=1.5, label=f"pb = {pb} psia")
+
+    ax.set_title(titulo)
+    ax.set_xlabel("P (psia)")
+    ax.set_ylabel(etiqueta_y)
+    ax.grid(True)
+    ax.legend()
+
+    temporal = f"{ruta}.{os.getpid()}.{id(fig)}.tmp"
+    fig.savefig(temporal, format="png")
+    os.replace(temporal, ruta)
+
+
+def clave(entradas, n, dtype, extra=None):
+    """Hash de lo que determina los gráficos (entradas, filas, precisión, dibujo)."""
+    datos = {"entradas": entradas, "n": n, "dtype": str(dtype), "version": VERSION,
+             "max_dispersion": MAX_DISPERSION, "graficos": GRAFICOS, **(extra or {})}
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _podar_cache(carpeta, maximo=MAX_CACHE):
+    pngs = [os.path.join(carpeta, a) for a in os.listdir(carpeta) if a.endswith(".png")]
+    if len(pngs) > maximo:
+        pngs.sort(key=os.path.getmtime)
+        for ruta in pngs[:len(pngs) - maximo]:
+            os.remove(ruta)
+
+
+def _etiqueta(nombre, clave_):
+    """Nombre de la imagen en el libro: nombre del gráfico y su clave."""
+    return f"{nombre} {clave_[:16]}"
+
+
+def _quitar_imagenes(es, hoja, nombre, existentes, salvo=None):
+    """Borra las imágenes de un gráfico (con o sin clave en el nombre) salvo la actual."""
+    for img in existentes:
+        if img != salvo and (img == nombre or img.startswith(nombre + " ")):
+            es.quitar_imagen(hoja, img)
+
+
+def graficos_imagen(es, hoja, resultado, fluido, base, cache=None, hilos=None,
+                    tiempos=INACTIVO):
+    """
+    Dibuja (o toma de la caché) los PNG de GRAFICOS y los inserta en hoja.
+
+    base : clave de las entradas (ver clave()); cada gráfico agrega su nombre
+    cache : carpeta de los PNG (por defecto PVT_GRAFICOS_CACHE o CACHE_DEFECTO)
+    hilos : hilos para dibujar (por defecto uno por figura pendiente, sin
+        pasar del número de CPU: el trazado de matplotlib retiene el GIL y
+        solo los histogramas y la compresión PNG corren en paralelo)
+
+    Retorna {"dibujados": n, "cache": n, "omitidos": n}.
+    """
+    from matplotlib import style
+
+    cache = cache or os.environ.get("PVT_GRAFICOS_CACHE") or CACHE_DEFECTO
+    os.makedirs(cache, exist_ok=True)
+    pb = fluido.pb
+    y_pb = puntos_pb(fluido)
+    claves = {nombre: hashlib.sha256(f"{base}:{nombre}".encode()).hexdigest()[:32]
+              for nombre, *_ in GRAFICOS}
+    rutas = {nombre: os.path.join(cache, f"{c}.png") for nombre, c in claves.items()}
+
+    pendientes = [g for g in GRAFICOS if not os.path.exists(rutas[g[0]])]
+    for nombre, *_ in GRAFICOS:
+        if nombre not in [g[0] for g in pendientes]:
+            # La poda borra primero los menos usados
+            os.utime(rutas[nombre])
+    with tiempos.etapa("dibujar"):
+        if pendientes:
+            P = resultado[COLUMNA_P]
+            with style.context(ESTILO):
+                hilos = hilos or min(len(pendientes), os.cpu_count() or 1)
+                with ThreadPoolExecutor(hilos) as pool:
+                    tareas = [pool.submit(_dibujar, rutas[nombre], P, resultado[columna], pb,
+                                          y_pb[columna], color, titulo, etiqueta_y)
+                              for nombre, columna, color, titulo, etiqueta_y, _ in pendientes]
+                    for t in tareas:
+                        t.result()
+
+    # Imágenes que ya están en el libro con la misma clave (en su nombre) no
+    # se suben otra vez; el nombre de las de otra clave no se conoce, así que
+    # hoja.pictures se recorre una sola vez y solo si algún gráfico cambió
+    omitidos = 0
+    existentes = None
+    with tiempos.etapa("insertar"):
+        for nombre, *_, celda in GRAFICOS:
+            etiqueta = _etiqueta(nombre, claves[nombre])
+            if es.existe_imagen(hoja, etiqueta):
+                omitidos += 1
+                continue
+            if existentes is None:
+                existentes = es.imagenes(hoja)
+            _quitar_imagenes(es, hoja, nombre, existentes)
+            es.quitar_grafico(hoja, nombre)
+            es.imagen(hoja, etiqueta, rutas[nombre], celda)
+    _podar_cache(cache)
+    return {"dibujados": len(pendientes), "cache": len(GRAFICOS) - len(pendientes),
+            "omitidos": omitidos}
+
+
+# =========================
+# Modo "excel"
+# =========================
+def graficos_excel(es, hoja, hoja_datos, celda_datos, columnas, n):
+    """
+    Gráficos de dispersión nativos de Excel sobre la tabla de hoja_datos
+    (encabezado en celda_datos, n filas de datos, columnas en orden).
+    """
+    f0, c0 = celda_a_indices(celda_datos)
+
+    def rango(columna):
+        c = c0 + list(columnas).index(columna)
+        return f"{indices_a_celda(f0, c)}:{indices_a_celda(f0 + n, c)}"
+
+    datos = es.hoja(hoja_datos)
+    existentes = None
+    for nombre, columna, _, _, _, celda in GRAFICOS:
+        # Primera columna = x (P), segunda = y; el encabezado da el nombre de la serie
+        fuente = datos.range(f"{rango(COLUMNA_P)},{rango(columna)}")
+        _, nuevo = es.grafico(hoja, nombre, fuente, celda, *TAMANO_EXCEL)
+        # Un gráfico ya existente no convive con imágenes (se borraron al crearlo)
+        if nuevo:
+            if existentes is None:
+                existentes = es.imagenes(hoja)
+            _quitar_imagenes(es, hoja, nombre, existentes)
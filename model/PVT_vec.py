@@ -0,0 +1,325 @@
+#Versiones vectorizadas (NumPy) de las correlaciones de PVT.py
+#Cada funcion acepta escalares o arreglos en cualquier argumento (broadcasting)
+#y devuelve una tupla (valor, valido):
+#   valor  : ndarray float64, con NaN en los puntos invalidos
+#   valido : ndarray bool, True donde el calculo es valido
+#En lugar de devolver None, los puntos invalidos se marcan con NaN.
+#Con derivada=True se agrega un tercer elemento con la derivada analítica
+#(respecto a P o a Rs, según la correlación), calculada con los mismos
+#términos intermedios que el valor.
+
+import numpy as np
+
+
+def _arreglos(*args):
+    """Convierte los argumentos a float64 y los lleva a una forma comun."""
+    return np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+
+
+def _marcar(valor, valido):
+    """Combina la mascara con los valores finitos y pone NaN en lo invalido."""
+    valido = valido & np.isfinite(valor)
+    return np.where(valido, valor, np.nan), valido
+
+
+def _derivada(d, valido):
+    """NaN en la derivada donde el valor es inválido o la derivada no es finita."""
+    return np.where(valido & np.isfinite(d), d, np.nan)
+
+
+#%% Funcion para Solubilidad del gas
+# Correlación de Standing (1947) para la solubilidad del gas Rs
+def rs_standing_vec(api, sg, p, t_f, derivada=False):
+    """
+    Versión vectorizada de rs_standing (Standing, 1947).
+
+    Parámetros:
+    api : float o ndarray, gravedad API del petróleo
+    sg  : float o ndarray, gravedad específica del gas en solucion
+    p   : float o ndarray, presión del sistema (psi)
+    t_f : float o ndarray, temperatura del sistema (F)
+
+    Retorna:
+    rs : ndarray, solubilidad del gas (scf/bbl), NaN si es invalida
+    valido : ndarray bool
+    drs_dp : ndarray (solo con derivada=True), 1.2048·Rs / (p + 25.48)
+    """
+    api, sg, p, t_f = _arreglos(api, sg, p, t_f)
+    with np.errstate(all="ignore"):
+        x = 0.0125 * api - 0.00091 * t_f
+        base = ((p / 18.2) + 1.4) * (10.0 ** x)
+        rs = sg * base ** 1.2048
+    rs, valido = _marcar(rs, base >= 0)
+    if not derivada:
+        return rs, valido
+    with np.errstate(all="ignore"):
+        drs = 1.2048 * rs / (p + 25.48)
+    return rs, valido, _derivada(drs, valido)
+
+
+# Correlación de Velarde (1997) para la solubilidad del gas Rs
+def rs_velarde_vec(rsb, yg, yo, pb, p, t_f, derivada=False):
+    """
+    Versión vectorizada de rs_velarde (Velarde, 1997).
+
+    Parámetros
+    ----------
+    rsb, yg, yo, pb, p, t_f : float o ndarray
+        Mismos significados y unidades que en rs_velarde.
+
+    Retorna
+    -------
+    rs : ndarray
+        Solubilidad del gas a la presión P, scf/STB. NaN donde pb <= 0,
+        p <= 0, Pr <= 0 o donde el término de temperatura es negativo.
+    valido : ndarray bool
+    drs_dp : ndarray (solo con derivada=True)
+        Rsb/Pb · (α1·α2·Pr^α2 + (1 − α1)·α3·Pr^α3) / Pr
+    """
+    rsb, yg, yo, pb, p, t_f = _arreglos(rsb, yg, yo, pb, p, t_f)
+
+    A0, A1, A2, A3, A4 = 0.000018653, 1.672608, 0.929870, 0.247235, 1.056052
+    B0, B1, B2, B3, B4 = 0.1004, -1.00475, 0.337711, 0.132795, 0.302065
+    C0, C1, C2, C3, C4 = 0.9167, -1.48548, -0.164741, -0.09133, 0.047094
+
+    with np.errstate(all="ignore"):
+        pr = (p - 0.101) / pb
+        temp_term = 1.8 * t_f - 459.67
+
+        alpha1 = A0 * (yg ** A1) * (yo ** A2) * (temp_term ** A3) * (pb ** A4)
+        alpha2 = B0 * (yg ** B1) * (yo ** B2) * (temp_term ** B3) * (pb ** B4)
+        alpha3 = C0 * (yg ** C1) * (yo ** C2) * (temp_term ** C3) * (pb ** C4)
+
+        # limitamos alpha1 a [0,1]
+        alpha1 = np.clip(alpha1, 0.0, 1.0)
+
+        pr_a2 = pr ** alpha2
+        pr_a3 = pr ** alpha3
+        rgr = alpha1 * pr_a2 + (1.0 - alpha1) * pr_a3
+        rs = rgr * rsb
+
+    rs, valido = _marcar(rs, (pb > 0) & (p > 0) & (pr > 0))
+    if not derivada:
+        return rs, valido
+    with np.errstate(all="ignore"):
+        drs = rsb / pb * (alpha1 * alpha2 * pr_a2 + (1.0 - alpha1) * alpha3 * pr_a3) / pr
+    return rs, valido, _derivada(drs, valido)
+
+
+#%% Funcion para Factor volumetrico del petroleo
+#Correlacion de Standing (1981) para el factor volumetrico del petroleo
+def bo_standing_vec(rs, sg, sgo, t_f, derivada=False):
+    """
+    Versión vectorizada de bo_standing (Standing, 1981).
+
+    Retorna:
+    bo : ndarray, factor volumetrico del petroleo (bbl/STB)
+    valido : ndarray bool
+    dbo_drs : ndarray (solo con derivada=True), 1.44e-4·term^0.2·(sg/sgo)^0.5
+    """
+    rs, sg, sgo, t_f = _arreglos(rs, sg, sgo, t_f)
+    with np.errstate(all="ignore"):
+        raiz = (sg / sgo) ** 0.5
+        term = rs * raiz + 1.25 * t_f
+        bo = 0.9759 + 0.000120 * (term ** 1.2)
+    bo, valido = _marcar(bo, term >= 0)
+    if not derivada:
+        return bo, valido
+    with np.errstate(all="ignore"):
+        dbo = 0.000144 * term ** 0.2 * raiz
+    return bo, valido, _derivada(dbo, valido)
+
+
+#Correlacion de Vasquez-Beggs (1980) para el factor volumetrico del petroleo
+def bo_vasbeg_vec(rs, api, sgg, t_f, psep, tsep, derivada=False):
+    """
+    Versión vectorizada de bo_vasbeg (Vasquez/Beggs, 1980).
+
+    Los coeficientes C1..C3 se eligen punto a punto según api >= 30.
+
+    Retorna:
+    bo : ndarray, factor volumetrico del petroleo (bbl/STB), NaN si psep <= 0
+    valido : ndarray bool
+    dbo_drs : ndarray (solo con derivada=True), C1 + C3·(T − 60)·API/γgs
+    """
+    rs, api, sgg, t_f, psep, tsep = _arreglos(rs, api, sgg, t_f, psep, tsep)
+    with np.errstate(all="ignore"):
+        ygs = sgg * (1.0 + 5.912e-5 * api * tsep * np.log(psep / 114.7))
+
+        liviano = api >= 30
+        C1 = np.where(liviano, 4.677e-4, 4.670e-4)
+        C2 = np.where(liviano, 1.751e-5, 1.100e-5)
+        C3 = np.where(liviano, -1.811e-8, 1.337E-9)
+
+        k = (t_f - 60) * (api / ygs)
+        bo = 1.0 + (C1 * rs) + k * (C2 + (C3 * rs))
+    bo, valido = _marcar(bo, (psep > 0) & (ygs != 0))
+    if not derivada:
+        return bo, valido
+    return bo, valido, _derivada(C1 + k * C3, valido)
+
+
+#%% Funcion para la comprensibilidad isotermica del petroleo
+#Correlacion de Petrosky (1993) para la compresibilidad isotermica del petroleo
+def co_petrosk_vec(rsb, sgg, P, t_f, api, derivada=False):
+    """
+    Versión vectorizada de co_petrosk (Petrosky–Farshad, 1993).
+
+    Retorna:
+    co : ndarray, coeficiente de compresibilidad del petróleo (psia⁻¹)
+    valido : ndarray bool
+    dco_dp : ndarray (solo con derivada=True), −0.5906·Co / P
+    """
+    rsb, sgg, P, t_f, api = _arreglos(rsb, sgg, P, t_f, api)
+    with np.errstate(all="ignore"):
+        co = (
+                1.705e-7 *
+                (rsb ** 0.69357) *
+                (sgg ** 0.1885) *
+                (api ** 0.3272) *
+                (t_f ** 0.6729) *
+                (P ** -0.5906)
+        )
+    co, valido = _marcar(co, np.ones(co.shape, dtype=bool))
+    if not derivada:
+        return co, valido
+    with np.errstate(all="ignore"):
+        dco = -0.5906 * co / P
+    return co, valido, _derivada(dco, valido)
+
+
+#Correlacion de Vasquez-Beggs (1980) para la comprensibilidad isotermica del petroleo
+def co_vasquez_beggs_vec(Rsb, y_g, api, t_f, p, psep, tsep, derivada=False):
+    """
+    Versión vectorizada de co_vasquez_beggs (Vasquez–Beggs, 1980).
+
+    Retorna:
+    co : ndarray, coeficiente de compresibilidad del petróleo (psia⁻¹),
+         NaN si psep <= 0 o p == 0
+    valido : ndarray bool
+    dco_dp : ndarray (solo con derivada=True), −Co / p
+    """
+    Rsb, y_g, api, t_f, p, psep, tsep = _arreglos(Rsb, y_g, api, t_f, p, psep, tsep)
+    with np.errstate(all="ignore"):
+        y_gc = y_g * (1 + (5.912e-5) * api * tsep * np.log(psep / 114.7))
+        numerador = -1433 + (5 * Rsb) + (17.2 * t_f) - (1180 * y_gc) + (12.61 * api)
+        co = numerador / (1e5 * p)
+    co, valido = _marcar(co, (psep > 0) & (p != 0))
+    if not derivada:
+        return co, valido
+    return co, valido, _derivada(-co / p, valido)
+
+
+#%% Funcion para la densidad del petroleo
+#Correlacion de Standing (1947) para la densidad del petroleo po
+def ro_standing_vec(Rs, y_g, y_o, t_f, derivada=False):
+    """
+    Versión vectorizada de ro_standing (Standing, 1947).
+
+    Retorna:
+    ro : ndarray, densidad del petróleo ρo (lb/ft³)
+    valido : ndarray bool
+    dro_drs : ndarray (solo con derivada=True), (0.0136·γg − ρo·dBo/dRs) / Bo
+    """
+    Rs, y_g, y_o, t_f = _arreglos(Rs, y_g, y_o, t_f)
+    with np.errstate(all="ignore"):
+        raiz4 = (y_g / y_o) ** 0.25
+        term = Rs * raiz4 + 1.25 * t_f
+        Bo = 0.972 + 0.000147 * (term ** 1.175)
+        ro = (62.4 * y_o + 0.0136 * Rs * y_g) / Bo
+    ro, valido = _marcar(ro, (term >= 0) & (Bo != 0))
+    if not derivada:
+        return ro, valido
+    with np.errstate(all="ignore"):
+        dBo = 0.000147 * 1.175 * term ** 0.175 * raiz4
+        dro = (0.0136 * y_g - ro * dBo) / Bo
+    return ro, valido, _derivada(dro, valido)
+
+
+#%% Funcion para la densiada del petroleo Subsaturado
+def ro_subsaturado_vec(rho_ob, co, p, pb, derivada=False, dco=0.0):
+    """
+    Versión vectorizada de ro_subsaturado: ρo = ρob * exp(Co * (P - Pb)).
+
+    dco es dCo/dP en cada punto; solo se usa con derivada=True.
+
+    Retorna
+    -------
+    rho_o : ndarray, densidad del petróleo subsaturado (lb/ft³)
+    valido : ndarray bool
+    drho_dp : ndarray (solo con derivada=True), ρo·(Co + dCo/dP·(P − Pb))
+    """
+    rho_ob, co, p, pb, dco = _arreglos(rho_ob, co, p, pb, dco)
+    with np.errstate(all="ignore"):
+        rho_o = rho_ob * np.exp(co * (p - pb))
+    rho_o, valido = _marcar(rho_o, np.ones(rho_o.shape, dtype=bool))
+    if not derivada:
+        return rho_o, valido
+    with np.errstate(all="ignore"):
+        drho = rho_o * (co + dco * (p - pb))
+    return rho_o, valido, _derivada(drho, valido)
+
+
+#%% Funcion para la viscosidad del petroleo uo
+#Correlacion de Beggs/Robinson (1975) para la viscosidad del petroleo saturado
+def mu_beggs_robinson_vec(api, t_f, Rs=None, derivada=False):
+    """
+    Versión vectorizada de mu_beggs_robinson (Beggs–Robinson, 1975).
+
+    Si Rs es None se devuelve μ_od; si no, μ_ob. Los desbordamientos
+    (10**x demasiado grande) se marcan como invalidos.
+
+    Retorna:
+    mu : ndarray, viscosidad (cp)
+    valido : ndarray bool
+    dmu_drs : ndarray (solo con derivada=True), dμob/dRs
+              = μob·(−0.515/(Rs + 100) − 0.338·b/(Rs + 150)·ln μod); 0 para μod
+    """
+    if Rs is None:
+        api, t_f = _arreglos(api, t_f)
+    else:
+        api, t_f, Rs = _arreglos(api, t_f, Rs)
+
+    with np.errstate(all="ignore"):
+        x = 10.0 ** ((3.0324 - 0.02023 * api) * (t_f ** -1.163))
+        mu_od = (10.0 ** x) - 1.0
+        if Rs is None:
+            mu_od, valido = _marcar(mu_od, np.ones(mu_od.shape, dtype=bool))
+            return (mu_od, valido, np.where(valido, 0.0, np.nan)) if derivada else (mu_od, valido)
+
+        a = 10.715 * (Rs + 100) ** (-0.515)
+        b = 5.44 * (Rs + 150) ** (-0.338)
+        mu_ob = a * (mu_od ** b)
+    mu_ob, valido = _marcar(mu_ob, np.isfinite(mu_od))
+    if not derivada:
+        return mu_ob, valido
+    with np.errstate(all="ignore"):
+        dmu = mu_ob * (-0.515 / (Rs + 100) - 0.338 * b / (Rs + 150) * np.log(mu_od))
+    return mu_ob, valido, _derivada(dmu, valido)
+
+
+#Correlacion usando Vasquez/Beggs (1975) para la viscocidad del petroleo subsaturado
+def muo_vasquez_beggs_vec(mu_ob, p, pb, derivada=False, dmu_ob=0.0):
+    """
+    Versión vectorizada de muo_vasquez_beggs (Vasquez–Beggs, 1975).
+
+    Donde p <= pb se devuelve μob, igual que la versión escalar. dmu_ob es
+    dμob/dP en cada punto; solo se usa con derivada=True.
+
+    Retorna:
+    mu_o : ndarray, viscosidad del petróleo subsaturado (cp),
+           NaN si p <= 0 o pb <= 0
+    valido : ndarray bool
+    dmu_dp : ndarray (solo con derivada=True), dμob/dP donde p <= pb y
+             μo·(dμob/dP / μob + m / p) donde p > pb
+    """
+    mu_ob, p, pb, dmu_ob = _arreglos(mu_ob, p, pb, dmu_ob)
+    with np.errstate(all="ignore"):
+        m = 2.6 * (pb ** 1.187) * np.exp(-11.513 - 8.98e-5 * pb)
+        mu_o = np.where(p <= pb, mu_ob, mu_ob * (p / pb) ** m)
+    mu_o, valido = _marcar(mu_o, (p > 0) & (pb > 0))
+    if not derivada:
+        return mu_o, valido
+    with np.errstate(all="ignore"):
+        dmu = np.where(p <= pb, dmu_ob, mu_o * (dmu_ob / mu_ob + m / p))
+    return mu_o, valido, _derivada(dmu, valido)
@@ -15,6 +15,27 @@ from PVT import (
     mu_beggs_robinson,
     muo_vasquez_beggs,
 )
+from PVT_vec import rs_standing_vec, bo_standing_vec, mu_beggs_robinson_vec
+
+import io
+import os
+import sys
+
+import numpy as np
+
+# Los módulos que importan "model.*" necesitan la raíz del proyecto en la ruta
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from model import backends
+from model.bubble_point import resolver_pb
+from model.correlaciones import BLOQUE, COLUMNAS_TODAS, calc_todas, calc_todas_individual
+from model.diagnostics import calc_pvt_diagnostico, describir
+from model.eclipse import FILAS_BLOQUE, escribir_eclipse
+from model.gas import z_dak, z_factor, z_hall_yarborough
+from model.pvt_engine import COLUMNAS, calc_pvt_array
+from model.water import COLUMNAS_AGUA, bw_mccain, cw_osif, mu_w_mccain, propiedades_agua, rsw_mccain
 
 
 def main():
@@ -133,6 +154,196 @@ def main():
         else:
             print(f"[OK] {nombre} = {valor}")
 
+    # ------------------------------
+    # 8) Versiones vectorizadas (PVT_vec) contra las escalares
+    # ------------------------------
+    print("\n--- Versiones vectorizadas ---")
+    P = [14.7, 1000.0, pb, pr, -100.0]
+    rs_vec, ok_rs = rs_standing_vec(api, sg_gas, P, tr)
+    bo_vec, ok_bo = bo_standing_vec(rs_vec, sg_gas, sgo, tr)
+    mu_vec, ok_mu = mu_beggs_robinson_vec(api, tr, Rs=rs_vec)
+    print("Rs vec  ->", rs_vec, ok_rs)
+    print("Bo vec  ->", bo_vec, ok_bo)
+    print("mu vec  ->", mu_vec, ok_mu)
+    print("Rs(Pr) vec == escalar:", rs_vec[3] == rs_pr_stand)
+
+    # ------------------------------
+    # 9) Diagnóstico por punto (sin imprimir en cada fallo)
+    # ------------------------------
+    print("\n--- Diagnóstico ---")
+    cols, codigos, conteos = calc_pvt_diagnostico(P, pb, rsb, api, sg_gas, tr,
+                                                  sgo=sgo, psep=[100.0, 100.0, 100.0, -5.0, 100.0])
+    for p_i, c in zip(P, codigos):
+        print(f"P = {p_i:9.2f} -> {describir(c) or ['ok']}")
+    print("Conteos ->", conteos)
+
+    # ------------------------------
+    # 10) Derivadas analíticas contra diferencias centrales
+    # ------------------------------
+    print("\n--- Derivadas dX/dP ---")
+    P = [1000.0, pb, pr]
+    valores, derivadas = calc_pvt_array(P, pb, rsb, api, sg_gas, tr, sgo, derivadas=True)
+    h = 1e-2
+    mas = calc_pvt_array([p_i + h for p_i in P], pb, rsb, api, sg_gas, tr, sgo)
+    menos = calc_pvt_array([p_i - h for p_i in P], pb, rsb, api, sg_gas, tr, sgo)
+    for nombre, d, a, b in zip(COLUMNAS, derivadas, mas, menos):
+        # En Pb la derivada analítica es la de la rama saturada (por la izquierda)
+        print(f"d{nombre}/dP analítica -> {d}  diferencias -> {(a - b) / (2 * h)}")
+
+    # ------------------------------
+    # 11) Kernel fusionado (sin compilar) contra el backend numpy
+    # ------------------------------
+    print("\n--- Kernel fusionado vs numpy ---")
+    # Barrido que cruza Pb, con P <= 0 (NaN) y T por punto; el resto de los
+    # parámetros pasa con largo 1, como en _evaluar_fusionado
+    P = np.concatenate([[-100.0, 0.0], np.linspace(14.7, 2 * pb, 400), [pb]])
+    T = np.linspace(100.0, 250.0, P.size)
+    unico = lambda v: np.array([v], dtype=float)
+    salida = np.empty((5, P.size))
+    backends._kernel_fusionado(P, unico(pb), unico(rsb), unico(api), unico(sg_gas), T,
+                               unico(sgo), unico(psep), unico(tsep), salida)
+    referencia = backends.evaluar_pvt(P, pb, rsb, api, sg_gas, T, sgo, psep, tsep,
+                                      backend="numpy")
+    comparar = {"python": salida}
+    if "numba" in backends.disponibles():
+        comparar["numba"] = np.array(backends.evaluar_pvt(P, pb, rsb, api, sg_gas, T, sgo,
+                                                           psep, tsep, backend="numba"))
+    for nombre_backend, valores in comparar.items():
+        for nombre, v, ref in zip(COLUMNAS, valores, referencia):
+            assert np.array_equal(np.isnan(v), np.isnan(ref)), (nombre_backend, nombre)
+            assert np.allclose(v, ref, rtol=1e-12, atol=0.0, equal_nan=True), (nombre_backend, nombre)
+        print(f"[OK] kernel {nombre_backend}: {P.size} puntos, "
+              f"{int(np.isnan(valores[0]).sum())} NaN en las mismas posiciones")
+
+    # ------------------------------
+    # 12) calc_todas contra las funciones de PVT_vec por separado
+    # ------------------------------
+    print("\n--- calc_todas vs calc_todas_individual ---")
+    # Malla P × T que cruza Pb; con T < 255.37 °F el término de temperatura
+    # de Velarde es negativo y rs_velarde da NaN
+    P = np.linspace(-100.0, 2 * pb, 121)[:, None]
+    T = np.linspace(100.0, 350.0, 11)[None, :]
+    # Bloques pequeños (varios por lote) y el bloque por defecto
+    for bloque in (7, BLOQUE):
+        conjunta = calc_todas(P, pb, rsb, api, sg_gas, T, sgo, psep, tsep, bloque)
+        individual = calc_todas_individual(P, pb, rsb, api, sg_gas, T, sgo, psep, tsep)
+        for columna in COLUMNAS_TODAS:
+            a, b = conjunta[columna], individual[columna]
+            assert a.shape == b.shape, columna
+            assert np.array_equal(np.isnan(a), np.isnan(b)), columna
+            assert np.allclose(a, b, rtol=1e-12, atol=0.0, equal_nan=True), columna
+    assert np.isnan(conjunta["rs_velarde"][:, T[0] < 255.37]).all()
+    assert np.isfinite(conjunta["rs_velarde"][P[:, 0] > pb][:, T[0] > 255.37]).all()
+    print(f"[OK] {len(COLUMNAS_TODAS)} columnas en {P.size * T.size} puntos, "
+          f"NaN de Velarde en {int(np.isnan(conjunta['rs_velarde']).sum())}")
+
+    # ------------------------------
+    # 13) Exportación a Eclipse (PVTO) por bloques
+    # ------------------------------
+    print("\n--- PVTO por bloques ---")
+    fluido = {"api": api, "sg_gas": sg_gas, "sgo": sgo, "rsb": rsb, "pb": pb, "T": tr,
+              "psep": psep, "tsep": tsep}
+    P = np.linspace(500.0, 5000.0, 12)
+    T = np.array([tr, 200.0])
+    for max_subsat in (10, None):
+        textos = {}
+        for filas_bloque in (1, 5, FILAS_BLOQUE):
+            buf = io.StringIO()
+            escribir_eclipse(buf, fluido, P, T, palabras=("PVTO",), max_subsat=max_subsat,
+                             filas_bloque=filas_bloque)
+            textos[filas_bloque] = buf.getvalue()
+        # Con la malla pequeña FILAS_BLOQUE (por defecto) escribe un solo bloque
+        assert textos[1] == textos[FILAS_BLOQUE] and textos[5] == textos[FILAS_BLOQUE]
+
+        tablas = textos[FILAS_BLOQUE].split("-- T = ")[1:]
+        assert len(tablas) == T.size
+        for tabla in tablas:
+            lineas = [l for l in tabla.splitlines()[1:] if l.strip() and not l.startswith("--")]
+            assert lineas[-1] == "/"
+            rs, fines = [], 0
+            for i, linea in enumerate(lineas[:-1]):
+                campos = linea.replace("/", " ").split()
+                if len(campos) == 4:
+                    # Fila saturada (con Rs): el registro anterior ya cerró
+                    assert i == 0 or lineas[i - 1].endswith(" /"), linea
+                    rs.append(float(campos[0]))
+                fines += linea.endswith(" /")
+            assert lineas[-2].endswith(" /") and fines == len(rs)
+            assert np.all(np.diff(rs) > 0)
+        print(f"[OK] max_subsat={max_subsat}: bloques de 1 y 5 filas idénticos al bloque único, "
+              f"{len(rs)} registros en la última tabla")
+
+    # ------------------------------
+    # 14) Factor Z: carta de Standing–Katz, DAK y Hall–Yarborough
+    # ------------------------------
+    print("\n--- Factor Z del gas ---")
+    # (Ppr, Tpr, Z leído de la carta de Standing–Katz)
+    carta = np.array([(1.0, 1.5, 0.90), (2.0, 1.5, 0.82), (3.0, 1.5, 0.78), (4.0, 2.0, 0.94)])
+    ppr, tpr, z_carta = carta.T
+    z_d, ok_d, _ = z_dak(ppr, tpr)
+    z_h, ok_h, _ = z_hall_yarborough(ppr, tpr)
+    assert ok_d.all() and ok_h.all()
+    assert np.allclose(z_d, z_carta, atol=1e-2) and np.allclose(z_h, z_carta, atol=1e-2)
+    for fila, zd, zh in zip(carta, z_d, z_h):
+        print(f"Ppr = {fila[0]:.1f}, Tpr = {fila[1]:.1f}: carta {fila[2]:.2f}  "
+              f"DAK {zd:.4f}  HY {zh:.4f}")
+    # Mismo gas en un barrido de presiones y temperaturas
+    P = np.linspace(14.7, 8000.0, 200)[:, None]
+    T = np.array([tr, 200.0, 300.0])[None, :]
+    z_d, ok_d, _ = z_factor(P, T, sg_gas, "dak")
+    z_h, ok_h, _ = z_factor(P, T, sg_gas, "hy")
+    assert ok_d.all() and ok_h.all()
+    assert np.allclose(z_d, z_h, atol=1e-2, rtol=0.0)
+    print(f"[OK] DAK vs HY en {P.size * T.size} puntos: "
+          f"máx |ΔZ| = {np.max(np.abs(z_d - z_h)):.2e}, todos convergidos")
+
+    # ------------------------------
+    # 15) Agua de formación: propiedades_agua contra cada correlación
+    # ------------------------------
+    print("\n--- Agua de formación ---")
+    P = np.array([-10.0, 0.0, 14.7, 1000.0, 3000.0, 5000.0, 8000.0])
+    casos = {
+        "T y S escalares": (P, tr, 3.0),
+        "T y S por punto": (P, np.array([-20.0, 0.0, 100.0, 150.0, 200.0, 250.0, 300.0]),
+                            np.array([0.0, 5.0, 10.0, -1.0, 20.0, 26.0, 30.0])),
+        "malla P × T": (P[:, None], np.array([100.0, 200.0, 300.0])[None, :], 10.0),
+    }
+    for caso, (p_w, t_w, s_w) in casos.items():
+        conjunta = propiedades_agua(p_w, t_w, s_w)
+        individuales = (bw_mccain(p_w, t_w), rsw_mccain(p_w, t_w, s_w),
+                        mu_w_mccain(p_w, t_w, s_w), cw_osif(p_w, t_w, s_w))
+        for nombre, v, (ref, ok) in zip(COLUMNAS_AGUA, conjunta, individuales):
+            ref = np.broadcast_to(np.where(ok, ref, np.nan), v.shape)
+            assert np.array_equal(np.isnan(v), np.isnan(ref)), (caso, nombre)
+            assert np.allclose(v, ref, rtol=1e-14, atol=0.0, equal_nan=True), (caso, nombre)
+        print(f"[OK] {caso}: {int(np.isnan(np.array(conjunta)).sum())} NaN en las mismas posiciones")
+    # Agua pura a 200 °F (McCain, 1990; cw de Osif, 1988)
+    referencias = (
+        ("Bw(5000 psia)", bw_mccain(5000.0, 200.0), 1.028),
+        ("Rsw(5000 psia) [scf/stb]", rsw_mccain(5000.0, 200.0), 21.8),
+        ("mu_w(14.7 psia) [cp]", mu_w_mccain(14.7, 200.0), 0.29),
+        ("cw(5000 psia) [1/psia]", cw_osif(5000.0, 200.0), 3.0e-6),
+    )
+    for nombre, (v, ok), libro in referencias:
+        assert ok and abs(float(v) / libro - 1.0) < 0.02, nombre
+        print(f"{nombre}: {float(v):.6g}  (referencia {libro:g})")
+
+    # ------------------------------
+    # 16) Pb: Newton–bisección contra la inversa cerrada de Standing
+    # ------------------------------
+    print("\n--- Pb Newton vs cerrada ---")
+    # rsb = 1e-6 da 18.2·(x − 1.4) <= 0: ambos métodos deben rechazarlo
+    rsb_pb = np.array([rsb, 50.0, 500.0, 2000.0, 1e-6, 0.0, -5.0])[:, None]
+    api_pb = np.array([20.0, api, 60.0])[None, :]
+    t_pb = np.array([100.0, tr, 300.0])[None, :]
+    pb_c, ok_c, _ = resolver_pb(rsb_pb, api_pb, sg_gas, t_pb, metodo="cerrada")
+    pb_n, ok_n, _ = resolver_pb(rsb_pb, api_pb, sg_gas, t_pb, metodo="newton")
+    assert np.array_equal(ok_c, ok_n) and np.array_equal(np.isnan(pb_c), np.isnan(pb_n))
+    assert not ok_n[4:].any() and ok_n[:4].all()
+    assert np.allclose(pb_n, pb_c, rtol=1e-8, atol=0.0, equal_nan=True)
+    print(f"[OK] {int(ok_n.sum())} Pb iguales (máx error relativo "
+          f"{np.nanmax(np.abs(pb_n / pb_c - 1.0)):.1e}), {int((~ok_n).sum())} rechazadas (rsb <= 0 o pb <= 0)")
+
     print("\n========== FIN DE PRUEBAS ==========\n")
 
 
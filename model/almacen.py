@@ -0,0 +1,169 @@
+#Almacén columnar en disco para tablas de realizaciones (Results)
+#Las realizaciones se escriben por bloques, así que el tamaño de la tabla no
+#está limitado por la memoria ni por las filas de una hoja de Excel.
+#   "npy"     : una carpeta con un .npy por columna y meta.json. Cada archivo
+#               se preasigna con su encabezado y los bloques se escriben en su
+#               posición con write (no con un memmap, cuyas páginas escritas
+#               cuentan en la memoria del proceso hasta el final). Se reabre
+#               con np.load(mmap_mode="r"): las columnas son vistas del
+#               archivo, sin copiar ni leer todo.
+#   "parquet" : un archivo Parquet con un row group por bloque (requiere
+#               pyarrow). Comprimido y portable; al reabrir se decodifica.
+#meta.json se escribe al cerrar, así que una carpeta sin él es una escritura
+#incompleta.
+
+import json
+import os
+
+import numpy as np
+
+FORMATOS = ("npy", "parquet")
+META = "meta.json"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("El formato parquet requiere pyarrow") from e
+    return pyarrow
+
+
+class EscritorColumnas:
+    """
+    Escritura por bloques de una tabla de n filas y columnas float.
+
+    ruta : carpeta (npy) o archivo .parquet
+    columnas : nombres de las columnas, en orden
+    n : número total de filas (npy lo preasigna; parquet lo verifica al cerrar)
+    dtype : tipo de las columnas (float64 por defecto)
+
+    Uso:
+        with EscritorColumnas(ruta, columnas, n) as w:
+            w.escribir(inicio, [col0, col1, ...])
+    """
+
+    def __init__(self, ruta, columnas, n, formato="npy", dtype=np.float64):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato}. Opciones: {', '.join(FORMATOS)}")
+        self.ruta = ruta
+        self.columnas = tuple(columnas)
+        self.n = int(n)
+        self.formato = formato
+        self.dtype = np.dtype(dtype)
+        self.escritas = 0
+
+        if formato == "npy":
+            os.makedirs(ruta, exist_ok=True)
+            meta = os.path.join(ruta, META)
+            if os.path.exists(meta):
+                os.remove(meta)
+            self._archivos = [f"c{i:03d}.npy" for i in range(len(self.columnas))]
+            self._columnas = []
+            for a in self._archivos:
+                archivo = os.path.join(ruta, a)
+                mapa = np.lib.format.open_memmap(archivo, mode="w+", dtype=self.dtype,
+                                                 shape=(self.n,))
+                self._inicio = mapa.offset
+                del mapa
+                self._columnas.append(open(archivo, "r+b"))
+        else:
+            pa = _pyarrow()
+            carpeta = os.path.dirname(ruta)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            self._esquema = pa.schema([(c, pa.from_numpy_dtype(self.dtype)) for c in self.columnas])
+            self._parquet = pa.parquet.ParquetWriter(ruta, self._esquema)
+
+    def escribir(self, inicio, valores):
+        """Filas [inicio, inicio + m) de cada columna (en el orden de columnas)."""
+        if len(valores) != len(self.columnas):
+            raise ValueError(f"Se esperaban {len(self.columnas)} columnas, hay {len(valores)}")
+        m = len(valores[0])
+        if self.formato == "npy":
+            for f, v in zip(self._columnas, valores):
+                f.seek(self._inicio + inicio * self.dtype.itemsize)
+                f.write(np.ascontiguousarray(v, dtype=self.dtype).data)
+        else:
+            # Parquet solo se escribe en orden
+            if inicio != self.escritas:
+                raise ValueError("El formato parquet requiere escribir los bloques en orden")
+            pa = _pyarrow()
+            lote = pa.table([pa.array(np.asarray(v, dtype=self.dtype)) for v in valores],
+                            schema=self._esquema)
+            self._parquet.write_table(lote)
+        self.escritas += m
+
+    def cerrar(self):
+        if self.formato == "npy":
+            for f in self._columnas:
+                f.close()
+            self._columnas = []
+            with open(os.path.join(self.ruta, META), "w", encoding="utf-8") as f:
+                json.dump({"columnas": list(self.columnas), "archivos": self._archivos,
+                           "n": self.n, "dtype": self.dtype.str}, f, indent=2)
+        else:
+            self._parquet.close()
+        if self.escritas != self.n:
+            raise ValueError(f"Se escribieron {self.escritas} filas de {self.n}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *_):
+        if tipo is None:
+            self.cerrar()
+        elif self.formato == "npy":
+            for f in self._columnas:
+                f.close()
+        else:
+            self._parquet.close()
+
+
+def formato_de(ruta):
+    """'npy' si ruta es una carpeta del almacén, 'parquet' si es un archivo."""
+    if os.path.isdir(ruta):
+        return "npy"
+    if ruta.lower().endswith(".parquet"):
+        return "parquet"
+    raise ValueError(f"No es un almacén de resultados: {ruta}")
+
+
+def abrir_columnas(ruta, columnas=None):
+    """
+    Reabre la tabla escrita por EscritorColumnas.
+
+    npy: cada columna es un np.memmap de solo lectura (sin copia); parquet:
+    arreglos leídos del archivo. columnas limita las que se abren.
+
+    Retorna dict nombre -> ndarray, en el orden de la tabla.
+    """
+    if formato_de(ruta) == "npy":
+        meta_ruta = os.path.join(ruta, META)
+        if not os.path.exists(meta_ruta):
+            raise ValueError(f"Almacén incompleto (falta {META}): {ruta}")
+        with open(meta_ruta, encoding="utf-8") as f:
+            meta = json.load(f)
+        return {c: np.load(os.path.join(ruta, a), mmap_mode="r")
+                for c, a in zip(meta["columnas"], meta["archivos"])
+                if columnas is None or c in columnas}
+
+    pa = _pyarrow()
+    tabla = pa.parquet.read_table(ruta, columns=list(columnas) if columnas else None,
+                                  memory_map=True)
+    return {c: tabla.column(c).to_numpy() for c in tabla.column_names}
+
+
+def abrir_dataframe(ruta, columnas=None):
+    """La tabla como pandas.DataFrame (las columnas npy siguen mapeadas al archivo)."""
+    import pandas as pd
+    return pd.DataFrame(abrir_columnas(ruta, columnas), copy=False)
+
+
+def filas_almacen(ruta):
+    """Número de filas de la tabla sin abrir las columnas."""
+    if formato_de(ruta) == "npy":
+        with open(os.path.join(ruta, META), encoding="utf-8") as f:
+            return json.load(f)["n"]
+    return _pyarrow().parquet.ParquetFile(ruta).metadata.num_rows
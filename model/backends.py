@@ -0,0 +1,263 @@
+#Selector de backends de cálculo para las correlaciones PVT
+#   "python" : versión escalar de PVT.py punto a punto (referencia)
+#   "numpy"  : motor vectorizado (pvt_engine.calc_pvt_array)
+#   "numba"  : un solo ciclo compilado que encadena Rs -> Co -> Bo -> ρo -> μo
+#              por punto, sin arreglos intermedios (requiere numba)
+#El backend se elige en tiempo de ejecución con set_backend o la variable de
+#entorno PVT_BACKEND. Si se pide un backend cuya dependencia opcional no está
+#instalada, se usa "numpy" con una advertencia.
+
+import contextlib
+import io
+import math
+import os
+import warnings
+
+import numpy as np
+
+from model import PVT
+from model.pvt_engine import calc_pvt_array
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKEND_DEFECTO = "numpy"
+
+_backend_actual = os.environ.get("PVT_BACKEND", BACKEND_DEFECTO).lower()
+_kernel_compilado = None
+
+
+# =========================
+# Backend "python": referencia escalar
+# =========================
+def _calc_pvt_at_p(p, pb, rsb, api, sg_gas, tr, sgo, psep, tsep):
+    """Mismas ramas que el calc_pvt_at_p original, con las funciones de PVT.py."""
+    if p <= pb:
+        rs_p = PVT.rs_standing(api, sg_gas, p, tr)
+        co_p = PVT.co_vasquez_beggs(rsb, sg_gas, api, tr, p, psep, tsep)
+        bo_p = PVT.bo_standing(rs_p, sg_gas, sgo, tr)
+        rho_p = PVT.ro_standing(rs_p, sg_gas, sgo, tr)
+        mu_o_p = PVT.mu_beggs_robinson(api, tr, Rs=rs_p)
+    else:
+        rs_p = PVT.rs_velarde(rsb, sg_gas, sgo, pb, p, tr)
+        co_p = PVT.co_petrosk(rsb, sg_gas, p, tr, api)
+        bo_p = PVT.bo_vasbeg(rs_p, api, sg_gas, tr, psep, tsep)
+        rho_pb = PVT.ro_standing(rsb, sg_gas, sgo, tr)
+        rho_p = PVT.ro_subsaturado(rho_pb, co_p, p, pb)
+        mu_ob_p = PVT.mu_beggs_robinson(api, tr, Rs=rs_p)
+        mu_o_p = PVT.muo_vasquez_beggs(mu_ob_p, p, pb)
+    return rs_p, bo_p, co_p, rho_p, mu_o_p
+
+
+def _a_float(v):
+    """None o complejo (fallo en la versión escalar) -> NaN."""
+    if v is None or isinstance(v, complex):
+        return math.nan
+    return float(v)
+
+
+def _evaluar_python(P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep):
+    entradas = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in
+                                     (P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)])
+    forma = entradas[0].shape
+    planos = [a.ravel() for a in entradas]
+    salida = np.empty((5, planos[0].size))
+    # Los mensajes de error de PVT.py se descartan: el NaN ya los marca
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(salida.shape[1]):
+            valores = _calc_pvt_at_p(*[float(a[i]) for a in planos])
+            salida[:, i] = [_a_float(v) for v in valores]
+    salida[~np.isfinite(salida)] = np.nan
+    return tuple(col.reshape(forma) for col in salida)
+
+
+# =========================
+# Backend "numba": cadena fusionada
+# =========================
+def _kernel_fusionado(P, pb, rsb, api, sg, tr, sgo, psep, tsep, salida):
+    """
+    Ciclo único sobre los puntos; salida es (5, n) y cada entrada tiene
+    largo n o 1 (un valor para todos los puntos, p. ej. los parámetros del
+    fluido). Reproduce calc_pvt_array, incluido μod cuando Rs no es válido.
+    Se compila con numba.njit; sin compilar sirve de verificación.
+    """
+    nan = math.nan
+    # Paso 1 para las entradas de largo n y 0 para las de largo 1
+    sP, spb, srsb = min(P.size - 1, 1), min(pb.size - 1, 1), min(rsb.size - 1, 1)
+    sapi, ssg, str_ = min(api.size - 1, 1), min(sg.size - 1, 1), min(tr.size - 1, 1)
+    ssgo, spsep, stsep = min(sgo.size - 1, 1), min(psep.size - 1, 1), min(tsep.size - 1, 1)
+    for i in range(salida.shape[1]):
+        p, pb_i, rsb_i, api_i = P[i * sP], pb[i * spb], rsb[i * srsb], api[i * sapi]
+        yg, t, yo = sg[i * ssg], tr[i * str_], sgo[i * ssgo]
+        ps, ts = psep[i * spsep], tsep[i * stsep]
+
+        # μod de Beggs–Robinson (necesario en ambos regímenes)
+        mu_od = nan
+        if t > 0:
+            x = 10.0 ** ((3.0324 - 0.02023 * api_i) * (t ** -1.163))
+            if x < 308.0:
+                mu_od = (10.0 ** x) - 1.0
+
+        # Gas corregido por separador (Vasquez–Beggs)
+        ygs = nan
+        if ps > 0:
+            ygs = yg * (1.0 + 5.912e-5 * api_i * ts * math.log(ps / 114.7))
+
+        if p <= pb_i:
+            # --- Rs Standing ---
+            base = ((p / 18.2) + 1.4) * (10.0 ** (0.0125 * api_i - 0.00091 * t))
+            rs = yg * base ** 1.2048 if base >= 0 else nan
+            # --- Co Vasquez–Beggs ---
+            co = nan
+            if p != 0:
+                co = (-1433 + (5 * rsb_i) + (17.2 * t) - (1180 * ygs) + (12.61 * api_i)) / (1e5 * p)
+            # --- Bo Standing ---
+            bo = nan
+            if yo != 0 and yg / yo >= 0:
+                term = rs * ((yg / yo) ** 0.5) + 1.25 * t
+                if term >= 0:
+                    bo = 0.9759 + 0.000120 * (term ** 1.2)
+            # --- ρo Standing ---
+            rho = nan
+            if yo != 0 and yg / yo >= 0:
+                term = rs * (yg / yo) ** 0.25 + 1.25 * t
+                if term >= 0:
+                    rho = (62.4 * yo + 0.0136 * rs * yg) / (0.972 + 0.000147 * (term ** 1.175))
+            # --- μo = μob ---
+            if math.isnan(rs):
+                mu = mu_od
+            elif mu_od >= 0:
+                mu = 10.715 * (rs + 100) ** (-0.515) * (mu_od ** (5.44 * (rs + 150) ** (-0.338)))
+            else:
+                mu = nan
+        else:
+            # --- Rs Velarde ---
+            rs = nan
+            temp_term = 1.8 * t - 459.67
+            if pb_i > 0 and p > 0 and temp_term > 0 and yg > 0 and yo > 0:
+                pr = (p - 0.101) / pb_i
+                if pr > 0:
+                    a1 = (0.000018653 * (yg ** 1.672608) * (yo ** 0.929870)
+                          * (temp_term ** 0.247235) * (pb_i ** 1.056052))
+                    a2 = (0.1004 * (yg ** -1.00475) * (yo ** 0.337711)
+                          * (temp_term ** 0.132795) * (pb_i ** 0.302065))
+                    a3 = (0.9167 * (yg ** -1.48548) * (yo ** -0.164741)
+                          * (temp_term ** -0.09133) * (pb_i ** 0.047094))
+                    a1 = max(0.0, min(1.0, a1))
+                    rs = (a1 * (pr ** a2) + (1.0 - a1) * (pr ** a3)) * rsb_i
+                    if not (rs - rs) == 0.0:
+                        rs = nan
+            # --- Co Petrosky–Farshad ---
+            co = nan
+            if rsb_i >= 0 and yg >= 0 and api_i >= 0 and t >= 0 and p > 0:
+                co = (1.705e-7 * (rsb_i ** 0.69357) * (yg ** 0.1885) * (api_i ** 0.3272)
+                      * (t ** 0.6729) * (p ** -0.5906))
+            # --- Bo Vasquez–Beggs ---
+            bo = nan
+            if ygs == ygs and ygs != 0:
+                if api_i >= 30:
+                    C1, C2, C3 = 4.677e-4, 1.751e-5, -1.811e-8
+                else:
+                    C1, C2, C3 = 4.670e-4, 1.100e-5, 1.337E-9
+                bo = 1.0 + (C1 * rs) + (t - 60) * (api_i / ygs) * (C2 + (C3 * rs))
+            # --- ρo = ρob · exp(Co · (P − Pb)) ---
+            rho = nan
+            if yo != 0 and yg / yo >= 0:
+                term = rsb_i * (yg / yo) ** 0.25 + 1.25 * t
+                if term >= 0:
+                    rho_ob = (62.4 * yo + 0.0136 * rsb_i * yg) / (0.972 + 0.000147 * (term ** 1.175))
+                    arg = co * (p - pb_i)
+                    if arg < 709.0:
+                        rho = rho_ob * math.exp(arg)
+            # --- μo Vasquez–Beggs ---
+            if math.isnan(rs):
+                mu_ob = mu_od
+            elif mu_od >= 0:
+                mu_ob = 10.715 * (rs + 100) ** (-0.515) * (mu_od ** (5.44 * (rs + 150) ** (-0.338)))
+            else:
+                mu_ob = nan
+            mu = nan
+            if p > 0 and pb_i > 0:
+                m = 2.6 * (pb_i ** 1.187) * math.exp(-11.513 - 8.98e-5 * pb_i)
+                mu = mu_ob * (p / pb_i) ** m
+
+        valores = (rs, bo, co, rho, mu)
+        for k in range(5):
+            v = valores[k]
+            salida[k, i] = v if (v - v) == 0.0 else nan
+
+
+def _obtener_kernel():
+    """Compila el kernel fusionado la primera vez que se usa."""
+    global _kernel_compilado
+    if _kernel_compilado is None:
+        _kernel_compilado = numba.njit(cache=True)(_kernel_fusionado)
+    return _kernel_compilado
+
+
+def _evaluar_fusionado(P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep, kernel=None):
+    entradas = [np.asarray(a, dtype=float) for a in (P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)]
+    forma = np.broadcast_shapes(*[a.shape for a in entradas])
+    # Los valores únicos (parámetros del fluido) pasan con largo 1; solo se
+    # aplanan (y se copian si hace falta) las entradas que varían por punto
+    planos = [a.reshape(1) if a.size == 1 else
+              np.ascontiguousarray(np.broadcast_to(a, forma)).ravel() for a in entradas]
+    salida = np.empty((5, math.prod(forma)))
+    (kernel or _obtener_kernel())(*planos, salida)
+    return tuple(col.reshape(forma) for col in salida)
+
+
+# =========================
+# Registro y selección
+# =========================
+BACKENDS = {
+    "python": (_evaluar_python, lambda: True),
+    "numpy": (calc_pvt_array, lambda: True),
+    "numba": (_evaluar_fusionado, lambda: numba is not None),
+}
+
+
+def disponibles():
+    """Nombres de los backends que se pueden usar en este entorno."""
+    return [k for k, (_, ok) in BACKENDS.items() if ok()]
+
+
+def set_backend(nombre):
+    """Elige el backend por defecto ("python", "numpy" o "numba")."""
+    global _backend_actual
+    nombre = nombre.lower()
+    if nombre not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {nombre}. Opciones: {', '.join(BACKENDS)}")
+    _backend_actual = nombre
+
+
+def get_backend():
+    """Backend que se usará realmente (con la sustitución por dependencias faltantes)."""
+    nombre = _backend_actual if _backend_actual in BACKENDS else BACKEND_DEFECTO
+    if not BACKENDS[nombre][1]():
+        warnings.warn(f"El backend '{nombre}' no está disponible; se usa '{BACKEND_DEFECTO}'",
+                      RuntimeWarning, stacklevel=3)
+        return BACKEND_DEFECTO
+    return nombre
+
+
+def evaluar_pvt(P, pb, rsb, api, sg_gas, tr, sgo=0.82, psep=100.0, tsep=120.0, backend=None):
+    """
+    Rs, Bo, Co, rho y mu_o con el backend elegido.
+
+    Mismos argumentos y resultado que pvt_engine.calc_pvt_array. backend
+    permite forzar uno distinto del configurado con set_backend.
+    """
+    if backend is not None:
+        backend = backend.lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}")
+        if not BACKENDS[backend][1]():
+            warnings.warn(f"El backend '{backend}' no está disponible; se usa '{BACKEND_DEFECTO}'",
+                          RuntimeWarning, stacklevel=2)
+            backend = BACKEND_DEFECTO
+    else:
+        backend = get_backend()
+    return BACKENDS[backend][0](P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)
@@ -0,0 +1,176 @@
+#Presión de burbuja a partir de Rsb (Standing invertida) para muchos fluidos
+#En Pb el gas en solución es Rsb, así que Pb es la raíz de
+#   rs_standing(api, sg, Pb, T) − Rsb = 0
+#La ecuación de Standing tiene inversa cerrada; además se incluye un
+#resolvedor vectorizado de Newton con bisección de respaldo que itera todas
+#las muestras a la vez, con máscara de convergencia y conteo de iteraciones
+#por elemento (sirve para correlaciones sin inversa y para verificar).
+
+import numpy as np
+
+# Presión donde la base de Standing se anula: Rs(P0) = 0 para cualquier fluido
+P_RS_CERO = -18.2 * 1.4
+
+# Cota superior del intervalo de búsqueda (psia)
+P_MAX_BUSQUEDA = 1.0e5
+
+
+def _planos(*args):
+    entradas = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+    return entradas[0].shape, [np.ascontiguousarray(a).ravel() for a in entradas]
+
+
+def pb_standing(rsb, api, sg_gas, t_f):
+    """
+    Pb (psia) de Standing (1947) en forma cerrada.
+
+        Pb = 18.2 · ((Rsb/γg)^(1/1.2048) · 10^(0.00091·T − 0.0125·API) − 1.4)
+
+    Parámetros
+    ----------
+    rsb, api, sg_gas, t_f : float o ndarray (broadcasting)
+
+    Retorna
+    -------
+    pb : ndarray, NaN donde Rsb < 0, γg <= 0 o Pb <= 0 (Rsb menor que el Rs
+         de Standing a 0 psia)
+    valido : ndarray bool
+    """
+    rsb, api, sg_gas, t_f = np.broadcast_arrays(
+        *[np.asarray(a, dtype=float) for a in (rsb, api, sg_gas, t_f)])
+    with np.errstate(all="ignore"):
+        pb = 18.2 * ((rsb / sg_gas) ** (1.0 / 1.2048)
+                     * 10.0 ** (0.00091 * t_f - 0.0125 * api) - 1.4)
+    valido = (rsb >= 0) & (sg_gas > 0) & np.isfinite(pb) & (pb > 0)
+    return np.where(valido, pb, np.nan), valido
+
+
+def newton_biseccion(f, lo, hi, x0=None, tol=1e-12, max_iter=100):
+    """
+    Raíces de muchas ecuaciones escalares a la vez con Newton protegido.
+
+    Cada elemento mantiene su propio intervalo [lo, hi] con cambio de signo;
+    si el paso de Newton sale del intervalo (o la derivada es 0 o no finita)
+    se toma el punto medio. Solo se evalúan los elementos que no han
+    convergido.
+
+    Parámetros
+    ----------
+    f : callable
+        f(x, idx) -> (valor, derivada) para los elementos idx (índices
+        planos) evaluados en x; ambos del mismo largo que idx.
+    lo, hi : ndarray
+        Extremos del intervalo de cada elemento.
+    x0 : ndarray, opcional
+        Punto de partida (por defecto el punto medio).
+    tol : float
+        Convergencia cuando |Δx| <= tol · (1 + |x|) o f(x) = 0.
+    max_iter : int
+        Máximo de iteraciones por elemento.
+
+    Retorna
+    -------
+    x : ndarray, raíz (NaN donde no convergió o no había cambio de signo)
+    convergido : ndarray bool
+    iteraciones : ndarray int, evaluaciones de f por elemento (sin contar
+                  los extremos)
+    """
+    lo = np.array(lo, dtype=float).ravel()
+    hi = np.array(hi, dtype=float).ravel()
+    n = lo.size
+    todos = np.arange(n)
+    f_lo, _ = f(lo, todos)
+    f_hi, _ = f(hi, todos)
+
+    # Se orienta el intervalo para que f(lo) < 0 < f(hi)
+    invertir = f_lo > 0
+    lo[invertir], hi[invertir] = hi[invertir], lo[invertir]
+    f_lo, f_hi = np.where(invertir, f_hi, f_lo), np.where(invertir, f_lo, f_hi)
+
+    x = (0.5 * (lo + hi)) if x0 is None else np.array(x0, dtype=float).ravel().copy()
+    convergido = np.zeros(n, dtype=bool)
+    iteraciones = np.zeros(n, dtype=np.int64)
+
+    # Raíz exacta en un extremo
+    for extremo, f_ext in ((lo, f_lo), (hi, f_hi)):
+        en_raiz = f_ext == 0
+        x[en_raiz] = extremo[en_raiz]
+        convergido[en_raiz] = True
+
+    acotado = (f_lo < 0) & (f_hi > 0)
+    activos = np.flatnonzero(acotado & ~convergido)
+
+    for _ in range(max_iter):
+        if activos.size == 0:
+            break
+        xa = x[activos]
+        fa, da = f(xa, activos)
+        iteraciones[activos] += 1
+
+        # Se achica el intervalo con el signo de f
+        negativo = fa < 0
+        lo_a = np.where(negativo, xa, lo[activos])
+        hi_a = np.where(negativo, hi[activos], xa)
+        lo[activos], hi[activos] = lo_a, hi_a
+
+        with np.errstate(all="ignore"):
+            paso = np.where(fa == 0, 0.0, fa / da)
+        xn = xa - paso
+        # La convergencia se mide con el paso de Newton: cerca de la raíz el
+        # paso puede ser menor que un ulp y caer justo en el extremo
+        hecho = np.abs(paso) <= tol * (1.0 + np.abs(xa))
+        biseccion = ~hecho & ~((xn - lo_a) * (xn - hi_a) < 0)
+        xn[biseccion] = 0.5 * (lo_a[biseccion] + hi_a[biseccion])
+        x[activos] = xn
+        convergido[activos[hecho]] = True
+        activos = activos[~hecho]
+
+    return np.where(convergido, x, np.nan), convergido, iteraciones
+
+
+def resolver_pb(rsb, api, sg_gas, t_f, metodo="cerrada", tol=1e-12, max_iter=100):
+    """
+    Presión de burbuja de todas las muestras a la vez (Standing).
+
+    Parámetros
+    ----------
+    rsb, api, sg_gas, t_f : float o ndarray
+        Rs en Pb (scf/STB), gravedad API, gravedad del gas y T (°F).
+    metodo : str
+        "cerrada" usa la inversa exacta de Standing; "newton" resuelve
+        rs_standing(P) = Rsb con newton_biseccion en [P_RS_CERO, P_MAX_BUSQUEDA].
+
+    Retorna
+    -------
+    pb : ndarray (psia) con la forma común, NaN donde no hay solución o
+         Pb <= 0
+    convergido : ndarray bool
+    iteraciones : ndarray int (0 con la forma cerrada)
+    """
+    forma, (rsb, api, sg_gas, t_f) = _planos(rsb, api, sg_gas, t_f)
+
+    if metodo == "cerrada":
+        pb, valido = pb_standing(rsb, api, sg_gas, t_f)
+        return (pb.reshape(forma), valido.reshape(forma),
+                np.zeros(forma, dtype=np.int64))
+    if metodo != "newton":
+        raise ValueError(f"Método desconocido: {metodo}")
+
+    # 10**x no depende de P: se calcula una vez por muestra
+    k = 10.0 ** (0.0125 * api - 0.00091 * t_f)
+
+    def residuo(p, idx):
+        with np.errstate(all="ignore"):
+            base = (p / 18.2 + 1.4) * k[idx]
+            rs = sg_gas[idx] * np.maximum(base, 0.0) ** 1.2048
+            drs = sg_gas[idx] * 1.2048 * np.maximum(base, 0.0) ** 0.2048 * k[idx] / 18.2
+        return rs - rsb[idx], drs
+
+    n = rsb.size
+    pb, convergido, iteraciones = newton_biseccion(
+        residuo, np.full(n, P_RS_CERO), np.full(n, P_MAX_BUSQUEDA),
+        tol=tol, max_iter=max_iter)
+    # Igual que la forma cerrada: una raíz negativa no es una Pb física
+    convergido &= pb > 0
+    pb[~convergido] = np.nan
+    return pb.reshape(forma), convergido.reshape(forma), iteraciones.reshape(forma)
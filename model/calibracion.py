@@ -0,0 +1,178 @@
+#Calibración de las correlaciones contra datos de laboratorio (CCE / DL)
+#Ajusta los parámetros de FluidModel (AJUSTE_BASE) por mínimos cuadrados no
+#lineales (Levenberg–Marquardt). Los residuos y los jacobianos analíticos se
+#evalúan en bloque sobre todas las muestras, así que cada iteración es una
+#pasada vectorizada y el sistema normal es de 1×1 o 2×2.
+#
+#   Rs Standing : Rs = rs_mult · γg · ((P/18.2 + 1.4)·10^x)^rs_exp
+#   Bo Standing : Bo = 0.9759 + bo_mult · 1.2e-4 · term^1.2
+#   μob Beggs–Robinson : μob = mu_a · a · μod^(mu_b · b)
+#
+#Los residuos son relativos (Rs, Bo) o logarítmicos (μ), para que las
+#muestras pesen lo mismo sin importar su magnitud.
+
+import numpy as np
+
+from model.fluid_model import AJUSTE_BASE, FluidModel
+
+# Parámetros que ajusta cada correlación
+PARAMETROS = {
+    "rs": ("rs_mult", "rs_exp"),
+    "bo": ("bo_mult",),
+    "mu": ("mu_a", "mu_b"),
+}
+# Columna de laboratorio que usa cada correlación
+OBSERVADO = {"rs": "rs", "bo": "bo", "mu": "mu_o"}
+
+
+def levenberg_marquardt(fun, x0, tol=1e-10, max_iter=100, lam=1e-3):
+    """
+    Mínimos cuadrados no lineales: min ||r(x)||².
+
+    Parámetros
+    ----------
+    fun : callable, fun(x) -> (r, J) con r (n,) y J (n, k)
+    x0 : array (k,), punto inicial
+
+    Retorna
+    -------
+    x : ndarray (k,)
+    convergido : bool
+    iteraciones : int
+    """
+    x = np.asarray(x0, dtype=float).copy()
+    r, J = fun(x)
+    costo = r @ r
+    for it in range(1, max_iter + 1):
+        A = J.T @ J
+        g = J.T @ r
+        escala = np.maximum(np.diag(A), 1e-300)
+        while True:
+            try:
+                paso = np.linalg.solve(A + lam * np.diag(escala), -g)
+            except np.linalg.LinAlgError:
+                paso = np.full_like(x, np.nan)
+            x_n = x + paso
+            r_n, J_n = fun(x_n)
+            costo_n = r_n @ r_n
+            if np.isfinite(costo_n) and costo_n <= costo:
+                break
+            lam *= 10.0
+            if lam > 1e12:
+                return x, False, it
+        mejora = costo - costo_n
+        x, r, J, costo = x_n, r_n, J_n, costo_n
+        lam = max(lam / 10.0, 1e-12)
+        if (np.all(np.abs(paso) <= tol * (np.abs(x) + tol))
+                or mejora <= tol * max(costo, 1e-300)):
+            return x, True, it
+    return x, False, max_iter
+
+
+#%% Residuos y jacobianos por correlación
+def _residuo_rs(x, m):
+    """Residuo relativo de Rs Standing y su jacobiano respecto a (rs_mult, rs_exp)."""
+    mult, exp = x
+    rs = mult * m["sg_gas"] * m["base"] ** exp
+    r = rs / m["rs"] - 1.0
+    J = np.column_stack((rs / (mult * m["rs"]), rs * m["ln_base"] / m["rs"]))
+    return r, J
+
+
+def _residuo_bo(x, m):
+    """Residuo relativo de Bo Standing y su jacobiano respecto a bo_mult."""
+    bo = 0.9759 + x[0] * m["expansion"]
+    return bo / m["bo"] - 1.0, (m["expansion"] / m["bo"])[:, None]
+
+
+def _residuo_mu(x, m):
+    """Residuo ln μob − ln μobs y su jacobiano respecto a (mu_a, mu_b)."""
+    fa, fb = x
+    with np.errstate(all="ignore"):
+        r = np.log(fa) + m["ln_a"] + fb * m["b_ln_mu_od"] - m["ln_mu"]
+    return r, np.column_stack((np.full_like(r, 1.0 / fa), m["b_ln_mu_od"]))
+
+
+def _preparar(correlacion, muestras):
+    """Términos de cada muestra que no dependen de los parámetros (una sola vez)."""
+    col = lambda k: np.asarray(muestras[k], dtype=float)
+    p, t, api, sg = col("p"), col("tr"), col("api"), col("sg_gas")
+    sgo = col("sgo") if "sgo" in muestras else np.full_like(p, 0.82)
+    # Solo puntos saturados: son los que usan estas correlaciones
+    usar = np.isfinite(p) & (p > 0)
+    if "pb" in muestras:
+        usar &= p <= col("pb")
+
+    with np.errstate(all="ignore"):
+        if correlacion == "rs":
+            base = ((p / 18.2) + 1.4) * 10.0 ** (0.0125 * api - 0.00091 * t)
+            datos = {"sg_gas": sg, "base": base, "ln_base": np.log(base), "rs": col("rs")}
+            usar &= (base > 0) & (datos["rs"] > 0)
+        elif correlacion == "bo":
+            # Bo se ajusta con el Rs medido en la misma muestra
+            term = col("rs") * np.sqrt(sg / sgo) + 1.25 * t
+            datos = {"expansion": 0.000120 * term ** 1.2, "bo": col("bo")}
+            usar &= (term >= 0) & (datos["bo"] > 0)
+        elif correlacion == "mu":
+            rs = col("rs")
+            mu_od = 10.0 ** (10.0 ** ((3.0324 - 0.02023 * api) * t ** -1.163)) - 1.0
+            datos = {"ln_a": np.log(10.715 * (rs + 100) ** (-0.515)),
+                     "b_ln_mu_od": 5.44 * (rs + 150) ** (-0.338) * np.log(mu_od),
+                     "ln_mu": np.log(col("mu_o"))}
+        else:
+            raise ValueError(f"Correlación desconocida: {correlacion}. Opciones: {', '.join(PARAMETROS)}")
+    for v in datos.values():
+        usar &= np.isfinite(v)
+    return {k: v[usar] for k, v in datos.items()}
+
+
+RESIDUOS = {"rs": _residuo_rs, "bo": _residuo_bo, "mu": _residuo_mu}
+
+
+def calibrar(muestras, correlaciones=None, tol=1e-10, max_iter=100):
+    """
+    Ajusta los parámetros de las correlaciones a las muestras de laboratorio.
+
+    Parámetros
+    ----------
+    muestras : dict o pandas.DataFrame
+        Columnas p, tr, api, sg_gas y, opcionales, sgo y pb (si está, solo
+        se usan puntos con p <= pb). Observados: rs (scf/stb), bo (rb/stb),
+        mu_o (cp). μ y Bo usan el Rs medido de la misma muestra.
+    correlaciones : iterable, opcional
+        Subconjunto de PARAMETROS; por defecto, las que tienen su columna
+        observada en las muestras.
+
+    Retorna
+    -------
+    ajuste : dict, parámetro -> valor (para FluidModel(..., ajuste=ajuste))
+    resumen : dict, correlación -> n, rms del residuo antes y después,
+              convergido e iteraciones
+    """
+    if correlaciones is None:
+        correlaciones = [c for c in PARAMETROS if OBSERVADO[c] in muestras
+                         and (c == "rs" or "rs" in muestras)]
+    ajuste, resumen = {}, {}
+    for c in correlaciones:
+        datos = _preparar(c, muestras)
+        n = len(next(iter(datos.values())))
+        nombres = PARAMETROS[c]
+        x0 = np.array([AJUSTE_BASE[k] for k in nombres])
+        if n < len(nombres):
+            resumen[c] = {"n": n, "rms_inicial": np.nan, "rms_final": np.nan,
+                          "convergido": False, "iteraciones": 0}
+            continue
+
+        fun = lambda x, f=RESIDUOS[c], d=datos: f(x, d)
+        x, convergido, iteraciones = levenberg_marquardt(fun, x0, tol, max_iter)
+        rms = lambda v: float(np.sqrt(np.mean(fun(v)[0] ** 2)))
+        ajuste.update(zip(nombres, map(float, x)))
+        resumen[c] = {"n": n, "rms_inicial": rms(x0), "rms_final": rms(x),
+                      "convergido": bool(convergido), "iteraciones": iteraciones}
+    return ajuste, resumen
+
+
+def fluido_ajustado(fluido, ajuste):
+    """Copia de un FluidModel con los parámetros de ajuste dados."""
+    return FluidModel(fluido.api, fluido.sg_gas, fluido.sgo, fluido.rsb, fluido.pb,
+                      fluido.T, fluido.psep, fluido.tsep, dict(fluido.ajuste, **ajuste))
@@ -0,0 +1,187 @@
+#Evaluación conjunta de todas las correlaciones alternativas
+#Para QA se comparan lado a lado Standing vs Velarde (Rs), Standing vs
+#Vasquez–Beggs (Bo), Petrosky vs Vasquez–Beggs (Co), etc. Llamar cada
+#función de PVT_vec por separado repite intermedios: γgs corregido por
+#separador (Bo y Co de Vasquez–Beggs), μod (cada llamada a Beggs–Robinson),
+#ρob, los coeficientes de Velarde y el broadcasting de cada argumento.
+#calc_todas calcula cada intermedio una sola vez por lote; los términos que
+#solo dependen del fluido quedan escalares si el fluido es escalar. Los puntos
+#se procesan en bloques (como model.gas) para que los temporales quepan en
+#caché en lugar de asignar decenas de arreglos del tamaño del lote.
+
+import numpy as np
+
+from model.PVT_vec import (
+    rs_standing_vec,
+    rs_velarde_vec,
+    bo_standing_vec,
+    bo_vasbeg_vec,
+    co_petrosk_vec,
+    co_vasquez_beggs_vec,
+    ro_standing_vec,
+    ro_subsaturado_vec,
+    mu_beggs_robinson_vec,
+    muo_vasquez_beggs_vec,
+)
+from model.pvt_engine import COLUMNAS
+
+# Variantes de cada propiedad en todas las presiones. Las propiedades que
+# dependen de Rs usan el Rs del régimen (Standing si P <= Pb, Velarde si
+# P > Pb), así que COLUMNAS (el resultado de calc_pvt_array) es una
+# selección por régimen de estas columnas.
+VARIANTES = (
+    "rs_standing", "rs_velarde",
+    "bo_standing", "bo_vasbeg",
+    "co_vasquez_beggs", "co_petrosk",
+    "rho_standing", "rho_subsaturado",
+    "mu_od", "mu_ob", "mu_vasquez_beggs",
+)
+COLUMNAS_TODAS = VARIANTES + COLUMNAS
+BLOQUE = 16384
+
+
+def _nan(valor, valido):
+    """NaN donde no es válido o no es finito."""
+    return np.where(valido & np.isfinite(valor), valor, np.nan)
+
+
+def calc_todas(P, pb, rsb, api, sg_gas, tr, sgo=0.82, psep=100.0, tsep=120.0,
+               bloque=BLOQUE):
+    """
+    Todas las variantes de las correlaciones en una pasada.
+
+    Mismos argumentos que calc_pvt_array (escalares o arreglos con
+    broadcasting). Las reglas de validez son las de PVT_vec.
+
+    Retorna
+    -------
+    dict : columna de COLUMNAS_TODAS -> ndarray con la forma común (NaN si no es válido)
+    """
+    args = [np.asarray(a, dtype=float) for a in (P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)]
+    forma = np.broadcast_shapes(*[a.shape for a in args])
+    # Los escalares se quedan escalares; P siempre se lleva a la forma completa
+    args = [np.broadcast_to(a, forma).ravel() if (a.ndim or i == 0) else a
+            for i, a in enumerate(args)]
+    n = args[0].size
+
+    salida = np.empty((len(COLUMNAS_TODAS), n))
+    for i in range(0, n, bloque):
+        sl = slice(i, min(i + bloque, n))
+        _bloque_todas(*[a[sl] if a.ndim else a for a in args], salida[:, sl])
+    return {k: col.reshape(forma) for k, col in zip(COLUMNAS_TODAS, salida)}
+
+
+def _bloque_todas(P, pb, rsb, api, yg, t, yo, psep, tsep, salida):
+    """Escribe en salida (len(COLUMNAS_TODAS), n) todas las columnas de un bloque."""
+    with np.errstate(all="ignore"):
+        # =========================
+        # Intermedios del fluido (una vez)
+        # =========================
+        yg_yo = yg / yo
+        raiz_yg_yo = yg_yo ** 0.5
+        yg_yo_025 = yg_yo ** 0.25
+        t125 = 1.25 * t
+
+        # γgs de Vasquez–Beggs: compartido por Bo y Co
+        sep_ok = psep > 0
+        ygs = yg * (1.0 + 5.912e-5 * api * tsep * np.log(psep / 114.7))
+        liviano = api >= 30
+        C1 = np.where(liviano, 4.677e-4, 4.670e-4)
+        C2 = np.where(liviano, 1.751e-5, 1.100e-5)
+        C3 = np.where(liviano, -1.811e-8, 1.337E-9)
+        k_vb = (t - 60) * (api / ygs)
+        num_co_vb = -1433 + (5 * rsb) + (17.2 * t) - (1180 * ygs) + (12.61 * api)
+
+        # Los productos de potencias de Petrosky y Velarde comparten los
+        # logaritmos de γg, γo, Pb y T: exp(Σ e·ln x) en lugar de una potencia
+        # por factor
+        ln_yg, ln_yo, ln_pb = np.log(yg), np.log(yo), np.log(pb)
+        pre_petrosk = np.exp(np.log(1.705e-7) + 0.69357 * np.log(rsb) + 0.1885 * ln_yg
+                             + 0.3272 * np.log(api) + 0.6729 * np.log(t))
+
+        # Coeficientes de Velarde
+        ln_tt = np.log(1.8 * t - 459.67)
+        alpha1 = np.clip(np.exp(np.log(0.000018653) + 1.672608 * ln_yg + 0.929870 * ln_yo
+                                + 0.247235 * ln_tt + 1.056052 * ln_pb), 0.0, 1.0)
+        alpha2 = np.exp(np.log(0.1004) - 1.00475 * ln_yg + 0.337711 * ln_yo
+                        + 0.132795 * ln_tt + 0.302065 * ln_pb)
+        alpha3 = np.exp(np.log(0.9167) - 1.48548 * ln_yg - 0.164741 * ln_yo
+                        - 0.09133 * ln_tt + 0.047094 * ln_pb)
+
+        # μod de Beggs–Robinson: solo depende de API y T
+        mu_od = 10.0 ** (10.0 ** ((3.0324 - 0.02023 * api) * t ** -1.163)) - 1.0
+        ln_mu_od = np.log(mu_od)
+
+        # ρob de Standing en Rsb
+        term_ob = rsb * yg_yo_025 + t125
+        rho_ob = (62.4 * yo + 0.0136 * rsb * yg) / (0.972 + 0.000147 * term_ob ** 1.175)
+        rho_ob = _nan(rho_ob, term_ob >= 0)
+
+        m_vb = 2.6 * pb ** 1.187 * np.exp(-11.513 - 8.98e-5 * pb)
+
+        # =========================
+        # Términos que dependen de P
+        # =========================
+        base = ((P / 18.2) + 1.4) * 10.0 ** (0.0125 * api - 0.00091 * t)
+        rs_st = _nan(yg * base ** 1.2048, base >= 0)
+
+        pr = (P - 0.101) / pb
+        rs_vl = (alpha1 * pr ** alpha2 + (1.0 - alpha1) * pr ** alpha3) * rsb
+        rs_vl = _nan(rs_vl, (pb > 0) & (P > 0) & (pr > 0))
+
+        sat = P <= pb
+        rs = np.where(sat, rs_st, rs_vl)
+
+        term_bo = rs * raiz_yg_yo + t125
+        bo_st = _nan(0.9759 + 0.000120 * term_bo ** 1.2, term_bo >= 0)
+        bo_vb = _nan(1.0 + C1 * rs + k_vb * (C2 + C3 * rs), sep_ok & (ygs != 0))
+
+        co_vb = _nan(num_co_vb / (1e5 * P), sep_ok & (P != 0))
+        co_pk = _nan(pre_petrosk * P ** -0.5906, True)
+
+        term_ro = rs * yg_yo_025 + t125
+        bo_ro = 0.972 + 0.000147 * term_ro ** 1.175
+        rho_st = _nan((62.4 * yo + 0.0136 * rs * yg) / bo_ro, (term_ro >= 0) & (bo_ro != 0))
+        rho_sub = _nan(rho_ob * np.exp(co_pk * (P - pb)), True)
+
+        # μob: donde Rs no es válido se usa μod, igual que calc_pvt_at_p
+        mu_ob = 10.715 * (rs + 100) ** -0.515 * np.exp(5.44 * (rs + 150) ** -0.338 * ln_mu_od)
+        mu_od = _nan(mu_od, True)
+        mu_ob = np.where(np.isnan(rs), mu_od, _nan(mu_ob, np.isfinite(mu_od)))
+        mu_vb = np.where(sat, mu_ob, mu_ob * (P / pb) ** m_vb)
+        mu_vb = _nan(mu_vb, (P > 0) & (pb > 0))
+
+    variantes = (rs_st, rs_vl, bo_st, bo_vb, co_vb, co_pk, rho_st, rho_sub, mu_od, mu_ob, mu_vb)
+    # Selección por régimen, como calc_pvt_array
+    seleccion = (rs, np.where(sat, bo_st, bo_vb), np.where(sat, co_vb, co_pk),
+                 np.where(sat, rho_st, rho_sub), np.where(sat, mu_ob, mu_vb))
+    for fila, valor in zip(salida, variantes + seleccion):
+        fila[:] = valor
+
+
+def calc_todas_individual(P, pb, rsb, api, sg_gas, tr, sgo=0.82, psep=100.0, tsep=120.0):
+    """
+    Mismas columnas que calc_todas, llamando cada función de PVT_vec por
+    separado. Es la referencia para validar y medir la versión conjunta.
+    """
+    sat = np.asarray(P) <= np.asarray(pb)
+    rs_st, _ = rs_standing_vec(api, sg_gas, P, tr)
+    rs_vl, _ = rs_velarde_vec(rsb, sg_gas, sgo, pb, P, tr)
+    rs = np.where(sat, rs_st, rs_vl)
+    bo_st, _ = bo_standing_vec(rs, sg_gas, sgo, tr)
+    bo_vb, _ = bo_vasbeg_vec(rs, api, sg_gas, tr, psep, tsep)
+    co_vb, _ = co_vasquez_beggs_vec(rsb, sg_gas, api, tr, P, psep, tsep)
+    co_pk, _ = co_petrosk_vec(rsb, sg_gas, P, tr, api)
+    rho_st, _ = ro_standing_vec(rs, sg_gas, sgo, tr)
+    rho_ob, _ = ro_standing_vec(rsb, sg_gas, sgo, tr)
+    rho_sub, _ = ro_subsaturado_vec(rho_ob, co_pk, P, pb)
+    mu_od, _ = mu_beggs_robinson_vec(api, tr)
+    mu_ob, _ = mu_beggs_robinson_vec(api, tr, Rs=rs)
+    mu_ob = np.where(np.isnan(rs), mu_od, mu_ob)
+    mu_vb, _ = muo_vasquez_beggs_vec(mu_ob, P, pb)
+
+    variantes = (rs_st, rs_vl, bo_st, bo_vb, co_vb, co_pk, rho_st, rho_sub, mu_od, mu_ob, mu_vb)
+    seleccion = (rs, np.where(sat, bo_st, bo_vb), np.where(sat, co_vb, co_pk),
+                 np.where(sat, rho_st, rho_sub), np.where(sat, mu_ob, mu_vb))
+    forma = np.broadcast(*[np.asarray(a) for a in (P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)]).shape
+    return {k: np.broadcast_to(v, forma) for k, v in zip(COLUMNAS_TODAS, variantes + seleccion)}
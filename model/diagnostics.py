@@ -0,0 +1,200 @@
+#Diagnóstico de puntos inválidos y rangos de aplicación de las correlaciones
+#Las funciones de PVT.py imprimen el error y devuelven None en cada punto que
+#falla; en un lote de millones de puntos eso inunda la salida. Aquí los
+#cálculos en lote devuelven NaN y, aparte, un arreglo compacto de códigos por
+#punto (banderas de bits, uint16) con la causa, más conteos por tipo.
+#validar_rangos revisa de antemano, en bloque, los límites de los datos con
+#que se ajustó cada correlación (fuera de rango el valor se calcula igual).
+
+import numpy as np
+
+from model.pvt_engine import COLUMNAS, calc_pvt_array
+
+# =========================
+# Códigos de error (banderas combinables)
+# =========================
+OK = 0
+LOG_PSEP = 1 << 0          # log(psep / 114.7) con psep <= 0 (Vasquez–Beggs)
+PR_VELARDE = 1 << 1        # Pr = (P − 0.101)/Pb <= 0 o Pb <= 0 (Velarde)
+T_VELARDE = 1 << 2         # 1.8·T − 459.67 <= 0 (Velarde)
+OVERFLOW_MU = 1 << 3       # 10**(10**x) desborda en μod (Beggs–Robinson)
+POTENCIA = 1 << 4          # base negativa con exponente fraccionario
+DIVISION = 1 << 5          # división por cero (P = 0, T = 0, γo = 0)
+NO_FINITO = 1 << 6         # otro resultado no finito
+FUERA_RANGO = 1 << 7       # fuera de los límites de aplicación (solo aviso)
+
+NOMBRES = {
+    LOG_PSEP: "log_psep",
+    PR_VELARDE: "pr_velarde",
+    T_VELARDE: "t_velarde",
+    OVERFLOW_MU: "overflow_mu",
+    POTENCIA: "potencia",
+    DIVISION: "division",
+    NO_FINITO: "no_finito",
+    FUERA_RANGO: "fuera_rango",
+}
+
+# Códigos que dejan NaN en alguna propiedad (FUERA_RANGO no)
+ERRORES = LOG_PSEP | PR_VELARDE | T_VELARDE | OVERFLOW_MU | POTENCIA | DIVISION | NO_FINITO
+
+# =========================
+# Límites de aplicación
+# =========================
+# Correlación -> (régimen, {parámetro: (mínimo, máximo)}), con los rangos de
+# los datos de ajuste publicados. Régimen: "sat" (P <= Pb), "sub" (P > Pb)
+# o "ambos". Para las correlaciones de Rs se usa Rsb como referencia.
+LIMITES = {
+    "rs_standing": ("sat", {"p": (130.0, 7000.0), "tr": (100.0, 258.0),
+                            "api": (16.5, 63.8), "sg_gas": (0.59, 0.95),
+                            "rsb": (20.0, 1425.0)}),
+    "bo_standing": ("sat", {"tr": (100.0, 258.0), "api": (16.5, 63.8),
+                            "sg_gas": (0.59, 0.95), "rsb": (20.0, 1425.0)}),
+    "ro_standing": ("ambos", {"tr": (100.0, 258.0), "api": (16.5, 63.8),
+                              "sg_gas": (0.59, 0.95), "rsb": (20.0, 1425.0)}),
+    "co_vasquez_beggs": ("sat", {"p": (141.0, 9515.0), "tr": (70.0, 295.0),
+                                 "api": (15.3, 59.5), "sg_gas": (0.511, 1.351),
+                                 "rsb": (9.3, 2199.0)}),
+    "rs_velarde": ("sub", {"pb": (70.0, 6700.0), "tr": (70.0, 307.0),
+                           "api": (12.0, 55.0), "sg_gas": (0.556, 1.367),
+                           "rsb": (10.0, 1870.0)}),
+    "co_petrosk": ("sub", {"p": (1200.0, 10483.0), "tr": (114.0, 288.0),
+                           "api": (16.3, 45.0), "sg_gas": (0.5781, 0.8519),
+                           "rsb": (217.0, 1406.0)}),
+    "bo_vasbeg": ("sub", {"p": (50.0, 5250.0), "tr": (70.0, 295.0),
+                          "api": (15.3, 59.5), "sg_gas": (0.511, 1.351),
+                          "rsb": (20.0, 2070.0)}),
+    "mu_beggs_robinson": ("ambos", {"p": (15.0, 5265.0), "tr": (70.0, 295.0),
+                                    "api": (16.0, 58.0), "rsb": (20.0, 2070.0)}),
+    "muo_vasquez_beggs": ("sub", {"p": (141.0, 9515.0), "api": (15.3, 59.5),
+                                  "sg_gas": (0.511, 1.351)}),
+}
+
+
+def _planos(*args):
+    entradas = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+    return entradas[0].shape, [a.ravel() for a in entradas]
+
+
+def validar_rangos(P, pb, rsb, api, sg_gas, tr):
+    """
+    Puntos fuera de los límites de aplicación de cada correlación.
+
+    Solo se revisan los puntos del régimen en que se usa la correlación
+    (por ejemplo, Standing para Rs solo donde P <= Pb).
+
+    Retorna
+    -------
+    dict : correlación -> ndarray bool con la forma común (True = fuera de rango)
+    """
+    forma, (P, pb, rsb, api, sg_gas, tr) = _planos(P, pb, rsb, api, sg_gas, tr)
+    valores = {"p": P, "pb": pb, "rsb": rsb, "api": api, "sg_gas": sg_gas, "tr": tr}
+    sat = P <= pb
+    regimen = {"sat": sat, "sub": ~sat, "ambos": np.ones_like(sat)}
+
+    fuera = {}
+    for nombre, (reg, limites) in LIMITES.items():
+        dentro = np.ones_like(sat)
+        for clave, (lo, hi) in limites.items():
+            x = valores[clave]
+            dentro &= (x >= lo) & (x <= hi)
+        fuera[nombre] = (regimen[reg] & ~dentro).reshape(forma)
+    return fuera
+
+
+def codigos_pvt(P, pb, rsb, api, sg_gas, tr, sgo=0.82, psep=100.0, tsep=120.0,
+                columnas=None, rangos=True):
+    """
+    Código de error de cada punto de calc_pvt_array.
+
+    Parámetros
+    ----------
+    P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep :
+        Mismos argumentos que calc_pvt_array.
+    columnas : tupla de ndarray, opcional
+        Resultado ya calculado de calc_pvt_array; si se da, los NaN sin
+        causa conocida se marcan como NO_FINITO.
+    rangos : bool
+        Si es True se agrega FUERA_RANGO con validar_rangos.
+
+    Retorna
+    -------
+    ndarray uint16 con la forma común; 0 donde todo es válido.
+    """
+    forma, (P, pb, rsb, api, sg, t, sgo, psep, tsep) = _planos(
+        P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)
+    codigos = np.zeros(P.shape, dtype=np.uint16)
+    sat = P <= pb
+    sub = ~sat
+
+    with np.errstate(all="ignore"):
+        # Vasquez–Beggs usa log(psep) en Co (saturado) y en Bo (subsaturado)
+        codigos[psep <= 0] |= LOG_PSEP
+
+        # μod: t**-1.163 y luego 10**(10**x)
+        codigos[t == 0] |= DIVISION
+        codigos[t < 0] |= POTENCIA
+        x = 10.0 ** ((3.0324 - 0.02023 * api) * t ** -1.163)
+        codigos[(t > 0) & ~(x < 308.0)] |= OVERFLOW_MU
+
+        # Saturado: Rs de Standing y Bo, ρo de Standing
+        base = ((P / 18.2) + 1.4) * (10.0 ** (0.0125 * api - 0.00091 * t))
+        codigos[sat & (base < 0)] |= POTENCIA
+        codigos[sat & (P == 0)] |= DIVISION
+        codigos[sgo == 0] |= DIVISION
+        codigos[(sgo != 0) & (sg / sgo < 0)] |= POTENCIA
+
+        # Subsaturado: Rs de Velarde, Co de Petrosky–Farshad
+        codigos[sub & ((pb <= 0) | (P <= 0.101))] |= PR_VELARDE
+        codigos[sub & (1.8 * t - 459.67 <= 0)] |= T_VELARDE
+        negativos = (rsb < 0) | (sg < 0) | (api < 0) | (t < 0) | (P < 0)
+        codigos[sub & negativos] |= POTENCIA
+        codigos[sub & (P == 0)] |= DIVISION
+
+    if columnas is not None:
+        invalido = np.zeros(P.shape, dtype=bool)
+        for col in columnas:
+            invalido |= np.isnan(np.asarray(col, dtype=float).ravel())
+        codigos[invalido & (codigos == 0)] |= NO_FINITO
+
+    if rangos:
+        for fuera in validar_rangos(P, pb, rsb, api, sg, t).values():
+            codigos[fuera] |= FUERA_RANGO
+    return codigos.reshape(forma)
+
+
+def contar_codigos(codigos):
+    """
+    Conteo de puntos por tipo de error.
+
+    Retorna
+    -------
+    dict : nombre -> número de puntos con esa bandera, más "validos" (sin
+           ningún error; FUERA_RANGO no cuenta como error) y "total".
+    """
+    codigos = np.asarray(codigos).ravel()
+    conteos = {nombre: int(np.count_nonzero(codigos & bit)) for bit, nombre in NOMBRES.items()}
+    conteos["validos"] = int(np.count_nonzero((codigos & ERRORES) == 0))
+    conteos["total"] = int(codigos.size)
+    return conteos
+
+
+def describir(codigo):
+    """Nombres de las banderas presentes en un código."""
+    return [nombre for bit, nombre in NOMBRES.items() if int(codigo) & bit]
+
+
+def calc_pvt_diagnostico(P, pb, rsb, api, sg_gas, tr, sgo=0.82, psep=100.0, tsep=120.0,
+                         rangos=True):
+    """
+    calc_pvt_array más el canal de diagnóstico.
+
+    Retorna
+    -------
+    columnas : dict  propiedad -> ndarray (NaN donde es inválido)
+    codigos : ndarray uint16, código de error por punto
+    conteos : dict  conteo por tipo (contar_codigos)
+    """
+    valores = calc_pvt_array(P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)
+    codigos = codigos_pvt(P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep,
+                          columnas=valores, rangos=rangos)
+    return dict(zip(COLUMNAS, valores)), codigos, contar_codigos(codigos)
@@ -0,0 +1,250 @@
+#Exportación de tablas PVT en formato de palabras clave de Eclipse
+#PVTO (petróleo vivo), PVDG (gas seco) y PVTW (agua) en unidades de campo,
+#una tabla por temperatura (región PVTNUM, NTPVT = número de temperaturas).
+#La escritura es por flujo: cada temperatura se calcula por separado y las
+#filas se formatean en bloques acotados, así que mallas de 10^6+ nodos no
+#generan cadenas gigantes en memoria.
+
+import numpy as np
+
+from model.PVT_vec import co_petrosk_vec, muo_vasquez_beggs_vec
+from model.pvt_surface import (ajuste_fluido, parametros_fluido, pb_por_temperatura,
+                               propiedades_aceite, superficie_pvt)
+
+PALABRAS = ("PVTO", "PVDG", "PVTW")
+FILAS_BLOQUE = 8192
+# Presiones sintéticas por encima de Pb(T) cuando la malla no la supera
+SUBSAT_SINTETICAS = 10
+
+# Formatos de fila; el "/" cierra cada registro de PVTO y cada fila de PVTW
+_SAT = "  %12.6f %12.4f %11.6f %11.6f\n"
+_SAT_FIN = "  %12.6f %12.4f %11.6f %11.6f /\n"
+_SUB = "  " + " " * 12 + " %12.4f %11.6f %11.6f\n"
+_SUB_FIN = "  " + " " * 12 + " %12.4f %11.6f %11.6f /\n"
+_PVDG = "  %12.4f %12.6f %11.6f\n"
+_PVTW = "  %12.4f %11.6f %13.6e %11.6f %13.6e /\n"
+
+
+def _escribir_filas(f, valores, formatos, n_vals, filas_bloque=FILAS_BLOQUE):
+    """
+    Escribe filas en bloques de filas_bloque con un solo % por bloque.
+
+    valores : ndarray plano con los valores de todas las filas, en orden
+    formatos : ndarray de str con el formato de cada fila
+    n_vals : ndarray int con el número de valores de cada fila
+    """
+    fin = np.cumsum(n_vals)
+    inicio = fin - n_vals
+    for a in range(0, len(formatos), filas_bloque):
+        b = min(a + filas_bloque, len(formatos))
+        f.write("".join(formatos[a:b]) % tuple(valores[inicio[a]:fin[b - 1]].tolist()))
+
+
+#%% PVTO
+def _rama_saturada(fluido, p, t_f, max_subsat):
+    """
+    Rama saturada de PVTO y malla de presiones para las ramas subsaturadas.
+
+    Si Pb(T) no queda por debajo del último nodo de p, la malla se extiende
+    con Pb(T) y SUBSAT_SINTETICAS presiones (como máximo m) por encima, con
+    el paso medio de p, para que el último registro (Rs máximo) tenga rama
+    subsaturada como exige el simulador.
+    """
+    f = parametros_fluido(fluido)
+    p = np.sort(np.asarray(p, dtype=float).ravel())
+    pb_t = float(pb_por_temperatura(f, t_f))
+
+    p_sat = np.append(p[p < pb_t], pb_t)
+    rs, bo, _, _, mu = (v[:, 0] for v in
+                        propiedades_aceite(f, p_sat, pb_t, t_f, ajuste_fluido(fluido)))
+    ok_sat = np.isfinite(rs) & np.isfinite(bo) & np.isfinite(mu) & (rs > 0)
+
+    m = p.size if max_subsat is None else max(1, min(int(max_subsat), p.size))
+    if p[-1] <= pb_t:
+        paso = (p[-1] - p[0]) / (p.size - 1) if p.size > 1 and p[-1] > p[0] else 0.1 * pb_t
+        extra = min(m, SUBSAT_SINTETICAS)
+        p = np.unique(np.append(p, pb_t + paso * np.arange(extra + 1)))
+        m = max(m, extra)
+    return f, p, m, (rs, p_sat, bo, mu, ok_sat)
+
+
+def _registros_subsaturados(f, p, m, t_f, rs, p_sat, bo, mu, ok_sat):
+    """(filas, usar) de los registros dados; ver registros_pvto."""
+    # Presiones subsaturadas: hasta m nodos de p por encima de cada Psat,
+    # repartidos de forma uniforme y siempre con el último
+    primero = np.searchsorted(p, p_sat, side="right")
+    cuantos = p.size - primero
+    k = np.arange(m)
+    if m > 1:
+        repartido = np.rint(k * ((cuantos[:, None] - 1) / (m - 1))).astype(np.int64)
+    else:
+        repartido = np.maximum(cuantos[:, None] - 1, 0) + 0 * k
+    pos = primero[:, None] + np.where(cuantos[:, None] >= m, repartido, k)
+    hay = k < cuantos[:, None]
+    p_sub = np.where(hay, p[np.minimum(pos, p.size - 1)], np.nan)
+
+    co, _ = co_petrosk_vec(rs[:, None], f["sg_gas"], p_sub, t_f, f["api"])
+    with np.errstate(all="ignore"):
+        bo_sub = bo[:, None] * np.exp(co * (p_sat[:, None] - p_sub))
+    mu_sub, _ = muo_vasquez_beggs_vec(mu[:, None], p_sub, p_sat[:, None])
+    ok_sub = hay & ok_sat[:, None] & np.isfinite(bo_sub) & np.isfinite(mu_sub)
+
+    filas = np.empty((p_sat.size, 1 + m, 4))
+    filas[:, 0] = np.column_stack((rs, p_sat, bo, mu))
+    filas[:, 1:, 0] = rs[:, None]
+    filas[:, 1:, 1] = p_sub
+    filas[:, 1:, 2] = bo_sub
+    filas[:, 1:, 3] = mu_sub
+    usar = np.column_stack((ok_sat, ok_sub))
+    return filas, usar
+
+
+def bloques_pvto(fluido, p, t_f, max_subsat=10, filas_bloque=FILAS_BLOQUE):
+    """
+    Registros de PVTO de una temperatura por bloques de registros.
+
+    Cada bloque tiene como mucho max(1, filas_bloque // (1 + m)) registros,
+    así que la memoria no crece con n_p² aunque max_subsat sea None.
+    Produce (filas, usar) con el formato de registros_pvto.
+    """
+    f, p, m, (rs, p_sat, bo, mu, ok_sat) = _rama_saturada(fluido, p, t_f, max_subsat)
+    paso = max(1, filas_bloque // (1 + m))
+    for a in range(0, p_sat.size, paso):
+        b = slice(a, a + paso)
+        yield _registros_subsaturados(f, p, m, t_f, rs[b], p_sat[b], bo[b], mu[b], ok_sat[b])
+
+
+def registros_pvto(fluido, p, t_f, max_subsat=10):
+    """
+    Registros de PVTO de una temperatura.
+
+    La rama saturada usa los nodos de p por debajo de Pb(T) más Pb(T), con
+    Rs, Bo y μo del motor PVT. Cada registro tiene además una rama
+    subsaturada a Rs constante en hasta max_subsat presiones de p por encima
+    de su presión de saturación (si Pb(T) supera a p, presiones sintéticas
+    por encima de Pb(T)): Bo = Bob·exp(Co·(Psat − P)) con Co de
+    Petrosky–Farshad y μo de Vasquez–Beggs a partir de μob del registro.
+    La tabla completa ocupa n_registros·(1 + m) filas; para mallas grandes
+    usar bloques_pvto.
+
+    Retorna
+    -------
+    filas : ndarray (n_registros, 1 + m, 4) con (Rs, P, Bo, μo); la fila 0
+            de cada registro es la saturada
+    usar : ndarray bool (n_registros, 1 + m), filas válidas
+    """
+    f, p, m, sat = _rama_saturada(fluido, p, t_f, max_subsat)
+    return _registros_subsaturados(f, p, m, t_f, *sat)
+
+
+def escribir_pvto(f, fluido, p, t_f, max_subsat=10, filas_bloque=FILAS_BLOQUE):
+    """Escribe la palabra clave PVTO, una tabla por temperatura. Retorna el número de filas."""
+    total = 0
+    f.write("PVTO\n-- Rs (Mscf/stb)  Pbub (psia)  Bo (rb/stb)  mu_o (cp)\n")
+    for t in np.atleast_1d(t_f):
+        f.write(f"-- T = {t:.2f} F\n")
+        for filas, usar in bloques_pvto(fluido, p, float(t), max_subsat, filas_bloque):
+            ultima = usar & (np.cumsum(usar, axis=1) == usar.sum(axis=1, keepdims=True))
+            usar, ultima = usar.ravel(), ultima.ravel()
+            es_sat = np.zeros(filas.shape[:2], dtype=bool)
+            es_sat[:, 0] = True
+            es_sat = es_sat.ravel()
+
+            formatos = np.where(es_sat, np.where(ultima, _SAT_FIN, _SAT),
+                                np.where(ultima, _SUB_FIN, _SUB))[usar]
+            filas = filas.reshape(-1, 4)[usar]
+            filas[:, 0] /= 1000.0  # scf/stb -> Mscf/stb
+            columnas = np.ones(filas.shape, dtype=bool)
+            columnas[:, 0] = es_sat[usar]
+            _escribir_filas(f, filas[columnas], formatos, columnas.sum(axis=1), filas_bloque)
+            total += len(formatos)
+        f.write("/\n")
+    f.write("\n")
+    return total
+
+
+#%% PVDG y PVTW
+def escribir_pvdg(f, fluido, p, t_f, filas_bloque=FILAS_BLOQUE):
+    """Escribe la palabra clave PVDG, una tabla por temperatura. Retorna el número de filas."""
+    total = 0
+    p = np.sort(np.asarray(p, dtype=float).ravel())
+    f.write("PVDG\n-- P (psia)  Bg (rb/Mscf)  mu_g (cp)\n")
+    for t in np.atleast_1d(t_f):
+        gas = superficie_pvt(fluido, p, t, familias=("gas",))
+        filas = np.column_stack((p, gas["bg"][:, 0] * 1000.0, gas["mu_g"][:, 0]))
+        filas = filas[np.isfinite(filas).all(axis=1) & (p > 0)]
+        f.write(f"-- T = {t:.2f} F\n")
+        _escribir_filas(f, filas.ravel(), np.full(len(filas), _PVDG),
+                        np.full(len(filas), 3), filas_bloque)
+        f.write("/\n")
+        total += len(filas)
+    f.write("\n")
+    return total
+
+
+def escribir_pvtw(f, fluido, t_f, p_ref, salinidad=0.0):
+    """
+    Escribe la palabra clave PVTW, un registro por temperatura.
+
+    La viscosibilidad (1/μw)·dμw/dP se obtiene por diferencia central de
+    ±1 psi alrededor de p_ref. Retorna el número de filas.
+    """
+    t_f = np.atleast_1d(np.asarray(t_f, dtype=float))
+    agua = superficie_pvt(fluido, [p_ref - 1.0, p_ref, p_ref + 1.0], t_f,
+                          salinidad, familias=("agua",))
+    mu = agua["mu_w"]
+    cv = (mu[2] - mu[0]) / (2.0 * mu[1])
+    f.write("PVTW\n-- Pref (psia)  Bw (rb/stb)  cw (1/psia)  mu_w (cp)  Cv (1/psia)\n")
+    for j, t in enumerate(t_f):
+        f.write(f"-- T = {t:.2f} F\n")
+        f.write(_PVTW % (p_ref, agua["bw"][1, j], agua["cw"][1, j], mu[1, j], cv[j]))
+    f.write("\n")
+    return t_f.size
+
+
+def escribir_eclipse(destino, fluido, p, t_f, salinidad=0.0, palabras=PALABRAS,
+                     max_subsat=10, p_ref=None, filas_bloque=FILAS_BLOQUE):
+    """
+    Escribe las palabras clave pedidas en un archivo de inclusión de Eclipse.
+
+    Parámetros
+    ----------
+    destino : ruta o archivo de texto abierto
+    fluido : FluidModel o dict, fluido de referencia (Pb medida a su T)
+    p : ndarray 1D, presiones de la malla (psia)
+    t_f : float o ndarray 1D, temperaturas (°F); una tabla por temperatura
+    salinidad : float, % en peso de NaCl para PVTW
+    palabras : subconjunto de ("PVTO", "PVDG", "PVTW")
+    max_subsat : int o None, filas subsaturadas por registro de PVTO
+                 (None: todos los nodos por encima de la presión de saturación;
+                 los registros se calculan por bloques de filas_bloque filas)
+    p_ref : float, presión de referencia de PVTW (por defecto, la mayor de p)
+
+    Retorna
+    -------
+    dict : palabra clave -> número de filas escritas
+    """
+    desconocidas = [k for k in palabras if k not in PALABRAS]
+    if desconocidas:
+        raise ValueError(f"Palabras clave no soportadas: {', '.join(desconocidas)}")
+    p = np.asarray(p, dtype=float).ravel()
+    t_f = np.atleast_1d(np.asarray(t_f, dtype=float)).ravel()
+    p_ref = float(p.max()) if p_ref is None else float(p_ref)
+
+    if isinstance(destino, str):
+        with open(destino, "w", encoding="ascii") as f:
+            return escribir_eclipse(f, fluido, p, t_f, salinidad, palabras,
+                                    max_subsat, p_ref, filas_bloque)
+
+    f = destino
+    f.write("-- Tablas PVT en unidades de campo\n")
+    f.write(f"-- Una tabla por temperatura (NTPVT = {t_f.size})\n\n")
+    filas = {}
+    for palabra in palabras:
+        if palabra == "PVTO":
+            filas[palabra] = escribir_pvto(f, fluido, p, t_f, max_subsat, filas_bloque)
+        elif palabra == "PVDG":
+            filas[palabra] = escribir_pvdg(f, fluido, p, t_f, filas_bloque)
+        else:
+            filas[palabra] = escribir_pvtw(f, fluido, t_f, p_ref, salinidad)
+    return filas
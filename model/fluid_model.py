@@ -0,0 +1,385 @@
+#Modelo de fluido con los terminos independientes de la presion precalculados
+#Los coeficientes de Velarde, el gas corregido por separador, μod, el
+#exponente m de Vasquez–Beggs, ρob, etc. solo dependen del fluido, asi que se
+#calculan una vez al construir el objeto y se reutilizan en cada presion.
+#Con derivada=True cada metodo devuelve (valor, derivada), igual que PVT_vec.
+
+import math
+
+import numpy as np
+
+# Parámetros de ajuste de las correlaciones (model.calibracion) y sus valores
+# sin ajuste: Rs Standing = rs_mult·γg·(...)^rs_exp, Bo Standing con el
+# término de expansión por bo_mult y μob = mu_a·a·μod^(mu_b·b)
+AJUSTE_BASE = {"rs_mult": 1.0, "rs_exp": 1.2048, "bo_mult": 1.0, "mu_a": 1.0, "mu_b": 1.0}
+
+
+def _potencia(base, exponente):
+    """base ** exponente como en PVT.py, pero NaN donde la version escalar falla."""
+    try:
+        r = base ** exponente
+    except (ZeroDivisionError, OverflowError):
+        return math.nan
+    return math.nan if isinstance(r, complex) else float(r)
+
+
+def _log_sep(psep):
+    """log(psep / 114.7); NaN si psep <= 0 (bo_vasbeg y co_vasquez_beggs devuelven None)."""
+    return math.log(psep / 114.7) if psep > 0 else math.nan
+
+
+class FluidModel:
+    """
+    Fluido con sus invariantes PVT precalculados.
+
+    Parámetros
+    ----------
+    api : float
+        Gravedad API del petróleo.
+    sg_gas : float
+        Gravedad específica del gas en solución.
+    sgo : float
+        Gravedad específica del petróleo a tanque.
+    rsb : float
+        Rs en el punto de burbuja (scf/stb).
+    pb : float
+        Presión de burbuja (psia).
+    T : float
+        Temperatura del sistema (°F).
+    psep, tsep : float
+        Presión (psia) y temperatura (°F) del separador.
+    ajuste : dict, opcional
+        Parámetros de ajuste (claves de AJUSTE_BASE) obtenidos con
+        model.calibracion; los que faltan toman su valor sin ajuste.
+
+    Los métodos de evaluación aceptan floats o arreglos de presión y
+    devuelven ndarray, con NaN donde la correlación no es válida.
+    """
+
+    __slots__ = (
+        "api", "sg_gas", "sgo", "rsb", "pb", "T", "psep", "tsep",
+        "_fac_standing", "_alpha1", "_alpha2", "_alpha3",
+        "_raiz_sg_sgo", "_t125", "_ygs", "_C1", "_C3", "_C2", "_k_vasbeg",
+        "_num_co_vb", "_pre_petrosk", "_sg_sgo_025", "_rho_num",
+        "rho_ob", "mu_od", "_ln_mu_od", "_m_vb",
+        "ajuste", "_rs_mult", "_rs_exp", "_bo_mult", "_mu_a", "_mu_b",
+    )
+
+    def __init__(self, api, sg_gas, sgo, rsb, pb, T, psep=100.0, tsep=120.0, ajuste=None):
+        self.api = float(api)
+        self.sg_gas = float(sg_gas)
+        self.sgo = float(sgo)
+        self.rsb = float(rsb)
+        self.pb = float(pb)
+        self.T = float(T)
+        self.psep = float(psep)
+        self.tsep = float(tsep)
+
+        desconocidos = set(ajuste or {}) - set(AJUSTE_BASE)
+        if desconocidos:
+            raise ValueError(f"Parámetros de ajuste desconocidos: {', '.join(sorted(desconocidos))}")
+        self.ajuste = {k: float(v) for k, v in (ajuste or {}).items()}
+        base = dict(AJUSTE_BASE, **self.ajuste)
+        self._rs_mult, self._rs_exp = base["rs_mult"], base["rs_exp"]
+        self._bo_mult = base["bo_mult"]
+        self._mu_a, self._mu_b = base["mu_a"], base["mu_b"]
+
+        api, yg, yo, rsb, pb, t_f = self.api, self.sg_gas, self.sgo, self.rsb, self.pb, self.T
+
+        # --- Standing (1947): 10**x ---
+        self._fac_standing = 10 ** (0.0125 * api - 0.00091 * t_f)
+
+        # --- Velarde (1997): α1, α2, α3 ---
+        temp_term = 1.8 * t_f - 459.67
+        if pb > 0:
+            alpha1 = (0.000018653 * _potencia(yg, 1.672608) * _potencia(yo, 0.929870)
+                      * _potencia(temp_term, 0.247235) * _potencia(pb, 1.056052))
+            self._alpha2 = (0.1004 * _potencia(yg, -1.00475) * _potencia(yo, 0.337711)
+                            * _potencia(temp_term, 0.132795) * _potencia(pb, 0.302065))
+            self._alpha3 = (0.9167 * _potencia(yg, -1.48548) * _potencia(yo, -0.164741)
+                            * _potencia(temp_term, -0.09133) * _potencia(pb, 0.047094))
+            self._alpha1 = max(0.0, min(1.0, alpha1)) if not math.isnan(alpha1) else math.nan
+        else:
+            self._alpha1 = self._alpha2 = self._alpha3 = math.nan
+
+        # --- Bo Standing (1981) ---
+        self._raiz_sg_sgo = _potencia(yg / yo, 0.5)
+        self._t125 = 1.25 * t_f
+
+        # --- Vasquez–Beggs: gas corregido por separador ---
+        self._ygs = yg * (1.0 + 5.912e-5 * api * self.tsep * _log_sep(self.psep))
+        if api >= 30:
+            self._C1, self._C2, self._C3 = 4.677e-4, 1.751e-5, -1.811e-8
+        else:
+            self._C1, self._C2, self._C3 = 4.670e-4, 1.100e-5, 1.337E-9
+        self._k_vasbeg = (t_f - 60) * (api / self._ygs) if self._ygs != 0 else math.nan
+        self._num_co_vb = -1433 + (5 * rsb) + (17.2 * t_f) - (1180 * self._ygs) + (12.61 * api)
+
+        # --- Petrosky–Farshad (1993): todo menos P**-0.5906 ---
+        self._pre_petrosk = (1.705e-7 * _potencia(rsb, 0.69357) * _potencia(yg, 0.1885)
+                             * _potencia(api, 0.3272) * _potencia(t_f, 0.6729))
+
+        # --- Densidad Standing (1947) y ρob ---
+        self._sg_sgo_025 = _potencia(yg / yo, 0.25)
+        self._rho_num = 62.4 * yo
+        self.rho_ob = float(self.ro_standing(rsb))
+
+        # --- Beggs–Robinson (1975): μod ---
+        x = _potencia(10, (3.0324 - 0.02023 * api) * _potencia(t_f, -1.163))
+        mu_od = _potencia(10, x)
+        self.mu_od = mu_od - 1.0 if not math.isnan(mu_od) else math.nan
+        self._ln_mu_od = math.log(self.mu_od) if self.mu_od > 0 else math.nan
+
+        # --- Vasquez–Beggs (1975): exponente m ---
+        self._m_vb = (2.6 * _potencia(pb, 1.187) * math.exp(-11.513 - 8.98e-5 * pb)
+                      if pb > 0 else math.nan)
+
+    def __repr__(self):
+        ajuste = f", ajuste={self.ajuste}" if self.ajuste else ""
+        return (f"FluidModel(api={self.api}, sg_gas={self.sg_gas}, sgo={self.sgo}, "
+                f"rsb={self.rsb}, pb={self.pb}, T={self.T}, "
+                f"psep={self.psep}, tsep={self.tsep}{ajuste})")
+
+    # =========================
+    # Solubilidad del gas
+    # =========================
+    def rs_standing(self, p, derivada=False):
+        """Rs (scf/stb) de Standing (1947) en las presiones p; dRs/dP = 1.2048·Rs/(p + 25.48)."""
+        p = np.asarray(p, dtype=float)
+        with np.errstate(all="ignore"):
+            rs = (self._rs_mult * self.sg_gas) * (((p / 18.2) + 1.4) * self._fac_standing) ** self._rs_exp
+            if not derivada:
+                return rs
+            return rs, self._rs_exp * rs / (p + 25.48)
+
+    def rs_velarde(self, p, derivada=False):
+        """Rs (scf/stb) de Velarde (1997) en las presiones p, y dRs/dP."""
+        p = np.asarray(p, dtype=float)
+        with np.errstate(all="ignore"):
+            pr = (p - 0.101) / self.pb
+            pr_a2 = pr ** self._alpha2
+            pr_a3 = pr ** self._alpha3
+            rgr = self._alpha1 * pr_a2 + (1.0 - self._alpha1) * pr_a3
+            rs = rgr * self.rsb
+        rs = np.where((p > 0) & (pr > 0), rs, np.nan)
+        if not derivada:
+            return rs
+        with np.errstate(all="ignore"):
+            drs = (self.rsb / self.pb
+                   * (self._alpha1 * self._alpha2 * pr_a2
+                      + (1.0 - self._alpha1) * self._alpha3 * pr_a3) / pr)
+        return rs, np.where(np.isfinite(rs), drs, np.nan)
+
+    # =========================
+    # Factor volumétrico
+    # =========================
+    def bo_standing(self, rs, derivada=False):
+        """Bo (rb/stb) de Standing (1981) a partir de Rs, y dBo/dRs."""
+        rs = np.asarray(rs, dtype=float)
+        with np.errstate(all="ignore"):
+            term = rs * self._raiz_sg_sgo + self._t125
+            coef = 0.000120 * self._bo_mult
+            if not derivada:
+                return 0.9759 + coef * (term ** 1.2)
+            # term**1.2 = term · term**0.2: una sola potencia para valor y derivada
+            t02 = term ** 0.2
+            return 0.9759 + coef * (term * t02), (1.2 * coef * self._raiz_sg_sgo) * t02
+
+    def bo_vasbeg(self, rs, derivada=False):
+        """Bo (rb/stb) de Vasquez–Beggs (1980) a partir de Rs, y dBo/dRs (constante)."""
+        rs = np.asarray(rs, dtype=float)
+        bo = 1.0 + (self._C1 * rs) + self._k_vasbeg * (self._C2 + (self._C3 * rs))
+        if not derivada:
+            return bo
+        return bo, np.full_like(bo, self._C1 + self._k_vasbeg * self._C3)
+
+    # =========================
+    # Compresibilidad
+    # =========================
+    def co_petrosk(self, p, derivada=False):
+        """Co (1/psia) de Petrosky–Farshad (1993) en las presiones p; dCo/dP = −0.5906·Co/P."""
+        p = np.asarray(p, dtype=float)
+        with np.errstate(all="ignore"):
+            co = self._pre_petrosk * (p ** -0.5906)
+            if not derivada:
+                return co
+            return co, -0.5906 * co / p
+
+    def co_vasquez_beggs(self, p, derivada=False):
+        """Co (1/psia) de Vasquez–Beggs (1980) en las presiones p; dCo/dP = −Co/p."""
+        p = np.asarray(p, dtype=float)
+        with np.errstate(all="ignore"):
+            co = self._num_co_vb / (1e5 * p)
+        co = np.where(p != 0, co, np.nan)
+        if not derivada:
+            return co
+        with np.errstate(all="ignore"):
+            return co, -co / p
+
+    # =========================
+    # Densidad
+    # =========================
+    def ro_standing(self, rs, derivada=False):
+        """ρo (lb/ft³) de petróleo saturado, Standing (1947), a partir de Rs, y dρo/dRs."""
+        rs = np.asarray(rs, dtype=float)
+        with np.errstate(all="ignore"):
+            term = rs * self._sg_sgo_025 + self._t125
+            if not derivada:
+                bo = 0.972 + 0.000147 * (term ** 1.175)
+                return (self._rho_num + 0.0136 * rs * self.sg_gas) / bo
+            t0175 = term ** 0.175
+            bo = 0.972 + 0.000147 * (term * t0175)
+            ro = (self._rho_num + 0.0136 * rs * self.sg_gas) / bo
+            dbo = (0.000147 * 1.175 * self._sg_sgo_025) * t0175
+            return ro, (0.0136 * self.sg_gas - ro * dbo) / bo
+
+    def ro_subsaturado(self, co, p, derivada=False, dco=0.0):
+        """
+        ρo (lb/ft³) subsaturado: ρob · exp(Co · (P − Pb)).
+
+        Con derivada=True, dco es dCo/dP y se devuelve además
+        dρo/dP = ρo · (Co + dCo/dP · (P − Pb)).
+        """
+        co = np.asarray(co, dtype=float)
+        p = np.asarray(p, dtype=float)
+        with np.errstate(all="ignore"):
+            rho = self.rho_ob * np.exp(co * (p - self.pb))
+            if not derivada:
+                return rho
+            return rho, rho * (co + dco * (p - self.pb))
+
+    # =========================
+    # Viscosidad
+    # =========================
+    def mu_beggs_robinson(self, rs, derivada=False):
+        """
+        μob (cp) de Beggs–Robinson (1975) a partir de Rs, y dμob/dRs.
+
+        Donde Rs no es finito se devuelve μod, igual que mu_beggs_robinson(api, T, Rs=None),
+        con derivada 0.
+        """
+        rs = np.asarray(rs, dtype=float)
+        finito = np.isfinite(rs)
+        with np.errstate(all="ignore"):
+            a = (10.715 * self._mu_a) * (rs + 100) ** (-0.515)
+            b = (5.44 * self._mu_b) * (rs + 150) ** (-0.338)
+            mu_ob = np.where(finito, a * (self.mu_od ** b), self.mu_od)
+            if not derivada:
+                return mu_ob
+            dmu = mu_ob * (-0.515 / (rs + 100) - 0.338 * b / (rs + 150) * self._ln_mu_od)
+        return mu_ob, np.where(finito, dmu, 0.0)
+
+    def muo_vasquez_beggs(self, mu_ob, p, derivada=False, dmu_ob=0.0):
+        """
+        μo (cp) de Vasquez–Beggs (1975); μob donde p <= pb.
+
+        Con derivada=True, dmu_ob es dμob/dP y se devuelve además dμo/dP.
+        """
+        mu_ob = np.asarray(mu_ob, dtype=float)
+        p = np.asarray(p, dtype=float)
+        with np.errstate(all="ignore"):
+            sub = p > self.pb
+            mu_o = np.where(sub, mu_ob * (p / self.pb) ** self._m_vb, mu_ob)
+            mu_o = np.where(p > 0, mu_o, np.nan)
+            if not derivada:
+                return mu_o
+            return mu_o, np.where(sub, mu_o * (dmu_ob / mu_ob + self._m_vb / p), dmu_ob)
+
+    # =========================
+    # Evaluación por régimen
+    # =========================
+    def evaluate(self, P, derivadas=False):
+        """
+        Rs, Bo, Co, rho y mu_o en las presiones P, con las mismas
+        correlaciones por régimen que model.pvt_engine.calc_pvt_array.
+
+        Con derivadas=True se devuelven también las derivadas analíticas
+        respecto a P, calculadas en la misma pasada. En P = Pb la derivada
+        es la de la rama saturada (por la izquierda), la misma rama que da
+        el valor.
+
+        Retorna
+        -------
+        rs, bo, co, rho, mu_o : ndarray con la forma de P (NaN si no es válido)
+        (valores, derivadas) si derivadas=True, cada uno con las 5 columnas
+        """
+        P = np.asarray(P, dtype=float)
+        forma = P.shape
+        P = P.ravel()
+
+        salida = np.full((5, P.size), np.nan)
+        rs, bo, co, rho, mu_o = salida
+
+        sat = P <= self.pb
+        sub = ~sat
+
+        if derivadas:
+            return self._evaluar_derivadas(P, sat, sub, salida, forma)
+
+        if sat.any():
+            p_s = P[sat]
+            rs_s = self.rs_standing(p_s)
+            rs[sat] = rs_s
+            co[sat] = self.co_vasquez_beggs(p_s)
+            bo[sat] = self.bo_standing(rs_s)
+            rho[sat] = self.ro_standing(rs_s)
+            mu_o[sat] = self.mu_beggs_robinson(rs_s)
+
+        if sub.any():
+            p_u = P[sub]
+            rs_u = self.rs_velarde(p_u)
+            co_u = self.co_petrosk(p_u)
+            rs[sub] = rs_u
+            co[sub] = co_u
+            bo[sub] = self.bo_vasbeg(rs_u)
+            rho[sub] = self.ro_subsaturado(co_u, p_u)
+            mu_o[sub] = self.muo_vasquez_beggs(self.mu_beggs_robinson(rs_u), p_u)
+
+        # Cualquier resultado no finito se reporta como NaN
+        salida[~np.isfinite(salida)] = np.nan
+        return tuple(col.reshape(forma) for col in salida)
+
+    def _evaluar_derivadas(self, P, sat, sub, salida, forma):
+        """Valores y dX/dP por régimen (regla de la cadena a través de Rs)."""
+        d_salida = np.full_like(salida, np.nan)
+        # Índices enteros: esparcir 10 columnas con ellos es varias veces más
+        # rápido que con la máscara booleana. Con un solo régimen se escribe
+        # directo, sin esparcir.
+        todo_sat, todo_sub = not sub.any(), not sat.any()
+        sat, sub = np.flatnonzero(sat), np.flatnonzero(sub)
+
+        def _guardar(sel, todo, valores, derivadas):
+            for i, (v, d) in enumerate(zip(valores, derivadas)):
+                if todo:
+                    salida[i], d_salida[i] = v, d
+                else:
+                    salida[i, sel], d_salida[i, sel] = v, d
+
+        if sat.size:
+            p_s = P if todo_sat else P[sat]
+            rs_s, drs = self.rs_standing(p_s, derivada=True)
+            co_s, dco = self.co_vasquez_beggs(p_s, derivada=True)
+            bo_s, dbo = self.bo_standing(rs_s, derivada=True)
+            rho_s, drho = self.ro_standing(rs_s, derivada=True)
+            mu_s, dmu = self.mu_beggs_robinson(rs_s, derivada=True)
+            _guardar(sat, todo_sat, (rs_s, bo_s, co_s, rho_s, mu_s),
+                     (drs, dbo * drs, dco, drho * drs, dmu * drs))
+
+        if sub.size:
+            p_u = P if todo_sub else P[sub]
+            rs_u, drs = self.rs_velarde(p_u, derivada=True)
+            co_u, dco = self.co_petrosk(p_u, derivada=True)
+            bo_u, dbo = self.bo_vasbeg(rs_u, derivada=True)
+            rho_u, drho = self.ro_subsaturado(co_u, p_u, derivada=True, dco=dco)
+            mu_ob, dmu_ob = self.mu_beggs_robinson(rs_u, derivada=True)
+            # Con Rs inválido μob es μod, que no depende de P
+            dmu_ob = np.where(np.isfinite(rs_u), dmu_ob * drs, 0.0)
+            mu_u, dmu = self.muo_vasquez_beggs(mu_ob, p_u, derivada=True, dmu_ob=dmu_ob)
+            _guardar(sub, todo_sub, (rs_u, bo_u, co_u, rho_u, mu_u),
+                     (drs, dbo * drs, dco, drho, dmu))
+
+        # Derivadas solo donde el valor y la derivada son finitos
+        salida[~np.isfinite(salida)] = np.nan
+        d_salida[~np.isfinite(d_salida + salida)] = np.nan
+        return (tuple(col.reshape(forma) for col in salida),
+                tuple(col.reshape(forma) for col in d_salida))
@@ -0,0 +1,396 @@
+#Propiedades del gas: pseudocríticas y factor de compresibilidad Z
+#Las pseudocríticas salen de la gravedad del gas (Summary, sg_gas) con
+#Sutton (1985). Z se obtiene resolviendo, para todos los puntos a la vez,
+#la ecuación de Dranchuk–Abou-Kassem (1975) en la densidad reducida ρr o la
+#de Hall–Yarborough (1973) en la densidad reducida y, con Newton
+#vectorizado, derivadas analíticas, pasos acotados al intervalo físico y
+#máscara de convergencia por punto.
+#
+#Para que Newton arranque cerca de la raíz, cada punto toma como Z inicial
+#la interpolación de los nodos vecinos de una malla (Ppr, Tpr) resuelta una
+#sola vez por método; así bastan ~2 iteraciones por punto. Los puntos se
+#procesan por bloques que caben en caché, de modo que los temporales de
+#NumPy no salen a memoria principal.
+
+import numpy as np
+
+# Coeficientes de Dranchuk–Abou-Kassem (1975)
+A1, A2, A3, A4, A5 = 0.3265, -1.0700, -0.5339, 0.01569, -0.05165
+A6, A7, A8, A9, A10, A11 = 0.5475, -0.7361, 0.1844, 0.1056, 0.6134, 0.7210
+
+METODOS = ("dak", "hy")
+
+# Puntos por bloque (arreglos temporales de 64 KB)
+BLOQUE = 8192
+
+# Malla de arranque: Ppr en [0, 30] y Tpr en [1, 3]
+_MALLA_PPR = (0.0, 30.0, 601)
+_MALLA_TPR = (1.0, 3.0, 201)
+_tablas = {}
+
+
+def pseudocriticas_sutton(sg_gas):
+    """
+    Temperatura y presión pseudocríticas de Sutton (1985).
+
+    Parámetros
+    ----------
+    sg_gas : float o ndarray, gravedad específica del gas
+
+    Retorna
+    -------
+    tpc : ndarray, temperatura pseudocrítica (°R)
+    ppc : ndarray, presión pseudocrítica (psia)
+    """
+    sg_gas = np.asarray(sg_gas, dtype=float)
+    tpc = 169.2 + 349.5 * sg_gas - 74.0 * sg_gas ** 2
+    ppc = 756.8 - 131.0 * sg_gas - 3.6 * sg_gas ** 2
+    return tpc, ppc
+
+
+def pseudoreducidas(P, t_f, sg_gas):
+    """Ppr y Tpr a partir de P (psia), T (°F) y sg_gas (Sutton)."""
+    tpc, ppc = pseudocriticas_sutton(sg_gas)
+    P, t_f, tpc, ppc = np.broadcast_arrays(np.asarray(P, dtype=float),
+                                           np.asarray(t_f, dtype=float), tpc, ppc)
+    return P / ppc, (t_f + 459.67) / tpc
+
+
+# =========================
+# Resolución de un bloque
+# =========================
+def _bloque_dak(ppr, tpr, z0, tol, max_iter):
+    """Newton en ρr para un bloque de puntos. Retorna (z, convergido, iteraciones)."""
+    inv = 1.0 / tpr
+    inv2 = inv * inv
+    c1 = A1 + inv * (A2 + inv2 * (A3 + inv * (A4 + A5 * inv)))
+    c2 = A6 + inv * (A7 + A8 * inv)
+    c3 = A9 * (c2 - A6)
+    c4 = A10 * inv2 * inv
+    d1, d2, d3 = 2.0 * c1, 3.0 * c2, 6.0 * c3
+    objetivo = 0.27 * ppr * inv
+    r = objetivo / z0
+    r = np.where((r > 0) & np.isfinite(r), r, objetivo)
+
+    convergido = ppr == 0
+    pendiente = (ppr > 0) & (tpr > 0) & (r > 0) & np.isfinite(r)
+    iteraciones = np.zeros(ppr.size, dtype=np.int64)
+    for _ in range(max_iter):
+        if not pendiente.any():
+            break
+        r2 = r * r
+        r3 = r2 * r
+        s = A11 * r2
+        e = np.exp(-s)
+        e *= c4
+        # f = r + c1·r² + c2·r³ − c3·r⁶ + c4·(1 + s)·r³·exp(−s) − objetivo
+        f = c2 - c3 * r3
+        f *= r
+        f += c1
+        f *= r
+        f += 1.0
+        f *= r
+        f -= objetivo
+        h = 1.0 + s
+        h *= e
+        h *= r3
+        f += h
+        # f' = 1 + 2c1·r + 3c2·r² − 6c3·r⁵ + c4·r²·(3 + 3s − 2s²)·exp(−s)
+        g = d2 - d3 * r3
+        g *= r
+        g += d1
+        g *= r
+        g += 1.0
+        q = 3.0 - 2.0 * s
+        q *= s
+        q += 3.0
+        q *= e
+        q *= r2
+        g += q
+
+        f /= g
+        rn = r - f
+        malo = ~(rn > 0)
+        if malo.any():
+            rn = np.where(malo, 0.5 * r, rn)
+        iteraciones += pendiente
+        np.abs(f, out=f)
+        hecho = pendiente & (f <= tol * r) & ~malo
+        convergido |= hecho
+        pendiente &= ~hecho
+        r = rn
+
+    with np.errstate(all="ignore"):
+        z = np.where(ppr == 0, 1.0, objetivo / r)
+    return z, convergido, iteraciones
+
+
+def _bloque_hy(ppr, tpr, z0, tol, max_iter):
+    """Newton en y (Hall–Yarborough) para un bloque de puntos."""
+    t = 1.0 / tpr
+    a_ppr = 0.06125 * t * np.exp(-1.2 * (1.0 - t) ** 2) * ppr
+    B2 = 2.0 * t * (14.76 - 9.76 * t + 4.58 * t * t)
+    C = t * (90.7 - 242.2 * t + 42.4 * t * t)
+    D = 2.18 + 2.82 * t
+    y = a_ppr / z0
+    y = np.where((y > 0) & (y < 1), y, np.clip(np.nan_to_num(a_ppr), 1e-12, 0.99))
+
+    convergido = ppr == 0
+    pendiente = (ppr > 0) & (tpr > 0) & (y > 0) & (y < 1)
+    iteraciones = np.zeros(ppr.size, dtype=np.int64)
+    for _ in range(max_iter):
+        if not pendiente.any():
+            break
+        y2 = y * y
+        u = 1.0 - y
+        inv3 = u * u
+        inv3 *= u
+        np.reciprocal(inv3, out=inv3)
+        cyd = np.log(y)
+        cyd *= D
+        np.exp(cyd, out=cyd)
+        cyd *= C
+        # f = −A·Ppr + (y + y² + y³ − y⁴)/(1 − y)³ − B·y² + C·y^D
+        f = 1.0 + y - y2
+        f *= y
+        f += 1.0
+        f *= y
+        f *= inv3
+        f -= a_ppr
+        f -= 0.5 * B2 * y2
+        f += cyd
+        # f' = (1 + 4y + 4y² − 4y³ + y⁴)/(1 − y)⁴ − 2B·y + C·D·y^(D−1)
+        g = y - 4.0
+        g *= y
+        g += 4.0
+        g *= y
+        g += 4.0
+        g *= y
+        g += 1.0
+        g *= inv3
+        g /= u
+        g -= B2 * y
+        g += D * cyd / y
+
+        f /= g
+        yn = y - f
+        malo = ~((yn > 0) & (yn < 1))
+        if malo.any():
+            yn = np.where(malo, 0.5 * (y + np.where(yn >= 1, 1.0, 0.0)), yn)
+        iteraciones += pendiente
+        np.abs(f, out=f)
+        hecho = pendiente & (f <= tol * y) & ~malo
+        convergido |= hecho
+        pendiente &= ~hecho
+        y = yn
+
+    with np.errstate(all="ignore"):
+        z = np.where(ppr == 0, 1.0, a_ppr / y)
+    return z, convergido, iteraciones
+
+
+_BLOQUES = {"dak": _bloque_dak, "hy": _bloque_hy}
+
+
+# =========================
+# Arranque desde la malla
+# =========================
+def _tabla(metodo):
+    """Z en la malla de arranque, resuelta la primera vez que se pide."""
+    if metodo not in _tablas:
+        p0, p1, n_p = _MALLA_PPR
+        t0, t1, n_t = _MALLA_TPR
+        ppr, tpr = np.meshgrid(np.linspace(p0, p1, n_p), np.linspace(t0, t1, n_t),
+                               indexing="ij")
+        z, _, _ = _resolver(metodo, ppr.ravel(), tpr.ravel(), np.ones(ppr.size),
+                            tol=1e-10, max_iter=100)
+        _tablas[metodo] = np.where(np.isfinite(z), z, 1.0)
+    return _tablas[metodo]
+
+
+def _z_inicial(metodo, ppr, tpr):
+    """Interpolación bilineal de la malla de arranque (acotada a sus bordes)."""
+    p0, p1, n_p = _MALLA_PPR
+    t0, t1, n_t = _MALLA_TPR
+    tabla = _tabla(metodo)
+    u = np.clip((ppr - p0) * ((n_p - 1) / (p1 - p0)), 0.0, n_p - 1.0)
+    v = np.clip((tpr - t0) * ((n_t - 1) / (t1 - t0)), 0.0, n_t - 1.0)
+    u = np.nan_to_num(u)
+    v = np.nan_to_num(v)
+    i = np.minimum(u.astype(np.intp), n_p - 2)
+    j = np.minimum(v.astype(np.intp), n_t - 2)
+    u -= i
+    v -= j
+    k = i * n_t + j
+    a = tabla[k]
+    a += (tabla[k + n_t] - a) * u
+    b = tabla[k + 1]
+    b += (tabla[k + n_t + 1] - b) * u
+    b -= a
+    b *= v
+    a += b
+    return a
+
+
+def _resolver(metodo, ppr, tpr, z0, tol, max_iter):
+    """Resuelve arreglos planos por bloques; z0 None usa la malla de arranque."""
+    n = ppr.size
+    z = np.empty(n)
+    convergido = np.empty(n, dtype=bool)
+    iteraciones = np.empty(n, dtype=np.int64)
+    bloque = _BLOQUES[metodo]
+    with np.errstate(all="ignore"):
+        for a in range(0, n, BLOQUE):
+            sl = slice(a, min(a + BLOQUE, n))
+            p, t = ppr[sl], tpr[sl]
+            inicio = _z_inicial(metodo, p, t) if z0 is None else z0[sl]
+            z[sl], convergido[sl], iteraciones[sl] = bloque(p, t, inicio, tol, max_iter)
+    z[~(convergido & np.isfinite(z))] = np.nan
+    return z, convergido, iteraciones
+
+
+def _z_reducidas(metodo, ppr, tpr, z0, tol, max_iter):
+    ppr, tpr = np.broadcast_arrays(np.asarray(ppr, dtype=float), np.asarray(tpr, dtype=float))
+    forma = ppr.shape
+    if z0 is not None:
+        z0 = np.ascontiguousarray(np.broadcast_to(np.asarray(z0, dtype=float), forma)).ravel()
+    z, convergido, iteraciones = _resolver(
+        metodo, np.ascontiguousarray(ppr).ravel(), np.ascontiguousarray(tpr).ravel(),
+        z0, tol, max_iter)
+    return z.reshape(forma), convergido.reshape(forma), iteraciones.reshape(forma)
+
+
+def z_dak(ppr, tpr, z0=None, tol=1e-8, max_iter=50):
+    """
+    Z de Dranchuk–Abou-Kassem (1975) resolviendo en ρr = 0.27·Ppr/(Z·Tpr).
+
+        f(ρ) = ρ + c1·ρ² + c2·ρ³ − c3·ρ⁶
+               + A10·(1 + A11·ρ²)·ρ³/Tpr³ · exp(−A11·ρ²) − 0.27·Ppr/Tpr = 0
+
+    Parámetros
+    ----------
+    ppr, tpr : float o ndarray (broadcasting)
+    z0 : float o ndarray, opcional
+        Z inicial (arranque en caliente, por ejemplo la solución de un punto
+        vecino). Por defecto se interpola la malla de arranque.
+    tol : float
+        Tolerancia relativa del paso de Newton; por la convergencia
+        cuadrática el error final es del orden de tol².
+    max_iter : int
+
+    Retorna
+    -------
+    z : ndarray, NaN donde no convergió
+    convergido : ndarray bool
+    iteraciones : ndarray int
+    """
+    return _z_reducidas("dak", ppr, tpr, z0, tol, max_iter)
+
+
+def z_hall_yarborough(ppr, tpr, z0=None, tol=1e-8, max_iter=50):
+    """
+    Z de Hall–Yarborough (1973) resolviendo en la densidad reducida y.
+
+        f(y) = −A·Ppr + (y + y² + y³ − y⁴)/(1 − y)³ − B·y² + C·y^D = 0
+        Z = A·Ppr / y
+
+    Mismos parámetros y resultado que z_dak.
+    """
+    return _z_reducidas("hy", ppr, tpr, z0, tol, max_iter)
+
+
+def z_factor(P, t_f, sg_gas, metodo="dak", z0=None, tol=1e-8, max_iter=50):
+    """
+    Factor Z del gas en (P, T) a partir de sg_gas.
+
+    Parámetros
+    ----------
+    P : float o ndarray, presión (psia)
+    t_f : float o ndarray, temperatura (°F)
+    sg_gas : float o ndarray, gravedad específica del gas
+    metodo : "dak" (Dranchuk–Abou-Kassem) o "hy" (Hall–Yarborough)
+    z0 : float o ndarray, opcional, Z inicial (arranque en caliente)
+
+    Retorna
+    -------
+    z, convergido, iteraciones : ndarray con la forma común
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS)}")
+    ppr, tpr = pseudoreducidas(P, t_f, sg_gas)
+    return _z_reducidas(metodo, ppr, tpr, z0, tol, max_iter)
+
+
+# =========================
+# Bg, μg y ρg
+# =========================
+# Propiedades del gas, en el orden de propiedades_gas
+COLUMNAS_GAS = ("z", "bg", "mu_g", "rho_g")
+
+# Constante de los gases (psia·ft³/(lbmol·°R)) y peso molecular del aire
+R_GAS = 10.732
+M_AIRE = 28.967
+
+
+def bg_gas(P, t_f, z):
+    """
+    Factor volumétrico del gas Bg (rb/scf) = 0.005035·Z·T/P, con T en °R.
+
+    Retorna
+    -------
+    bg : ndarray, NaN donde P <= 0
+    """
+    P = np.asarray(P, dtype=float)
+    with np.errstate(all="ignore"):
+        bg = 0.005035 * np.asarray(z, dtype=float) * (np.asarray(t_f, dtype=float) + 459.67) / P
+    return np.where(P > 0, bg, np.nan)
+
+
+def rho_gas(P, t_f, sg_gas, z):
+    """Densidad del gas ρg (lb/ft³) = P·Ma / (Z·R·T), con Ma = 28.967·γg."""
+    ma = M_AIRE * np.asarray(sg_gas, dtype=float)
+    with np.errstate(all="ignore"):
+        return np.asarray(P, dtype=float) * ma / (
+            np.asarray(z, dtype=float) * R_GAS * (np.asarray(t_f, dtype=float) + 459.67))
+
+
+def mu_gas_lge(t_f, sg_gas, rho_g):
+    """
+    Viscosidad del gas μg (cp) de Lee–Gonzalez–Eakin (1966).
+
+        K = (9.4 + 0.02·Ma)·T^1.5 / (209 + 19·Ma + T)
+        X = 3.5 + 986/T + 0.01·Ma,   Y = 2.4 − 0.2·X
+        μg = 1e-4·K·exp(X·ρ^Y),      ρ en g/cm³, T en °R
+    """
+    t_r = np.asarray(t_f, dtype=float) + 459.67
+    ma = M_AIRE * np.asarray(sg_gas, dtype=float)
+    with np.errstate(all="ignore"):
+        k = (9.4 + 0.02 * ma) * t_r ** 1.5 / (209.0 + 19.0 * ma + t_r)
+        x = 3.5 + 986.0 / t_r + 0.01 * ma
+        y = 2.4 - 0.2 * x
+        rho = np.asarray(rho_g, dtype=float) / 62.428
+        return 1e-4 * k * np.exp(x * rho ** y)
+
+
+def propiedades_gas(P, t_f, sg_gas, metodo="dak", z0=None):
+    """
+    Z, Bg, μg y ρg en una sola pasada sobre las presiones.
+
+    Ppr, Tpr y Z se calculan una vez y los reutilizan las tres propiedades.
+
+    Parámetros
+    ----------
+    P : float o ndarray, presión (psia)
+    t_f : float o ndarray, temperatura (°F)
+    sg_gas : float o ndarray, gravedad específica del gas
+    metodo : "dak" o "hy", correlación de Z
+    z0 : float o ndarray, opcional, Z inicial (arranque en caliente)
+
+    Retorna
+    -------
+    z, bg, mu_g, rho_g : ndarray con la forma común (NaN si no es válido)
+    """
+    z, _, _ = z_factor(P, t_f, sg_gas, metodo, z0)
+    rho_g = rho_gas(P, t_f, sg_gas, z)
+    salida = [z, bg_gas(P, t_f, z), mu_gas_lge(t_f, sg_gas, rho_g), rho_g]
+    return tuple(np.where(np.isfinite(v), v, np.nan) for v in salida)
@@ -0,0 +1,327 @@
+#Motor de incertidumbre Monte Carlo con estadísticas en flujo
+#Se muestrean API, sg_gas, rsb, pb, T, psep, tsep (y la presión P) desde
+#distribuciones definidas por el usuario, se evalúan las propiedades por
+#bloques con el motor vectorizado y se acumulan momentos y percentiles con
+#estimadores en flujo. Ninguna etapa guarda todas las realizaciones, así
+#que la memoria depende del tamaño de bloque y no del número de realizaciones.
+
+import csv
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model.backends import evaluar_pvt, get_backend
+from model.pvt_engine import COLUMNAS
+from model.random_streams import FLUJO_MONTECARLO, BLOQUE, resolver_semilla, sortear
+
+# Parámetros muestreables, en el orden en que se sortean
+PARAMETROS = ("api", "sg_gas", "rsb", "pb", "tr", "psep", "tsep", "sgo", "p")
+DEFECTOS = {"psep": ("constant", 100.0), "tsep": ("constant", 120.0),
+            "sgo": ("constant", 0.82)}
+
+# Distribuciones soportadas y su número de parámetros
+DISTRIBUCIONES = {
+    "constant": 1,     # (valor,)
+    "uniform": 2,      # (mínimo, máximo)
+    "normal": 2,       # (media, desviación)
+    "lognormal": 2,    # (media, desviación) del logaritmo
+    "triangular": 3,   # (mínimo, moda, máximo)
+}
+
+PERCENTILES = (10, 50, 90)
+# Error relativo de los percentiles de StreamingStats y cubetas por signo;
+# 2**18 cubetas cubren todo el rango de float64 a ese error, así que por
+# defecto nunca se pliegan (solo se guardan las cubetas usadas)
+ERROR_RELATIVO = 0.005
+MAX_CUBETAS = 1 << 18
+
+
+def _validar(distribuciones):
+    """Completa los defectos y revisa que cada distribución sea válida."""
+    specs = dict(DEFECTOS)
+    for k, v in distribuciones.items():
+        specs[k.lower()] = v
+
+    faltan = [k for k in PARAMETROS if k not in specs]
+    if faltan:
+        raise ValueError(f"Faltan distribuciones para: {', '.join(faltan)}")
+    for k, spec in specs.items():
+        if k not in PARAMETROS:
+            raise ValueError(f"Parámetro desconocido: {k}")
+        if isinstance(spec, (int, float)):
+            specs[k] = spec = ("constant", float(spec))
+        nombre, args = spec[0], spec[1:]
+        if nombre not in DISTRIBUCIONES:
+            raise ValueError(f"Distribución desconocida para {k}: {nombre}")
+        if len(args) != DISTRIBUCIONES[nombre]:
+            raise ValueError(f"{nombre} requiere {DISTRIBUCIONES[nombre]} parámetros ({k})")
+    return specs
+
+
+def _muestrear(rng, spec, n):
+    """n valores de la distribución spec. Las constantes se devuelven como float."""
+    nombre, args = spec[0], spec[1:]
+    if nombre == "constant":
+        return float(args[0])
+    return getattr(rng, nombre)(*args, size=n)
+
+
+def _cubetas(x, log_gamma):
+    """Índice de cubeta logarítmica de cada valor positivo: ceil(log_gamma(x))."""
+    idx = np.log(x)
+    idx /= log_gamma
+    idx = np.ceil(idx, out=idx).astype(np.int64)
+    inicio = idx.min()
+    conteos = np.bincount(idx - inicio)
+    usados = np.flatnonzero(conteos)
+    return usados + inicio, conteos[usados].astype(np.int64)
+
+
+def _sumar_cubetas(idx_a, conteos_a, idx_b, conteos_b, nbins):
+    """
+    Une dos conjuntos de cubetas (índices ordenados y conteos). Si el rango de
+    índices supera nbins, las cubetas más bajas (valores más cercanos a 0) se
+    pliegan en la primera de las nbins más altas. El corte solo depende del
+    índice máximo, así que el resultado no depende del orden de las uniones.
+    """
+    idx = np.concatenate((idx_a, idx_b))
+    conteos = np.concatenate((conteos_a, conteos_b))
+    if idx.size and idx.max() - idx.min() >= nbins:
+        idx = np.maximum(idx, idx.max() - nbins + 1)
+    idx, inversa = np.unique(idx, return_inverse=True)
+    suma = np.zeros(idx.size, dtype=np.int64)
+    np.add.at(suma, inversa, conteos)
+    return idx, suma
+
+
+class StreamingStats:
+    """
+    Momentos y percentiles de una variable acumulados por bloques.
+
+    Los momentos (media, varianza) se combinan con la fórmula de Chan et al.
+    Los percentiles se estiman con cubetas logarítmicas (como DDSketch): un
+    valor x > 0 cae en la cubeta i = ceil(log_gamma(x)) con
+    gamma = (1 + alfa) / (1 - alfa), y el percentil se reporta con el valor
+    representativo de su cubeta, a un error relativo de como mucho alfa sin
+    importar el rango ni los valores extremos. Los negativos usan cubetas de
+    |x| aparte y los ceros un conteo propio. Con más de nbins cubetas por
+    signo se pliegan las más cercanas a 0. Las cubetas son fijas, así que los
+    conteos se combinan exactamente y no dependen del orden ni del
+    particionado de los datos. Los NaN se cuentan aparte.
+    """
+
+    __slots__ = ("n", "n_nan", "media", "_m2", "minimo", "maximo", "nbins", "alfa",
+                 "_log_gamma", "_positivos", "_negativos", "_ceros")
+
+    def __init__(self, nbins=MAX_CUBETAS, alfa=ERROR_RELATIVO):
+        self.n = 0
+        self.n_nan = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.nbins = int(nbins)
+        self.alfa = float(alfa)
+        self._log_gamma = math.log((1.0 + self.alfa) / (1.0 - self.alfa))
+        vacio = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        self._positivos = self._negativos = vacio
+        self._ceros = 0
+
+    def update(self, x):
+        """Agrega un bloque de valores."""
+        x = np.asarray(x, dtype=float).ravel()
+        finitos = np.isfinite(x)
+        if not finitos.all():
+            self.n_nan += int(x.size - finitos.sum())
+            x = x[finitos]
+        if x.size == 0:
+            return
+
+        # Momentos (Chan et al.)
+        n_b = x.size
+        media_b = float(x.mean())
+        m2_b = float(((x - media_b) ** 2).sum())
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self._m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+        minimo_b, maximo_b = float(x.min()), float(x.max())
+        self.minimo = min(self.minimo, minimo_b)
+        self.maximo = max(self.maximo, maximo_b)
+
+        # Cubetas
+        if minimo_b > 0:
+            positivos, negativos = x, x[:0]
+        else:
+            positivos, negativos = x[x > 0], -x[x < 0]
+        self._ceros += x.size - positivos.size - negativos.size
+        if positivos.size:
+            self._positivos = _sumar_cubetas(*self._positivos,
+                                             *_cubetas(positivos, self._log_gamma), self.nbins)
+        if negativos.size:
+            self._negativos = _sumar_cubetas(*self._negativos,
+                                             *_cubetas(negativos, self._log_gamma), self.nbins)
+
+    def merge(self, otra):
+        """Combina otra StreamingStats (p. ej. de otro proceso) en esta."""
+        if otra.n == 0:
+            self.n_nan += otra.n_nan
+            return
+        if (self.nbins, self.alfa) != (otra.nbins, otra.alfa):
+            raise ValueError("Solo se pueden combinar estadísticas con el mismo nbins y alfa")
+
+        self._positivos = _sumar_cubetas(*self._positivos, *otra._positivos, self.nbins)
+        self._negativos = _sumar_cubetas(*self._negativos, *otra._negativos, self.nbins)
+        self._ceros += otra._ceros
+
+        n = self.n + otra.n
+        delta = otra.media - self.media
+        self._m2 += otra._m2 + delta * delta * self.n * otra.n / n
+        self.media += delta * otra.n / n
+        self.n = n
+        self.n_nan += otra.n_nan
+        self.minimo = min(self.minimo, otra.minimo)
+        self.maximo = max(self.maximo, otra.maximo)
+
+    @property
+    def varianza(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    def percentil(self, q):
+        """Percentil q (0-100): valor representativo de la cubeta del rango q·(n − 1)."""
+        if self.n == 0:
+            return math.nan
+        if q <= 0:
+            return self.minimo
+        if q >= 100:
+            return self.maximo
+        # Representante 2·gamma^i / (gamma + 1): error relativo <= alfa en la cubeta
+        escala = 2.0 / (math.exp(self._log_gamma) + 1.0)
+        idx_neg, conteos_neg = self._negativos
+        idx_pos, conteos_pos = self._positivos
+        # En orden creciente: negativos de mayor a menor |x|, ceros, positivos
+        valores = np.concatenate((-escala * np.exp(idx_neg[::-1] * self._log_gamma), [0.0],
+                                  escala * np.exp(idx_pos * self._log_gamma)))
+        conteos = np.concatenate((conteos_neg[::-1], [self._ceros], conteos_pos))
+        rango = math.floor(q / 100.0 * (self.n - 1))
+        i = int(np.searchsorted(np.cumsum(conteos), rango, side="right"))
+        return float(min(max(valores[i], self.minimo), self.maximo))
+
+    def resumen(self, percentiles=PERCENTILES):
+        """Diccionario con n, NaN, media, desviación, mínimo, máximo y percentiles."""
+        datos = {
+            "n": self.n,
+            "n_nan": self.n_nan,
+            "media": self.media if self.n else math.nan,
+            "desviacion": math.sqrt(self.varianza) if self.n > 1 else math.nan,
+            "minimo": self.minimo if self.n else math.nan,
+            "maximo": self.maximo if self.n else math.nan,
+        }
+        for q in percentiles:
+            datos[f"P{q}"] = self.percentil(q)
+        return datos
+
+
+def _procesar_rango(specs, seed, inicio, fin, nbins, backend=None):
+    """Sortea y evalúa las realizaciones [inicio, fin) y devuelve sus estadísticas."""
+    muestra = sortear(seed, inicio, fin,
+                      lambda rng, m: {k: _muestrear(rng, specs[k], m) for k in PARAMETROS},
+                      FLUJO_MONTECARLO)
+    columnas = evaluar_pvt(muestra["p"], muestra["pb"], muestra["rsb"],
+                           muestra["api"], muestra["sg_gas"], muestra["tr"],
+                           sgo=muestra["sgo"], psep=muestra["psep"],
+                           tsep=muestra["tsep"], backend=backend)
+    stats = {k: StreamingStats(nbins) for k in COLUMNAS}
+    for k, col in zip(COLUMNAS, columnas):
+        stats[k].update(col)
+    return stats
+
+
+def _procesar_tarea(args):
+    return _procesar_rango(*args)
+
+
+def run_montecarlo(distribuciones, n, seed=None, chunk_size=16 * BLOQUE, nbins=MAX_CUBETAS,
+                   workers=1, backend=None):
+    """
+    Simulación Monte Carlo de las propiedades PVT con memoria acotada.
+
+    Parámetros
+    ----------
+    distribuciones : dict
+        Parámetro -> (nombre, *args) o un número (constante). Parámetros:
+        api, sg_gas, rsb, pb, tr, p y opcionalmente psep, tsep, sgo.
+        Nombres: constant, uniform, normal, lognormal, triangular.
+    n : int
+        Número total de realizaciones.
+    seed : int, opcional
+        Semilla de la corrida (Summary!B12). Cada bloque de
+        random_streams.BLOQUE realizaciones tiene su propio generador, así
+        que las realizaciones no dependen de chunk_size ni de workers.
+    chunk_size : int
+        Realizaciones evaluadas por tarea; fija la memoria usada. Conviene
+        que sea múltiplo de random_streams.BLOQUE.
+    nbins : int
+        Máximo de cubetas logarítmicas por signo de cada propiedad (ver
+        StreamingStats); con menos se pliegan las más cercanas a 0.
+    workers : int
+        Procesos en paralelo; 1 evalúa en el proceso actual.
+    backend : str, opcional
+        Backend de cálculo ("python", "numpy", "numba"); por defecto el de
+        backends.set_backend / PVT_BACKEND. Se resuelve una vez y se pasa
+        a todos los procesos.
+
+    Retorna
+    -------
+    dict : propiedad -> StreamingStats, con las columnas de calc_pvt_array
+           (rs, bo, co, rho, mu_o). Los percentiles son de no excedencia:
+           P10 es el valor con 10 % de realizaciones por debajo. Los conteos
+           y percentiles son idénticos para cualquier chunk_size/workers; la
+           media y la desviación solo cambian por redondeo.
+    """
+    specs = _validar(distribuciones)
+    if n < 0 or chunk_size < 1:
+        raise ValueError("n debe ser >= 0 y chunk_size >= 1")
+
+    seed = resolver_semilla(seed)
+    backend = backend or get_backend()
+    tareas = [(specs, seed, i, min(i + chunk_size, n), nbins, backend)
+              for i in range(0, n, chunk_size)]
+    stats = {k: StreamingStats(nbins) for k in COLUMNAS}
+
+    if workers > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for parcial in pool.map(_procesar_tarea, tareas):
+                for k in COLUMNAS:
+                    stats[k].merge(parcial[k])
+    else:
+        for tarea in tareas:
+            parcial = _procesar_rango(*tarea)
+            for k in COLUMNAS:
+                stats[k].merge(parcial[k])
+    return stats
+
+
+def resumen_tabla(stats, percentiles=PERCENTILES):
+    """Tabla 2D (encabezado + una fila por propiedad) para Excel o CSV."""
+    claves = ["n", "n_nan", "media", "desviacion", "minimo", "maximo"] + \
+        [f"P{q}" for q in percentiles]
+    filas = [["propiedad"] + claves]
+    for k, s in stats.items():
+        datos = s.resumen(percentiles)
+        filas.append([k] + [datos[c] for c in claves])
+    return filas
+
+
+def guardar_resumen(stats, ruta, percentiles=PERCENTILES):
+    """Escribe el resumen como .json (propiedad -> estadísticas) o .csv."""
+    if ruta.lower().endswith(".json"):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({k: s.resumen(percentiles) for k, s in stats.items()}, f, indent=2)
+    else:
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(resumen_tabla(stats, percentiles))
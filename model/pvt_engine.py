@@ -0,0 +1,190 @@
+#Motor vectorizado de regimenes saturado / subsaturado
+#Reemplaza el ciclo de calc_pvt_at_p sobre cada presion: el arreglo de
+#presiones se separa una sola vez con mascaras booleanas (P <= Pb y P > Pb),
+#cada correlacion se evalua en bloque sobre su conjunto y los resultados se
+#esparcen de vuelta en columnas preasignadas. Con derivadas=True las
+#derivadas respecto a P salen de la misma pasada (regla de la cadena a
+#traves de Rs), sin diferencias finitas.
+
+import numpy as np
+
+from model.PVT_vec import (
+    rs_standing_vec,
+    rs_velarde_vec,
+    bo_standing_vec,
+    bo_vasbeg_vec,
+    co_petrosk_vec,
+    co_vasquez_beggs_vec,
+    ro_standing_vec,
+    ro_subsaturado_vec,
+    mu_beggs_robinson_vec,
+    muo_vasquez_beggs_vec,
+)
+from model.fluid_model import FluidModel
+
+# Orden de las columnas devueltas por calc_pvt_array
+COLUMNAS = ("rs", "bo", "co", "rho", "mu_o")
+# Derivadas respecto a P, en el mismo orden (calc_pvt_array(..., derivadas=True))
+DERIVADAS = ("drs_dp", "dbo_dp", "dco_dp", "drho_dp", "dmu_o_dp")
+
+
+def _plano(a, forma):
+    """Deja los escalares como estan y aplana los arreglos a la forma comun."""
+    a = np.asarray(a, dtype=float)
+    if a.ndim == 0:
+        return a
+    return np.broadcast_to(a, forma).ravel()
+
+
+def _tomar(a, sel):
+    """Selecciona el subconjunto sel de un parametro (los escalares no se indexan)."""
+    return a if a.ndim == 0 else a[sel]
+
+
+def _valor_derivada(resultado):
+    """(valor, derivada) de una correlacion de PVT_vec; derivada None si no se pidio."""
+    return resultado[0], (resultado[2] if len(resultado) == 3 else None)
+
+
+def _mu_saturada(api, t_f, rs, drs=None):
+    """
+    μob de Beggs–Robinson a partir de Rs.
+
+    Igual que calc_pvt_at_p: donde Rs no es valido (None en la version
+    escalar), mu_beggs_robinson recibe Rs=None y devuelve μod.
+    Si se da drs (dRs/dP) se devuelve ademas dμob/dP, 0 donde se usa μod.
+    """
+    mu_ob, dmu = _valor_derivada(mu_beggs_robinson_vec(api, t_f, Rs=rs, derivada=drs is not None))
+    sin_rs = np.isnan(rs)
+    if sin_rs.any():
+        mu_od, _ = mu_beggs_robinson_vec(api, t_f)
+        mu_ob = np.where(sin_rs, mu_od, mu_ob)
+    if drs is None:
+        return mu_ob
+    return mu_ob, np.where(sin_rs, 0.0, dmu * drs)
+
+
+def calc_pvt_array(P, pb, rsb, api, sg_gas, tr, sgo=0.82, psep=100.0, tsep=120.0,
+                   derivadas=False):
+    """
+    Calcula Rs, Bo, Co, rho y mu_o para todo el arreglo de presiones P,
+    usando las mismas correlaciones por regimen que calc_pvt_at_p:
+
+        P <= Pb : Rs Standing, Co Vasquez–Beggs, Bo Standing,
+                  ρo Standing, μo = μob (Beggs–Robinson)
+        P >  Pb : Rs Velarde, Co Petrosky–Farshad, Bo Vasquez–Beggs,
+                  ρo = ρob·exp(Co·(P−Pb)), μo Vasquez–Beggs
+
+    Todos los parametros del fluido pueden ser escalares o arreglos que
+    hagan broadcasting con P (por ejemplo, una realizacion por punto).
+
+    Parámetros
+    ----------
+    P : float o ndarray
+        Presiones del sistema (psia).
+    pb, rsb, api, sg_gas, tr : float o ndarray
+        Presión de burbuja (psia), Rs en Pb (scf/stb), gravedad API,
+        gravedad específica del gas y temperatura (°F).
+    sgo, psep, tsep : float o ndarray
+        Gravedad específica del petróleo a tanque, presión (psia) y
+        temperatura (°F) del separador.
+    derivadas : bool
+        Si es True se devuelven tambien las derivadas analiticas respecto a
+        P (DERIVADAS). En P = Pb la derivada es la de la rama saturada (por
+        la izquierda), la misma que da el valor.
+
+    Retorna
+    -------
+    rs, bo, co, rho, mu_o : ndarray
+        Columnas con la forma de broadcasting de las entradas.
+        Los puntos invalidos quedan en NaN.
+    (valores, derivadas) si derivadas=True, cada uno con las 5 columnas.
+    """
+    # Un solo fluido: se usan los invariantes precalculados de FluidModel
+    if all(np.ndim(a) == 0 for a in (pb, rsb, api, sg_gas, tr, sgo, psep, tsep)):
+        return FluidModel(api, sg_gas, sgo, rsb, pb, tr, psep, tsep).evaluate(P, derivadas)
+
+    forma = np.broadcast_shapes(*[np.shape(a) for a in
+                                  (P, pb, rsb, api, sg_gas, tr, sgo, psep, tsep)])
+    pb, rsb, api, sg_gas, tr, sgo, psep, tsep = [
+        _plano(a, forma) for a in (pb, rsb, api, sg_gas, tr, sgo, psep, tsep)
+    ]
+    # P siempre se lleva a la forma completa para poder enmascararlo
+    P = np.broadcast_to(np.asarray(P, dtype=float), forma).ravel()
+    n = P.size
+
+    # Columnas de salida preasignadas
+    salida = np.full((len(COLUMNAS), n), np.nan)
+    rs, bo, co, rho, mu_o = salida
+    if derivadas:
+        d_salida = np.full((len(DERIVADAS), n), np.nan)
+
+    # Separar una sola vez los regimenes
+    sat = P <= pb
+    sub = ~sat
+
+    # =========================
+    # Region saturada (P <= Pb)
+    # =========================
+    if sat.any():
+        p_s = P[sat]
+        api_s, sg_s, tr_s = _tomar(api, sat), _tomar(sg_gas, sat), _tomar(tr, sat)
+        sgo_s = _tomar(sgo, sat)
+
+        rs_s, drs_s = _valor_derivada(rs_standing_vec(api_s, sg_s, p_s, tr_s, derivadas))
+        co_s, dco_s = _valor_derivada(co_vasquez_beggs_vec(
+            _tomar(rsb, sat), sg_s, api_s, tr_s, p_s, _tomar(psep, sat), _tomar(tsep, sat),
+            derivadas))
+        bo_s, dbo_s = _valor_derivada(bo_standing_vec(rs_s, sg_s, sgo_s, tr_s, derivadas))
+        rho_s, drho_s = _valor_derivada(ro_standing_vec(rs_s, sg_s, sgo_s, tr_s, derivadas))
+        if derivadas:
+            mu_s, dmu_s = _mu_saturada(api_s, tr_s, rs_s, drs_s)
+            d_salida[:, sat] = drs_s, dbo_s * drs_s, dco_s, drho_s * drs_s, dmu_s
+        else:
+            mu_s = _mu_saturada(api_s, tr_s, rs_s)
+
+        rs[sat] = rs_s
+        co[sat] = co_s
+        bo[sat] = bo_s
+        rho[sat] = rho_s
+        mu_o[sat] = mu_s
+
+    # =========================
+    # Region subsaturada (P > Pb)
+    # =========================
+    if sub.any():
+        p_u = P[sub]
+        pb_u, rsb_u = _tomar(pb, sub), _tomar(rsb, sub)
+        api_u, sg_u, tr_u = _tomar(api, sub), _tomar(sg_gas, sub), _tomar(tr, sub)
+        sgo_u = _tomar(sgo, sub)
+
+        rs_u, drs_u = _valor_derivada(rs_velarde_vec(rsb_u, sg_u, sgo_u, pb_u, p_u, tr_u,
+                                                     derivadas))
+        co_u, dco_u = _valor_derivada(co_petrosk_vec(rsb_u, sg_u, p_u, tr_u, api_u, derivadas))
+        bo_u, dbo_u = _valor_derivada(bo_vasbeg_vec(rs_u, api_u, sg_u, tr_u,
+                                                    _tomar(psep, sub), _tomar(tsep, sub),
+                                                    derivadas))
+
+        # Densidad en el punto de burbuja: ρob
+        rho_pb, _ = ro_standing_vec(rsb_u, sg_u, sgo_u, tr_u)
+        if derivadas:
+            rho_u, _, drho_u = ro_subsaturado_vec(rho_pb, co_u, p_u, pb_u, True, dco_u)
+            mu_ob_u, dmu_ob_u = _mu_saturada(api_u, tr_u, rs_u, drs_u)
+            mu_u, _, dmu_u = muo_vasquez_beggs_vec(mu_ob_u, p_u, pb_u, True, dmu_ob_u)
+            d_salida[:, sub] = drs_u, dbo_u * drs_u, dco_u, drho_u, dmu_u
+        else:
+            rho_u, _ = ro_subsaturado_vec(rho_pb, co_u, p_u, pb_u)
+            mu_ob_u = _mu_saturada(api_u, tr_u, rs_u)
+            mu_u, _ = muo_vasquez_beggs_vec(mu_ob_u, p_u, pb_u)
+
+        rs[sub] = rs_u
+        co[sub] = co_u
+        bo[sub] = bo_u
+        rho[sub] = rho_u
+        mu_o[sub] = mu_u
+
+    if derivadas:
+        d_salida[np.isnan(salida) | ~np.isfinite(d_salida)] = np.nan
+        return (tuple(col.reshape(forma) for col in salida),
+                tuple(col.reshape(forma) for col in d_salida))
+    return tuple(col.reshape(forma) for col in salida)
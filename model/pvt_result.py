@@ -0,0 +1,86 @@
+#Tabla de resultados PVT como estructura de arreglos
+#Todas las columnas viven en un solo bloque (n_columnas, n) preasignado y
+#C-contiguo: cada columna es una fila contigua del bloque. Se llena por
+#tramos, así que el cálculo nunca tiene a la vez la tabla completa y otra
+#copia de cada columna, y se entrega sin copiar:
+#   resultado["Bo (rb/stb)"] -> vista de la columna (gráficos, diagnósticos)
+#   resultado.to_dataframe() -> DataFrame que usa el bloque como su bloque float
+#   resultado.to_arrow()     -> tabla de pyarrow sobre los mismos buffers
+#La precisión (float64 o float32) se elige al crear la tabla; los valores se
+#calculan en float64 y se redondean al guardarlos.
+
+import numpy as np
+
+PRECISIONES = {"float64": np.float64, "float32": np.float32}
+
+
+def precision(dtype):
+    """np.dtype de un nombre de PRECISIONES o de un tipo float."""
+    dtype = np.dtype(PRECISIONES.get(dtype, dtype))
+    if dtype not in (np.float64, np.float32):
+        raise ValueError(f"Precisión no soportada: {dtype}. Opciones: {', '.join(PRECISIONES)}")
+    return dtype
+
+
+class PVTResult:
+    """
+    Columnas de resultados preasignadas, una fila del bloque por columna.
+
+    Parámetros
+    ----------
+    columnas : secuencia de str
+        Encabezados, en orden (p. ej. COLUMNAS_RESULTS de pvt_batch).
+    n : int
+        Número de filas (realizaciones).
+    dtype : "float64", "float32" o tipo numpy
+    """
+
+    __slots__ = ("columnas", "datos", "_indice")
+
+    def __init__(self, columnas, n, dtype=np.float64):
+        self.columnas = tuple(columnas)
+        self.datos = np.empty((len(self.columnas), int(n)), dtype=precision(dtype))
+        self._indice = {c: i for i, c in enumerate(self.columnas)}
+
+    def __len__(self):
+        return self.datos.shape[1]
+
+    def __getitem__(self, columna):
+        """Vista (sin copia) de una columna."""
+        return self.datos[self._indice[columna]]
+
+    def __contains__(self, columna):
+        return columna in self._indice
+
+    @property
+    def dtype(self):
+        return self.datos.dtype
+
+    @property
+    def nbytes(self):
+        return self.datos.nbytes
+
+    def llenar(self, inicio, valores):
+        """Filas [inicio, inicio + m) de cada columna (en el orden de columnas)."""
+        if len(valores) != len(self.columnas):
+            raise ValueError(f"Se esperaban {len(self.columnas)} columnas, hay {len(valores)}")
+        for fila, v in zip(self.datos, valores):
+            fila[inicio:inicio + len(v)] = v
+
+    def as_dict(self):
+        """{encabezado: vista de la columna}."""
+        return dict(zip(self.columnas, self.datos))
+
+    def to_dataframe(self):
+        """
+        DataFrame sobre el mismo bloque (sin copia): pandas guarda las
+        columnas float como un bloque (n_columnas, n), que es self.datos.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.datos.T, columns=list(self.columnas), copy=False)
+
+    def to_arrow(self):
+        """pyarrow.Table cuyas columnas apuntan a las filas del bloque."""
+        import pyarrow as pa
+        return pa.table([pa.array(c) for c in self.datos], names=list(self.columnas))
+
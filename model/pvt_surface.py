@@ -0,0 +1,123 @@
+#Evaluación de todas las propiedades en una malla presión × temperatura
+#pvt_controller evalúa una sola isoterma (T = tr). Aquí P se usa como
+#columna y T como fila de una malla con broadcasting, así que todas las
+#propiedades del petróleo, gas y agua salen de una sola llamada vectorizada
+#por familia. La presión de burbuja cambia con T: se escala con Standing
+#para que en T = tr coincida con la Pb de las entradas. Si el fluido trae
+#parámetros de ajuste (model.calibracion), el petróleo se evalúa con
+#FluidModel(..., ajuste) en cada temperatura en lugar de calc_pvt_array.
+
+import numpy as np
+
+from model.bubble_point import pb_standing
+from model.fluid_model import FluidModel
+from model.gas import COLUMNAS_GAS, propiedades_gas
+from model.pvt_engine import COLUMNAS, calc_pvt_array
+from model.water import COLUMNAS_AGUA, propiedades_agua
+
+FAMILIAS = {"aceite": COLUMNAS, "gas": COLUMNAS_GAS, "agua": COLUMNAS_AGUA}
+
+# Parámetros del fluido, con los nombres de FluidModel
+PARAMETROS = ("api", "sg_gas", "sgo", "rsb", "pb", "T", "psep", "tsep")
+
+
+def parametros_fluido(fluido):
+    """Parámetros de un FluidModel o de un dict con las mismas claves."""
+    if isinstance(fluido, FluidModel):
+        return {k: getattr(fluido, k) for k in PARAMETROS}
+    datos = dict(fluido)
+    datos.setdefault("psep", 100.0)
+    datos.setdefault("tsep", 120.0)
+    datos.setdefault("sgo", 0.82)
+    return {k: float(datos[k]) for k in PARAMETROS}
+
+
+def ajuste_fluido(fluido):
+    """Parámetros de ajuste de un FluidModel o de la clave "ajuste" de un dict ({} sin ajuste)."""
+    if isinstance(fluido, FluidModel):
+        return dict(fluido.ajuste)
+    return dict(dict(fluido).get("ajuste") or {})
+
+
+def propiedades_aceite(f, p, pb_t, t_f, ajuste=None):
+    """
+    Rs, Bo, Co, ρo y μo en la malla p × t_f.
+
+    f : dict de parametros_fluido
+    p : ndarray 1D, presiones (psia)
+    pb_t, t_f : ndarray 1D, Pb (psia) en cada temperatura y las temperaturas (°F)
+    ajuste : dict, parámetros de ajuste; sin ajuste se usa calc_pvt_array
+             con broadcasting, con ajuste FluidModel(..., ajuste) por temperatura
+
+    Retorna
+    -------
+    rs, bo, co, rho, mu_o : ndarray (len(p), len(t_f))
+    """
+    p = np.asarray(p, dtype=float).ravel()
+    pb_t = np.atleast_1d(np.asarray(pb_t, dtype=float))
+    t_f = np.atleast_1d(np.asarray(t_f, dtype=float))
+    if not ajuste:
+        return calc_pvt_array(p[:, None], pb_t[None, :], f["rsb"], f["api"], f["sg_gas"],
+                              t_f[None, :], f["sgo"], f["psep"], f["tsep"])
+    salida = np.empty((len(COLUMNAS), p.size, t_f.size))
+    for j, (pb_j, t_j) in enumerate(zip(pb_t, t_f)):
+        fluido = FluidModel(f["api"], f["sg_gas"], f["sgo"], f["rsb"], pb_j, t_j,
+                            f["psep"], f["tsep"], ajuste)
+        salida[:, :, j] = fluido.evaluate(p)
+    return tuple(salida)
+
+
+def pb_por_temperatura(fluido, t_f):
+    """
+    Pb (psia) del fluido a otras temperaturas.
+
+    Pb(T) = Pb · Pb_Standing(T) / Pb_Standing(tr); si Standing no es válido
+    para el fluido se deja Pb constante.
+    """
+    f = parametros_fluido(fluido)
+    t_f = np.asarray(t_f, dtype=float)
+    pb_t, ok_t = pb_standing(f["rsb"], f["api"], f["sg_gas"], t_f)
+    pb_ref, ok_ref = pb_standing(f["rsb"], f["api"], f["sg_gas"], f["T"])
+    with np.errstate(all="ignore"):
+        escala = pb_t / pb_ref
+    return np.where(ok_t & ok_ref & (escala > 0), f["pb"] * escala, f["pb"])
+
+
+def superficie_pvt(fluido, p, t_f, salinidad=0.0, familias=("aceite", "gas", "agua")):
+    """
+    Propiedades en la malla P × T en una sola pasada por familia.
+
+    Parámetros
+    ----------
+    fluido : FluidModel o dict
+        Fluido de referencia (api, sg_gas, sgo, rsb, pb, T, psep, tsep y
+        opcionalmente "ajuste"), con Pb medida a T.
+    p : ndarray 1D, presiones (psia)
+    t_f : ndarray 1D, temperaturas (°F)
+    salinidad : float, % en peso de NaCl para el agua
+    familias : tupla con "aceite", "gas" y/o "agua"
+
+    Retorna
+    -------
+    dict : "p", "t", "pb" (Pb en cada T) y cada propiedad de las familias
+           pedidas como arreglo (len(p), len(t_f))
+    """
+    f = parametros_fluido(fluido)
+    p = np.asarray(p, dtype=float).ravel()
+    t_f = np.atleast_1d(np.asarray(t_f, dtype=float)).ravel()
+    pb_t = pb_por_temperatura(f, t_f)
+    P, T = p[:, None], t_f[None, :]
+
+    salida = {"p": p, "t": t_f, "pb": pb_t}
+    for familia in familias:
+        if familia == "aceite":
+            valores = propiedades_aceite(f, p, pb_t, t_f, ajuste_fluido(fluido))
+        elif familia == "gas":
+            valores = propiedades_gas(P, T, f["sg_gas"])
+        elif familia == "agua":
+            valores = propiedades_agua(P, T, salinidad)
+        else:
+            raise ValueError(f"Familia desconocida: {familia}. Opciones: {', '.join(FAMILIAS)}")
+        forma = (p.size, t_f.size)
+        salida.update({k: np.broadcast_to(v, forma) for k, v in zip(FAMILIAS[familia], valores)})
+    return salida
@@ -0,0 +1,260 @@
+#Tablas PVT precalculadas con consulta por interpolación
+#Se tabulan todas las propiedades de un fluido en una malla de presiones con
+#Pb como punto exacto de quiebre. Cada régimen (P <= Pb y P > Pb) tiene su
+#propia malla, así que la discontinuidad de las correlaciones en Pb no se
+#suaviza. Las consultas ubican el intervalo por aritmética en mallas
+#uniformes (búsqueda binaria con np.searchsorted en mallas no uniformes) e
+#interpolan con cúbicas monótonas (Fritsch–Carlson / PCHIP).
+
+import numpy as np
+
+from model.fluid_model import FluidModel
+from model.gas import COLUMNAS_GAS, propiedades_gas
+
+# Propiedades tabuladas, en el orden de FluidModel.evaluate
+COLUMNAS = ("rs", "bo", "co", "rho", "mu_o")
+
+# Encabezados con unidades, iguales a los de la hoja Results
+ENCABEZADOS = {
+    "P": "P (psia)",
+    "rs": "Rs (scf/stb)",
+    "bo": "Bo (rb/stb)",
+    "co": "Co (1/psia)",
+    "rho": "rho (lb/ft3)",
+    "mu_o": "mu_o (cp)",
+    "z": "Z",
+    "bg": "Bg (rb/scf)",
+    "mu_g": "mu_g (cp)",
+    "rho_g": "rho_g (lb/ft3)",
+}
+
+
+def _pendientes_pchip(x, y):
+    """
+    Derivadas nodales de Fritsch–Carlson para cada columna de y.
+
+    x : (n,) creciente;  y : (m, n).  Retorna d : (m, n).
+    """
+    h = np.diff(x)
+    delta = np.diff(y, axis=-1) / h
+    d = np.zeros_like(y)
+    if x.size < 2:
+        return d
+    if x.size == 2:
+        d[:] = delta
+        return d
+
+    # Nodos interiores: media armónica ponderada, 0 si cambia el signo
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    d0, d1 = delta[..., :-1], delta[..., 1:]
+    mismo_signo = (d0 * d1) > 0
+    with np.errstate(all="ignore"):
+        armonica = (w1 + w2) / (w1 / d0 + w2 / d1)
+    d[..., 1:-1] = np.where(mismo_signo, armonica, 0.0)
+
+    # Extremos: fórmula de tres puntos con corrección de monotonía
+    for k, (hk0, hk1, dk0, dk1) in ((0, (h[0], h[1], delta[..., 0], delta[..., 1])),
+                                    (-1, (h[-1], h[-2], delta[..., -1], delta[..., -2]))):
+        dk = ((2 * hk0 + hk1) * dk0 - hk0 * dk1) / (hk0 + hk1)
+        dk = np.where(np.sign(dk) != np.sign(dk0), 0.0, dk)
+        dk = np.where((np.sign(dk0) != np.sign(dk1)) & (np.abs(dk) > 3 * np.abs(dk0)),
+                      3 * dk0, dk)
+        d[..., k] = dk
+    return d
+
+
+class _Rama:
+    """
+    Tabla de un régimen: malla de presiones, valores y los coeficientes del
+    polinomio cúbico de cada intervalo, y(s) = c0 + c1·s + c2·s² + c3·s³ con
+    s = P − p_i. Los coeficientes se guardan como filas contiguas
+    (propiedad, grado, intervalo) para leerlos con np.take.
+    """
+
+    __slots__ = ("p", "valores", "coeficientes", "_inv_h")
+
+    def __init__(self, p, valores):
+        self.p = p
+        self.valores = valores
+        self._inv_h = None
+        if p.size < 2:
+            self.coeficientes = None
+            return
+        h = np.diff(p)
+        # Malla uniforme: el intervalo se obtiene sin búsqueda binaria
+        if np.allclose(h, h[0], rtol=1e-9, atol=0.0):
+            self._inv_h = (p.size - 1) / (p[-1] - p[0])
+        d = _pendientes_pchip(p, valores)
+        delta = np.diff(valores, axis=-1) / h
+        c0 = valores[:, :-1]
+        c1 = d[:, :-1]
+        c2 = (3 * delta - 2 * d[:, :-1] - d[:, 1:]) / h
+        c3 = (d[:, :-1] + d[:, 1:] - 2 * delta) / (h * h)
+        # Forma (propiedades, 4, intervalos)
+        self.coeficientes = np.ascontiguousarray(np.stack([c0, c1, c2, c3], axis=1))
+
+    def interpolar(self, q, out=None):
+        """
+        Interpolación Hermite cúbica en q (dentro de [p[0], p[-1]]).
+
+        Retorna un arreglo (propiedades, len(q)); si se da out se escribe ahí.
+        """
+        if out is None:
+            out = np.empty((self.valores.shape[0], q.size))
+        if self.coeficientes is None:
+            out[:] = self.valores[:, :1]
+            return out
+        p = self.p
+        if self._inv_h is not None:
+            i = ((q - p[0]) * self._inv_h).astype(np.intp)
+        else:
+            i = np.searchsorted(p, q, side="right") - 1
+        np.clip(i, 0, p.size - 2, out=i)
+        s = q - p[i]
+
+        # Horner en el lugar, una propiedad a la vez
+        for c, y in zip(self.coeficientes, out):
+            np.take(c[3], i, out=y)
+            y *= s
+            y += c[2].take(i)
+            y *= s
+            y += c[1].take(i)
+            y *= s
+            y += c[0].take(i)
+        return out
+
+
+class PVTTable:
+    """
+    Tabla PVT de un fluido con consulta rápida por interpolación.
+
+    Se construye con build_pvt_table. Las consultas fuera de
+    [p_min, p_max] devuelven NaN.
+    """
+
+    def __init__(self, fluido, p_sat, p_sub):
+        self.fluido = fluido
+        self.p_min = float(p_sat[0] if p_sat.size else p_sub[0])
+        self.p_max = float(p_sub[-1] if p_sub.size else p_sat[-1])
+        self._sat = _Rama(p_sat, np.array(fluido.evaluate(p_sat))) if p_sat.size else None
+        self._sub = _Rama(p_sub, np.array(fluido.evaluate(p_sub))) if p_sub.size else None
+
+    @property
+    def presiones(self):
+        """Malla completa de presiones (psia), incluyendo Pb."""
+        return np.concatenate([r.p for r in (self._sat, self._sub) if r is not None])
+
+    def as_dict(self):
+        """
+        Columnas de la tabla {encabezado: arreglo}, listas para pandas o CSV.
+
+        Incluye Z, Bg, mu_g y rho_g del gas evaluados en los mismos nodos.
+        """
+        valores = np.concatenate([r.valores for r in (self._sat, self._sub) if r is not None],
+                                 axis=1)
+        presiones = self.presiones
+        tabla = {ENCABEZADOS["P"]: presiones}
+        for k, col in zip(COLUMNAS, valores):
+            tabla[ENCABEZADOS[k]] = col
+        gas = propiedades_gas(presiones, self.fluido.T, self.fluido.sg_gas)
+        for k, col in zip(COLUMNAS_GAS, gas):
+            tabla[ENCABEZADOS[k]] = col
+        return tabla
+
+    def lookup(self, P):
+        """
+        Rs, Bo, Co, rho y mu_o interpolados en las presiones P.
+
+        Retorna
+        -------
+        rs, bo, co, rho, mu_o : ndarray con la forma de P (NaN fuera de rango)
+        """
+        P = np.asarray(P, dtype=float)
+        forma = P.shape
+        q = P.ravel()
+        salida = np.full((len(COLUMNAS), q.size), np.nan)
+
+        dentro = (q >= self.p_min) & (q <= self.p_max)
+        sat = dentro & (q <= self.fluido.pb)
+        sub = dentro & ~sat
+        for rama, sel in ((self._sat, sat), (self._sub, sub)):
+            if rama is None or not sel.any():
+                continue
+            if sel.all():
+                rama.interpolar(q, out=salida)
+            else:
+                salida[:, sel] = rama.interpolar(q[sel])
+        return tuple(col.reshape(forma) for col in salida)
+
+    def max_error(self, n_por_intervalo=4):
+        """
+        Error máximo de interpolación contra las correlaciones exactas.
+
+        Se evalúan n_por_intervalo puntos interiores en cada intervalo de
+        la malla (donde el error de interpolación es mayor).
+
+        Retorna
+        -------
+        dict : propiedad -> (error absoluto máximo, error relativo máximo)
+        """
+        muestras = []
+        for rama in (self._sat, self._sub):
+            if rama is None or rama.p.size < 2:
+                continue
+            t = (np.arange(1, n_por_intervalo + 1) / (n_por_intervalo + 1))[None, :]
+            muestras.append((rama.p[:-1, None] + t * np.diff(rama.p)[:, None]).ravel())
+        if not muestras:
+            return {k: (0.0, 0.0) for k in COLUMNAS}
+
+        q = np.concatenate(muestras)
+        exacto = np.array(self.fluido.evaluate(q))
+        interp = np.array(self.lookup(q))
+        with np.errstate(all="ignore"):
+            abs_err = np.abs(interp - exacto)
+            rel_err = abs_err / np.abs(exacto)
+
+        errores = {}
+        for k, a, r in zip(COLUMNAS, abs_err, rel_err):
+            a, r = a[np.isfinite(a)], r[np.isfinite(r)]
+            errores[k] = (float(a.max()) if a.size else np.nan,
+                          float(r.max()) if r.size else np.nan)
+        return errores
+
+
+def build_pvt_table(fluido, p_min, p_max, n=200):
+    """
+    Tabula las propiedades de un fluido entre p_min y p_max.
+
+    Parámetros
+    ----------
+    fluido : FluidModel o dict
+        Fluido a tabular. Un dict se pasa a FluidModel(**fluido).
+    p_min, p_max : float
+        Rango de presiones (psia).
+    n : int
+        Número aproximado de nodos de la malla; si Pb está dentro del
+        rango es un nodo exacto que separa las dos ramas.
+
+    Retorna
+    -------
+    PVTTable
+    """
+    if not isinstance(fluido, FluidModel):
+        fluido = FluidModel(**fluido)
+    if not p_max > p_min:
+        raise ValueError("p_max debe ser mayor que p_min")
+
+    p_min, p_max, n = float(p_min), float(p_max), max(int(n), 2)
+    pb = fluido.pb
+    if not p_min < pb < p_max:
+        malla = np.linspace(p_min, p_max, n)
+        return PVTTable(fluido, malla[malla <= pb], malla[malla > pb])
+
+    # Cada régimen tiene su propia malla uniforme y Pb es un nodo exacto;
+    # la rama subsaturada arranca justo encima de Pb para tabular su límite
+    n_sat = min(max(int(round(n * (pb - p_min) / (p_max - p_min))) + 1, 2), n - 1)
+    n_sub = max(n - n_sat + 1, 2)
+    p_sat = np.linspace(p_min, pb, n_sat)
+    p_sub = np.linspace(np.nextafter(pb, np.inf), p_max, n_sub)
+    return PVTTable(fluido, p_sat, p_sub)
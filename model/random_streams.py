@@ -0,0 +1,85 @@
+#Flujos aleatorios reproducibles e independientes del particionado
+#Las realizaciones se agrupan en bloques fijos de BLOQUE elementos y cada
+#bloque tiene su propio generador, derivado de la semilla (Summary!B12) con
+#SeedSequence(seed, spawn_key=(flujo, bloque)). La realización i depende solo
+#de (seed, flujo, i), así que una corrida dividida en cualquier número de
+#hilos, procesos o bloques produce exactamente las mismas realizaciones que
+#una corrida secuencial. Reemplaza np.random.seed y el generador global.
+
+import numpy as np
+
+# Realizaciones por bloque; conviene usar bloques de trabajo múltiplos de este valor
+BLOQUE = 1 << 16
+
+# Identificadores de flujo para que usos distintos no compartan números
+FLUJO_PRESIONES = 0
+FLUJO_MONTECARLO = 1
+
+
+def resolver_semilla(seed):
+    """
+    Devuelve una semilla entera fija. Si seed es None se toma entropía del
+    sistema una sola vez, para que todos los bloques usen la misma.
+    """
+    if seed is None:
+        return int(np.random.SeedSequence().entropy)
+    return int(seed)
+
+
+def generador_bloque(seed, bloque, flujo=0):
+    """Generador independiente del bloque indicado."""
+    ss = np.random.SeedSequence(int(seed), spawn_key=(int(flujo), int(bloque)))
+    return np.random.Generator(np.random.PCG64(ss))
+
+
+def sortear(seed, inicio, fin, sorteo, flujo=0):
+    """
+    Realizaciones [inicio, fin) de un sorteo por bloques.
+
+    Parámetros
+    ----------
+    seed : int
+        Semilla de la corrida.
+    inicio, fin : int
+        Rango global de realizaciones.
+    sorteo : callable
+        sorteo(rng, m) devuelve un ndarray de m valores o un dict de
+        ndarrays (los valores float se tratan como constantes). Debe
+        consumir el generador siempre en el mismo orden.
+    flujo : int
+        Identificador del flujo (FLUJO_PRESIONES, FLUJO_MONTECARLO, ...).
+
+    Retorna
+    -------
+    ndarray o dict con los fin - inicio valores del rango.
+    """
+    if fin <= inicio:
+        vacio = sorteo(generador_bloque(seed, 0, flujo), 0)
+        return vacio
+
+    partes = []
+    for b in range(inicio // BLOQUE, (fin - 1) // BLOQUE + 1):
+        datos = sorteo(generador_bloque(seed, b, flujo), BLOQUE)
+        a = max(inicio - b * BLOQUE, 0)
+        z = min(fin - b * BLOQUE, BLOQUE)
+        if isinstance(datos, dict):
+            partes.append({k: v if np.ndim(v) == 0 else v[a:z] for k, v in datos.items()})
+        else:
+            partes.append(datos[a:z])
+
+    if not isinstance(partes[0], dict):
+        return partes[0] if len(partes) == 1 else np.concatenate(partes)
+
+    resultado = {}
+    for k, v in partes[0].items():
+        if np.ndim(v) == 0:
+            resultado[k] = v
+        else:
+            resultado[k] = v if len(partes) == 1 else np.concatenate([p[k] for p in partes])
+    return resultado
+
+
+def uniformes(seed, n, low, high, flujo=FLUJO_PRESIONES, inicio=0):
+    """n valores uniformes en [low, high) de las realizaciones inicio..inicio+n."""
+    return sortear(seed, inicio, inicio + n,
+                   lambda rng, m: rng.uniform(low, high, size=m), flujo)
@@ -0,0 +1,192 @@
+#Propiedades PVT del agua de formación (salmuera)
+#Mismas convenciones que PVT_vec: cualquier argumento puede ser escalar o
+#arreglo (broadcasting) y cada función devuelve (valor, valido), con NaN en
+#los puntos inválidos. La salinidad se da en % en peso de NaCl (0 = agua
+#dulce). P en psia y T en °F, igual que las correlaciones del petróleo.
+
+import numpy as np
+
+from model.PVT_vec import _arreglos, _marcar
+
+# Propiedades del agua, en el orden de propiedades_agua
+COLUMNAS_AGUA = ("bw", "rsw", "mu_w", "cw")
+
+
+# =========================
+# Polinomios de las correlaciones
+# =========================
+# Compartidos por las funciones de una propiedad y por propiedades_agua.
+# Los términos que dependen solo de T o solo de S se evalúan aparte para
+# que, con T y S escalares, no se calculen punto a punto.
+def _bw_dv_t(t_f):
+    """ΔVwT de McCain: expansión térmica."""
+    return -1.0001e-2 + (1.33391e-4 + 5.50654e-7 * t_f) * t_f
+
+
+def _bw_dv_p(p, t_f):
+    """ΔVwP de McCain: compresión por presión."""
+    return (-1.95301e-9 * t_f - 3.58922e-7 + (-1.72834e-13 * t_f - 2.25341e-10) * p) * p
+
+
+def _rsw_abc(t_f):
+    """Coeficientes A, B, C (polinomios en T) de Rswp = A + B·p + C·p²."""
+    A = 8.15839 + (-6.12265e-2 + (1.91663e-4 - 2.1654e-7 * t_f) * t_f) * t_f
+    B = 1.01021e-2 + (-7.44241e-5 + (3.05553e-7 - 2.94883e-10 * t_f) * t_f) * t_f
+    C = -1e-7 * (9.02505 + (-0.130237 + (8.53425e-4 + (-2.34122e-6 + 2.37049e-9 * t_f)
+                                          * t_f) * t_f) * t_f)
+    return A, B, C
+
+
+def _rsw_factor_salinidad(t_f, s):
+    """Rsw/Rswp = 10^(−0.0840655·S·T^−0.285854)."""
+    return 10.0 ** (-0.0840655 * s * t_f ** -0.285854)
+
+
+def _mu_w1(t_f, s):
+    """μw1 = A·T^B a presión atmosférica, con A y B polinomios en S."""
+    A = 109.574 + (-8.40564 + (0.313314 + 8.72213e-3 * s) * s) * s
+    B = -1.12166 + (2.63951e-2 + (-6.79461e-4 + (-5.47119e-5 + 1.55586e-6 * s) * s) * s) * s
+    return A * t_f ** B
+
+
+def _mu_w_factor_presion(p):
+    """μw/μw1 = 0.9994 + 4.0295e-5·p + 3.1062e-9·p²."""
+    return 0.9994 + (4.0295e-5 + 3.1062e-9 * p) * p
+
+
+def _cw_denominador(p, t_f, s):
+    """7.033·p + 541.5·C − 537.0·T + 403300 con C (g/L) de la salinidad."""
+    # C = S/100 · ρw_sc · 16.0185 (lb/ft³ -> g/L)
+    return 7.033 * p + (541.5 * 16.0185 / 100.0) * s * rho_w_sc(s) - 537.0 * t_f + 403300.0
+
+
+#%% Factor volumetrico del agua
+# Correlación de McCain (1990) para Bw
+def bw_mccain(p, t_f):
+    """
+    Factor volumétrico del agua Bw (rb/STB), McCain (1990).
+
+    Bw = (1 + ΔVwP)·(1 + ΔVwT). El efecto de la salinidad es menor al 1 %
+    y McCain recomienda despreciarlo.
+
+    Parámetros:
+    p   : float o ndarray, presión (psia)
+    t_f : float o ndarray, temperatura (°F)
+
+    Retorna:
+    bw : ndarray (rb/STB)
+    valido : ndarray bool
+    """
+    p, t_f = _arreglos(p, t_f)
+    with np.errstate(all="ignore"):
+        bw = (1.0 + _bw_dv_p(p, t_f)) * (1.0 + _bw_dv_t(t_f))
+    return _marcar(bw, (p >= 0) & (bw > 0))
+
+
+#%% Solubilidad del gas en el agua
+# Correlación de McCain (1990) para Rsw con corrección por salinidad
+def rsw_mccain(p, t_f, salinidad=0.0):
+    """
+    Solubilidad del gas en la salmuera Rsw (scf/STB), McCain (1990).
+
+    Agua dulce: Rswp = A + B·p + C·p² con A, B, C polinomios en T.
+    Salmuera: log10(Rsw/Rswp) = −0.0840655·S·T^−0.285854.
+
+    Parámetros:
+    p, t_f    : float o ndarray, presión (psia) y temperatura (°F)
+    salinidad : float o ndarray, % en peso de NaCl
+
+    Retorna:
+    rsw : ndarray (scf/STB), NaN donde T <= 0 o el resultado es negativo
+    valido : ndarray bool
+    """
+    p, t_f, s = _arreglos(p, t_f, salinidad)
+    with np.errstate(all="ignore"):
+        A, B, C = _rsw_abc(t_f)
+        rsw = (A + (B + C * p) * p) * _rsw_factor_salinidad(t_f, s)
+    return _marcar(rsw, (t_f > 0) & (p >= 0) & (s >= 0) & (rsw >= 0))
+
+
+#%% Viscosidad del agua
+# Correlación de McCain (1990) para la viscosidad de la salmuera
+def mu_w_mccain(p, t_f, salinidad=0.0):
+    """
+    Viscosidad de la salmuera μw (cp), McCain (1990).
+
+    μw1 = A·T^B a presión atmosférica (A y B polinomios en S) y
+    μw/μw1 = 0.9994 + 4.0295e-5·p + 3.1062e-9·p².
+
+    Retorna:
+    mu_w : ndarray (cp), NaN donde T <= 0 o S fuera de [0, 26]
+    valido : ndarray bool
+    """
+    p, t_f, s = _arreglos(p, t_f, salinidad)
+    with np.errstate(all="ignore"):
+        mu_w = _mu_w1(t_f, s) * _mu_w_factor_presion(p)
+    return _marcar(mu_w, (t_f > 0) & (p >= 0) & (s >= 0) & (s <= 26))
+
+
+#%% Compresibilidad isotermica del agua
+# Correlación de Osif (1988) para cw
+def rho_w_sc(salinidad=0.0):
+    """Densidad de la salmuera a condiciones estándar (lb/ft³), McCain (1990)."""
+    s = np.asarray(salinidad, dtype=float)
+    return 62.368 + 0.438603 * s + 1.60074e-3 * s ** 2
+
+
+def cw_osif(p, t_f, salinidad=0.0):
+    """
+    Compresibilidad isotérmica de la salmuera cw (psia⁻¹), Osif (1988).
+
+        cw = 1 / (7.033·p + 541.5·C − 537.0·T + 403300)
+
+    con C la concentración de NaCl en g/L, obtenida de la salinidad en % en
+    peso y la densidad de la salmuera a condiciones estándar.
+
+    Retorna:
+    cw : ndarray (1/psia)
+    valido : ndarray bool
+    """
+    p, t_f, s = _arreglos(p, t_f, salinidad)
+    with np.errstate(all="ignore"):
+        den = _cw_denominador(p, t_f, s)
+        cw = 1.0 / den
+    return _marcar(cw, (p >= 0) & (s >= 0) & (den > 0))
+
+
+def propiedades_agua(p, t_f, salinidad=0.0):
+    """
+    Bw, Rsw, μw y cw en una sola pasada.
+
+    Los polinomios en T se evalúan una vez; si T y la salinidad son
+    escalares (el caso de pvt_controller) solo las partes que dependen de P
+    se calculan punto a punto.
+
+    Retorna
+    -------
+    bw, rsw, mu_w, cw : ndarray con la forma común (NaN si no es válido)
+    """
+    # Sin broadcasting previo: con T y S escalares sus polinomios son escalares
+    p, t_f, s = (np.asarray(a, dtype=float) for a in (p, t_f, salinidad))
+    forma = np.broadcast_shapes(p.shape, t_f.shape, s.shape)
+    with np.errstate(all="ignore"):
+        valido_t = t_f > 0
+        valido_p = p >= 0
+        bw = (1.0 + _bw_dv_p(p, t_f)) * (1.0 + _bw_dv_t(t_f))
+        A, B, C = _rsw_abc(t_f)
+        rsw = (A + (B + C * p) * p) * _rsw_factor_salinidad(t_f, s)
+        mu_w = _mu_w1(t_f, s) * _mu_w_factor_presion(p)
+        den = _cw_denominador(p, t_f, s)
+        cw = 1.0 / den
+
+    validos = (
+        valido_p & (bw > 0),
+        valido_t & valido_p & (s >= 0) & (rsw >= 0),
+        valido_t & valido_p & (s >= 0) & (s <= 26),
+        valido_p & (s >= 0) & (den > 0),
+    )
+    salida = []
+    for v, ok in zip((bw, rsw, mu_w, cw), validos):
+        v = np.where(ok & np.isfinite(v), v, np.nan)
+        salida.append(v if v.shape == forma else np.broadcast_to(v, forma).copy())
+    return tuple(salida)